@@ -9,7 +9,9 @@ import logging
 from trouver_une_fresque_scraper.db.records import get_record_dict
 from ics import Calendar
 import re
+from trouver_une_fresque_scraper.utils.concurrency import single_flight
 from trouver_une_fresque_scraper.utils.errors import FreskError
+from trouver_une_fresque_scraper.utils.http import fetch_text, normalize_url
 from trouver_une_fresque_scraper.utils.language import detect_language_code
 from trouver_une_fresque_scraper.utils.location import get_address
 import xml.etree.ElementTree as ET
@@ -85,6 +87,12 @@ def get_suffix_from_strings(strings, prefix):
     return None
 
 
+def parse_calendar(text):
+    # Remove VALARMs which incorrectly crash the ics library.
+    text = re.sub("BEGIN:VALARM.*END:VALARM", "", text, flags=re.DOTALL)
+    return Calendar(text)
+
+
 def get_ics_data(source):
     logging.info(f"Getting iCalendar data from {source['url']}")
 
@@ -92,14 +100,11 @@ def get_ics_data(source):
     records = []
 
     try:
-        response = requests.get(source["url"])
-        # Check if the request was successful (status code 200).
-        if response.status_code == 200:
-            # Remove VALARMs which incorrectly crash the ics library.
-            text = re.sub("BEGIN:VALARM.*END:VALARM", "", response.text, flags=re.DOTALL)
-            calendar = Calendar(text)
-        else:
-            logging.info(f"Request failed with status code: {response.status_code}")
+        # The same calendar can be listed by several sources of a country, so it is parsed once
+        # while it stays in the single_flight cache of the process
+        calendar = single_flight(
+            ("ics", normalize_url(source["url"])), lambda: parse_calendar(fetch_text(source["url"]))
+        )
     except requests.RequestException as e:
         logging.info(f"An error occurred: {e}")
 
@@ -3,6 +3,7 @@ import pandas as pd
 from trouver_une_fresque_scraper.apis.ics import get_ics_data
 from trouver_une_fresque_scraper.apis.glorieuses import get_glorieuses_data
 from trouver_une_fresque_scraper.apis.mobilite import get_mobilite_data
+from trouver_une_fresque_scraper.utils.checkpoint import source_checkpoint
 
 APIS_FNS = {
     "hook.eu1.make.com": get_glorieuses_data,
@@ -18,6 +19,9 @@ def main(apis):
     for sourcek in APIS_FNS:
         for api in apis:
             if sourcek in api["url"]:
-                records += APIS_FNS[sourcek](api)
+                checkpoint = source_checkpoint(api)
+                if not checkpoint.done:
+                    checkpoint.finish(APIS_FNS[sourcek](api))
+                records += checkpoint.records
 
     return pd.DataFrame(records)
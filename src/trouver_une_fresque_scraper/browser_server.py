@@ -0,0 +1,247 @@
+import argparse
+import logging
+import shutil
+import signal
+import subprocess
+import tempfile
+import time
+
+import requests
+
+from playwright.sync_api import sync_playwright
+
+from trouver_une_fresque_scraper.utils import stealth
+
+
+DEFAULT_PORT = 9222
+HEALTH_CHECK_INTERVAL = 30  # seconds between two health checks
+HEALTH_CHECK_TIMEOUT = 5  # seconds for a browser to answer a health check
+MAX_FAILED_CHECKS = 3  # consecutive failed checks before a browser is restarted
+MAX_UPTIME = 24 * 3600  # seconds before a browser is restarted anyway
+STARTUP_TIMEOUT = 30  # seconds for a browser to start answering
+
+
+def is_endpoint_healthy(endpoint, timeout=HEALTH_CHECK_TIMEOUT):
+    """
+    Tells whether the browser behind a Chrome DevTools Protocol endpoint answers.
+
+    Args:
+        endpoint: HTTP endpoint of the browser, e.g. http://127.0.0.1:9222
+
+    Returns:
+        True if the browser answered its version request within timeout seconds
+    """
+    try:
+        response = requests.get(f"{endpoint}/json/version", timeout=timeout)
+        return response.ok and "webSocketDebuggerUrl" in response.json()
+    except (requests.RequestException, ValueError):
+        return False
+
+
+def open_pages(endpoint, timeout=HEALTH_CHECK_TIMEOUT):
+    """
+    Lists the pages open in the browser behind a Chrome DevTools Protocol endpoint.
+
+    Args:
+        endpoint: HTTP endpoint of the browser, e.g. http://127.0.0.1:9222
+
+    Returns:
+        The URLs of the pages, or None if the browser did not answer within timeout seconds
+    """
+    try:
+        response = requests.get(f"{endpoint}/json/list", timeout=timeout)
+        response.raise_for_status()
+        return [target["url"] for target in response.json() if target.get("type") == "page"]
+    except (requests.RequestException, ValueError, KeyError, TypeError):
+        return None
+
+
+def close_target(endpoint, target_id, timeout=HEALTH_CHECK_TIMEOUT):
+    """
+    Closes a page of the browser behind a Chrome DevTools Protocol endpoint.
+
+    Goes through the DevTools HTTP interface, so it can be called from any thread, while the
+    Playwright objects of the page are busy or hanging in the thread that owns them.
+
+    Args:
+        endpoint: HTTP endpoint of the browser, e.g. http://127.0.0.1:9222
+        target_id: DevTools target id of the page
+
+    Returns:
+        True if the browser closed the page
+    """
+    try:
+        return requests.get(f"{endpoint}/json/close/{target_id}", timeout=timeout).ok
+    except requests.RequestException:
+        return False
+
+
+class ServedBrowser:
+    """
+    Chromium process kept alive by the browser server, reachable over CDP on a local port.
+
+    The process is started outside of Playwright so that it outlives the scraping runs
+    connecting to it, with the switches playwright-stealth adds to the browsers it launches.
+    """
+
+    def __init__(self, executable, port, headless=True):
+        self.executable = executable
+        self.port = port
+        self.headless = headless
+        self.process = None
+        self.user_data_dir = None
+        self.started_at = None
+        self.failed_checks = 0
+        self.restart_pending = False
+
+    @property
+    def endpoint(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        self.user_data_dir = tempfile.mkdtemp(prefix=f"tuf-browser-{self.port}-")
+        args = [
+            self.executable,
+            f"--remote-debugging-port={self.port}",
+            f"--user-data-dir={self.user_data_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--disable-background-networking",
+            "--disable-dev-shm-usage",
+            *stealth.launch_args(),
+        ]
+        if self.headless:
+            args.append("--headless=new")
+        self.process = subprocess.Popen(
+            args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True
+        )
+        self.started_at = time.monotonic()
+        self.failed_checks = 0
+        self.restart_pending = False
+
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                break
+            if is_endpoint_healthy(self.endpoint, timeout=1):
+                logging.info(f"Browser {self.endpoint} started (pid {self.process.pid})")
+                return True
+            time.sleep(0.5)
+        logging.error(f"Browser {self.endpoint} did not start")
+        return False
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+        if self.user_data_dir:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+            self.user_data_dir = None
+
+    def restart(self):
+        self.stop()
+        return self.start()
+
+    def is_idle(self):
+        """
+        Tells whether no scraping run is using the browser.
+
+        Runs open their pages in contexts of their own, closed when they disconnect, so only
+        the blank page the browser starts with is left once they are done.
+        """
+        pages = open_pages(self.endpoint)
+        return pages is not None and all(url == "about:blank" for url in pages)
+
+    def degradation(self):
+        """Returns why the browser should be restarted, or None if it is healthy."""
+        if self.process is None or self.process.poll() is not None:
+            return "process exited"
+        if time.monotonic() - self.started_at > MAX_UPTIME:
+            # Restarting would make the runs connected to the browser fail mid-source
+            if self.is_idle():
+                return "maximum uptime reached"
+            if not self.restart_pending:
+                logging.info(
+                    f"Browser {self.endpoint} reached its maximum uptime, "
+                    "restarting it once no run uses it"
+                )
+                self.restart_pending = True
+        if is_endpoint_healthy(self.endpoint):
+            self.failed_checks = 0
+            return None
+        self.failed_checks += 1
+        if self.failed_checks >= MAX_FAILED_CHECKS:
+            return f"{self.failed_checks} failed health checks"
+        logging.warning(f"Browser {self.endpoint} failed a health check")
+        return None
+
+
+def serve(count=1, port=DEFAULT_PORT, headless=True):
+    """
+    Keeps count warm Chromium browsers alive on consecutive ports, starting from port.
+
+    Every HEALTH_CHECK_INTERVAL seconds, a browser whose process exited or which stopped
+    answering is restarted. A browser up for more than MAX_UPTIME is restarted too, once no
+    scraping run has pages open in it. Runs until the process is interrupted or terminated.
+    """
+    with sync_playwright() as playwright:
+        executable = playwright.chromium.executable_path
+
+    browsers = [ServedBrowser(executable, port + index, headless) for index in range(count)]
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+
+    try:
+        for browser in browsers:
+            browser.start()
+        endpoints = ", ".join(f'"{browser.endpoint}"' for browser in browsers)
+        logging.info(f'Browser server ready, set "browser_server": [{endpoints}] in config.json')
+
+        while True:
+            time.sleep(HEALTH_CHECK_INTERVAL)
+            for browser in browsers:
+                reason = browser.degradation()
+                if reason:
+                    logging.warning(f"Restarting browser {browser.endpoint}: {reason}")
+                    browser.restart()
+    except KeyboardInterrupt:
+        logging.info("Stopping the browser server")
+    finally:
+        for browser in browsers:
+            browser.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="keep warm browsers alive for the scraping runs to connect to"
+    )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=1,
+        help="number of browsers to keep alive",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help="remote debugging port of the first browser, the others use the next ports",
+    )
+    parser.add_argument(
+        "--headed",
+        action="store_true",
+        default=False,
+        help="show the browser windows",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    serve(count=args.count, port=args.port, headless=not args.headed)
@@ -1,17 +1,20 @@
 import argparse
 import json
 import logging
+import os
 import subprocess
 import sys
 import pandas as pd
 import psycopg
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from psycopg.conninfo import make_conninfo
 
 from trouver_une_fresque_scraper.apis import main as main_apis
 from trouver_une_fresque_scraper.scraper import main as main_scraper
+from trouver_une_fresque_scraper.utils.checkpoint import complete_run, is_run_interrupted
 
 
 def configure_logging(log_file_path, error_log_file_path):
@@ -105,6 +108,22 @@ def get_sources(content):
     return scrapers, apis
 
 
+def find_interrupted_run(country):
+    """
+    Returns the results directory of the last run of country if it was interrupted, or None.
+
+    A run is interrupted when it saved checkpoints but was never marked as completed, see
+    complete_run.
+    """
+    runs = sorted(path for path in Path(f"results/{country}").glob("*") if path.is_dir())
+    if not runs:
+        return None
+    last_run = runs[-1]
+    if is_run_interrupted(last_run):
+        return last_run
+    return None
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -130,6 +149,24 @@ if __name__ == "__main__":
         default=False,
         help="skips checking that the git repository is clean",
     )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=1,
+        help="number of platforms scraped in parallel, each in its own process",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="number of browsers sharing the sources of each platform",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        default=False,
+        help="continue the last run of the country from its checkpoints if it was interrupted",
+    )
     args = parser.parse_args()
 
     # This scraper should be run from a clean state to ensure reproducibility
@@ -153,11 +190,14 @@ if __name__ == "__main__":
     # Parse the sources
     scrapers, apis = get_sources(content)
 
-    # Build the results path for this run
-    dt = datetime.now()
-    scraping_time = dt.strftime("%Y%m%d_%H%M%S")
-    results_path = Path(f"results/{args.country}/{scraping_time}")
-    results_path.mkdir(parents=True, exist_ok=True)
+    # Build the results path for this run, or reuse the one of the run to resume
+    results_path = find_interrupted_run(args.country) if args.resume else None
+    resumed = results_path is not None
+    if not resumed:
+        dt = datetime.now()
+        scraping_time = dt.strftime("%Y%m%d_%H%M%S")
+        results_path = Path(f"results/{args.country}/{scraping_time}")
+        results_path.mkdir(parents=True, exist_ok=True)
     commit_hash = get_git_commit_hash()
     with open(f"{results_path}/commit_hash.txt", "w") as file:
         file.write(commit_hash)
@@ -168,16 +208,34 @@ if __name__ == "__main__":
     log_path = results_path / Path("log.txt")
     errors_path = results_path / Path("error_log.txt")
     configure_logging(log_path, errors_path)
-
-    # Launch the scraper
-    df1 = main_scraper(scrapers, headless=args.headless)
-    df2 = main_apis(apis)
+    if resumed:
+        logging.info(f"Resuming the interrupted run in {results_path}")
+    elif args.resume:
+        logging.info("No interrupted run to resume, starting a new one")
+
+    # Finished sources, collected links and finished events are saved as the run goes, and
+    # read back by --resume. Set before the scrapers start so that worker processes inherit it.
+    os.environ["CHECKPOINT_DIR"] = str(results_path / "checkpoint")
+
+    # Launch the scraper and the APIs side by side, the APIs don't need a browser
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        scraper_future = executor.submit(
+            main_scraper,
+            scrapers,
+            headless=args.headless,
+            max_workers=args.max_workers,
+            shards=args.shards,
+        )
+        apis_future = executor.submit(main_apis, apis)
+        df1 = scraper_future.result()
+        df2 = apis_future.result()
     df_merged = pd.concat([df1, df2])
 
     dt = datetime.now()
     insert_time = dt.strftime("%Y%m%d_%H%M%S")
     with open(results_path / Path(f"events_{insert_time}.json"), "w", encoding="UTF-8") as file:
         df_merged.to_json(file, orient="records", force_ascii=False, indent=2)
+    complete_run(results_path)
 
     # Push the resulting json file to the database
     if args.push_to_db:
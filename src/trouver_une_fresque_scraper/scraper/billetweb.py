@@ -2,285 +2,491 @@ import re
 import json
 import logging
 from datetime import timedelta
+from urllib.parse import urljoin
+
+import requests
 
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 from trouver_une_fresque_scraper.db.records import get_record_dict
+from trouver_une_fresque_scraper.utils.checkpoint import source_checkpoint
+from trouver_une_fresque_scraper.utils.concurrency import throttle
 from trouver_une_fresque_scraper.utils.date_and_time import get_dates
 from trouver_une_fresque_scraper.utils.errors import FreskError
+from trouver_une_fresque_scraper.utils.event_cache import (
+    cache_event,
+    get_cached_event,
+    listing_fingerprint,
+    SourceCache,
+)
+from trouver_une_fresque_scraper.utils.html import inner_text, select, select_one
+from trouver_une_fresque_scraper.utils.http import fetch_html, map_concurrently
 from trouver_une_fresque_scraper.utils.keywords import *
 from trouver_une_fresque_scraper.utils.language import detect_language_code
 from trouver_une_fresque_scraper.utils.location import get_address
+from trouver_une_fresque_scraper.utils.scraping import DriverRecycler, probe, probe_text
+from trouver_une_fresque_scraper.utils.watchdog import event_deadline
 
 
 def get_billetweb_data(sources, service, options):
     logging.info("Scraping data from www.billetweb.fr")
 
-    driver = webdriver.Firefox(service=service, options=options)
-    wait = WebDriverWait(driver, 10)
+    # Billetweb pages are server-rendered: Firefox is only started for the
+    # pages that cannot be read over plain HTTP
+    drivers = DriverRecycler(lambda: webdriver.Firefox(service=service, options=options))
 
     records = []
 
     for page in sources:
-        logging.info(f"==================\nProcessing page {page}")
-        driver.get(page["url"])
+        checkpoint = source_checkpoint(page)
+        if checkpoint.done:
+            logging.info(f"Reusing the checkpointed records of {page['url']}")
+            records.extend(checkpoint.records)
+            continue
+        start = len(records)
 
-        try:
-            wait.until(EC.frame_to_be_available_and_switch_to_it((By.ID, page["iframe"])))
-        except TimeoutException:
-            logging.info("Rejecting record: iframe not found")
+        logging.info(f"==================\nProcessing page {page}")
+        listing = checkpoint.listing
+        if listing is None:
+            listing = get_event_links_http(page)
+            if listing is None:
+                driver = drivers.get()
+                listing = get_event_links_selenium(driver, WebDriverWait(driver, 10), page)
+            checkpoint.save_listing(listing)
+
+        # Reuse the records of the last run if the listing is unchanged
+        source_cache = SourceCache(page, listing)
+        cached = source_cache.records()
+        if cached is not None:
+            records.extend(cached)
+            checkpoint.finish(cached)
             continue
 
-        wait.until(lambda driver: driver.execute_script("return document.readyState") == "complete")
-        ele = driver.find_elements(By.CSS_SELECTOR, "a.naviguate")
-        links = [e.get_attribute("href") for e in ele]
+        # Events unchanged in the listing since an earlier run reuse its records
+        links = list(listing)
+        for link in links:
+            if not checkpoint.has_result(link):
+                cached = get_cached_event(page, extract_event_id(link), listing[link])
+                if cached is not None:
+                    checkpoint.save_result(link, cached)
+
+        links_to_fetch = [link for link in links if not checkpoint.has_result(link)]
+        results = map_concurrently(lambda link: process_event_http(page, link), links_to_fetch)
+        http_results = dict(zip(links_to_fetch, results))
 
         for link in links:
-            logging.info(f"------------------\nProcessing event {link}")
-            driver.get(link)
-            wait.until(
-                lambda driver: driver.execute_script("return document.readyState") == "complete"
+            if not checkpoint.has_result(link):
+                event_records = http_results[link]
+                if event_records is None:
+                    logging.info(f"Falling back to Firefox for {link}")
+                    driver = drivers.get()
+                    with event_deadline(link, kill=drivers.kill) as deadline:
+                        event_records = process_event_selenium(
+                            driver, WebDriverWait(driver, 10), page, link
+                        )
+                    if deadline.expired:
+                        continue
+                cache_event(page, extract_event_id(link), listing[link], event_records)
+                checkpoint.save_result(link, event_records)
+            records.extend(checkpoint.results[link])
+        checkpoint.finish(records[start:])
+        source_cache.save(records[start:])
+
+    drivers.quit()
+
+    return records
+
+
+def extract_event_id(link):
+    """Returns the id of a Billetweb event from its link, or None."""
+    match = re.search(r"/([^/]+?)&", link)
+    return match.group(1) if match else None
+
+
+def get_event_links_http(page):
+    """
+    Reads the event links of an organizer page without a browser.
+
+    Returns:
+        The listing fingerprint of each event link, taken from the text of the link, or None
+        if the organizer iframe could not be read over HTTP
+    """
+    try:
+        doc = fetch_html(page["url"])
+        iframe = select_one(doc, f"iframe#{page['iframe']}")
+        if iframe is None or not iframe.get("src"):
+            return None
+        iframe_url = urljoin(page["url"], iframe.get("src"))
+        iframe_doc = fetch_html(iframe_url)
+    except requests.RequestException as e:
+        logging.info(f"Could not fetch {page['url']} over HTTP: {e}")
+        return None
+    return {
+        urljoin(iframe_url, a.get("href")): listing_fingerprint(inner_text(a))
+        for a in select(iframe_doc, "a.naviguate")
+        if a.get("href")
+    }
+
+
+def get_event_links_selenium(driver, wait, page):
+    throttle(page["url"])
+    driver.get(page["url"])
+
+    try:
+        wait.until(EC.frame_to_be_available_and_switch_to_it((By.ID, page["iframe"])))
+    except TimeoutException:
+        logging.info("Rejecting record: iframe not found")
+        return {}
+
+    wait.until(lambda driver: driver.execute_script("return document.readyState") == "complete")
+    try:
+        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "a.naviguate")))
+    except TimeoutException:
+        logging.info("No event found in the iframe")
+        return {}
+    ele = driver.find_elements(By.CSS_SELECTOR, "a.naviguate")
+    return {e.get_attribute("href"): listing_fingerprint(e.text) for e in ele}
+
+
+def process_event_http(page, link):
+    """
+    Scrapes a Billetweb event and its sessions over plain HTTP.
+
+    Fetches the same pages as process_event_selenium: the event page, its
+    shop iframe, the optional back link and every session page.
+
+    Returns:
+        List of records, or None if an expected element is missing from the
+        HTML and the event has to be rendered by a browser
+    """
+    logging.info(f"------------------\nFetching event {link}")
+
+    # Useful for different workshops sharing same event link
+    if "filter" in page:
+        if page["filter"] not in link:
+            logging.info("Rejecting filter: expected filter keyword not present in current link")
+            return []
+
+    try:
+        doc = fetch_html(link)
+
+        # Description
+        description_el = select_one(doc, "#description")
+        if description_el is None:
+            return None
+        description = inner_text(description_el)
+        if not description:
+            logging.info("Rejecting record: empty description")
+            return []
+
+        # Parse event id
+        event_id = re.search(r"/([^/]+?)&", link).group(1)
+
+        # Parse main title
+        title_el = select_one(
+            doc,
+            "#event_title > div.event_name, #description_block > div.event_title > div.event_name",
+        )
+        if title_el is None:
+            return None
+        main_title = inner_text(title_el)
+
+        # Location data
+        location_el = select_one(doc, "div.location_summary")
+        if location_el is None:
+            location_el = select_one(
+                doc, "#page_block_location > div.location > div.location_info > div.address > a"
+            )
+        main_full_location = inner_text(location_el) if location_el is not None else ""
+
+        event_info = []
+
+        # Retrieve sessions if exist
+        shop_iframe = select_one(doc, "#shop_block iframe")
+        if shop_iframe is None or not shop_iframe.get("src"):
+            return None
+        shop_url = urljoin(link, shop_iframe.get("src"))
+        shop_doc = fetch_html(shop_url)
+        back_link_el = select_one(shop_doc, ".back_header_link.summarizable")
+        if back_link_el is not None and back_link_el.get("href"):
+            # Case of Multi-time with only one date, we arrive directly to Basket, so get back to sessions
+            shop_url = urljoin(shop_url, back_link_el.get("href"))
+            shop_doc = fetch_html(shop_url)
+        sessions_links = [
+            urljoin(shop_url, s.get("href")) for s in select(shop_doc, "a.sesssion_href")
+        ]  # No sessions for Mono-time
+
+        ################################################################
+        # Multi-time management
+        ################################################################
+        for sessions_link in sessions_links:
+            session_doc = fetch_html(sessions_link)
+            context_el = select_one(session_doc, "#context_title")
+            if context_el is None:
+                return None
+            context = inner_text(context_el)
+
+            # Parse title, dates, location
+            match = re.match(
+                r"\s*((?P<title>.*) : )?(?P<event_time>.*)(\n\s*(?P<full_location>.*))?",
+                context,
+            )
+            if not match.group("title"):
+                sub_title = main_title
+            elif "atelier" in match.group("title").lower():
+                sub_title = match.group("title")
+            else:
+                sub_title = main_title + " - " + match.group("title")
+
+            event_time = match.group("event_time")
+            sub_full_location = (
+                match.group("full_location") if match.group("full_location") else main_full_location
             )
 
-            # Useful for different workshops sharing same event link
-            if "filter" in page:
-                if page["filter"] not in link:
-                    logging.info(
-                        "Rejecting filter: expected filter keyword not present in current link"
-                    )
-                    continue
+            # Is it full?
+            # The presence of div.block indicates that the event is sold out,
+            # except if the text below is displayed.
+            empty = select_one(session_doc, "div.block")
+            sold_out = empty is not None and not has_external_tickets(inner_text(empty))
 
-            # Description
-            try:
-                driver.find_element(By.ID, "more_info").click()
-            except Exception:
-                pass  # normal case if description is without more info
+            # Parse session id
+            session_id = re.search(r"&session=(\d+)", sessions_link).group(1)
+            uuid = f"{event_id}-{session_id}"
 
-            try:
-                description_el = wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "#description"))
-                )
-                description = description_el.text
-                if not description:
-                    logging.info("Rejecting record: empty description")
-                    continue
-            except TimeoutException:
-                logging.info("Rejecting record: no description")
-                continue
+            event_info.append(
+                [sub_title, event_time, sub_full_location, sold_out, sessions_link, uuid]
+            )
 
-            # Parse event id
-            event_id = re.search(r"/([^/]+?)&", link).group(1)
-            if not event_id:
-                logging.info("Rejecting record: event_id not found")
-                continue
+        ################################################################
+        # Mono-time management
+        ################################################################
+        if not sessions_links:
+            # Parse start and end dates
+            time_el = select_one(
+                doc,
+                "#event_title > div.event_start_time > span.text, "
+                "#description_block > div.event_title > span > a > div.event_start_time",
+            )
+            if time_el is None:
+                return None
+            event_time = inner_text(time_el)
+
+            # Is it full?
+            # The presence of div.block indicates that the event is sold out,
+            # except if the text below is displayed.
+            empty = select_one(shop_doc, "div.block")
+            sold_out = empty is not None and not has_external_tickets(inner_text(empty))
+
+            event_info.append(
+                [main_title, event_time, main_full_location, sold_out, link, event_id]
+            )
 
-            # Parse main title
-            try:
-                main_title = driver.find_element(
-                    by=By.CSS_SELECTOR, value="#event_title > div.event_name"
-                ).text
-            except NoSuchElementException:
-                main_title = driver.find_element(
-                    by=By.CSS_SELECTOR,
-                    value="#description_block > div.event_title > div.event_name",
-                ).text
-
-            # Location data
-            try:
-                try:
-                    main_full_location = driver.find_element(
-                        by=By.CSS_SELECTOR, value="div.location_summary"
-                    ).text
-                except NoSuchElementException:
-                    main_full_location = driver.find_element(
-                        by=By.CSS_SELECTOR,
-                        value="#page_block_location > div.location > div.location_info > div.address > a",
-                    ).text
-            except Exception:
-                main_full_location = ""
-
-            event_info = []
-
-            # Retrieve sessions if exist
+    except requests.RequestException as e:
+        logging.info(f"Could not fetch {link} over HTTP: {e}")
+        return None
+    except AttributeError as e:
+        # An id or a session number missing from a URL
+        logging.info(f"Rejecting record: {e}")
+        return []
+
+    return build_records(page, link, description, event_info)
+
+
+def process_event_selenium(driver, wait, page, link):
+    logging.info(f"------------------\nProcessing event {link}")
+    throttle(link)
+    driver.get(link)
+    wait.until(lambda driver: driver.execute_script("return document.readyState") == "complete")
+
+    # Useful for different workshops sharing same event link
+    if "filter" in page:
+        if page["filter"] not in link:
+            logging.info("Rejecting filter: expected filter keyword not present in current link")
+            return []
+
+    # Description
+    more_info = probe(driver, "#more_info")
+    if more_info is not None:
+        # Descriptions without more info have no button
+        try:
+            more_info.click()
+        except WebDriverException:
+            pass
+
+    try:
+        description_el = wait.until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "#description"))
+        )
+        description = description_el.text
+        if not description:
+            logging.info("Rejecting record: empty description")
+            return []
+    except TimeoutException:
+        logging.info("Rejecting record: no description")
+        return []
+
+    # Parse event id
+    event_id = re.search(r"/([^/]+?)&", link).group(1)
+    if not event_id:
+        logging.info("Rejecting record: event_id not found")
+        return []
+
+    # Parse main title
+    main_title = probe_text(
+        driver,
+        "#event_title > div.event_name",
+        "#description_block > div.event_title > div.event_name",
+    )
+    if main_title is None:
+        logging.info("Rejecting record: title not found")
+        return []
+
+    # Location data
+    main_full_location = probe_text(
+        driver,
+        "div.location_summary",
+        "#page_block_location > div.location > div.location_info > div.address > a",
+        default="",
+    )
+
+    event_info = []
+
+    # Retrieve sessions if exist
+    wait.until(EC.frame_to_be_available_and_switch_to_it((By.CSS_SELECTOR, "#shop_block iframe")))
+    wait.until(lambda driver: driver.execute_script("return document.readyState") == "complete")
+    back_links = driver.find_elements(By.CSS_SELECTOR, ".back_header_link.summarizable")
+    if back_links:
+        # Case of Multi-time with only one date, we arrive directly to Basket, so get back to sessions
+        back_link = back_links[0].get_attribute("href")
+        throttle(back_link)
+        driver.get(back_link)
+        wait.until(lambda driver: driver.execute_script("return document.readyState") == "complete")
+    sessions = driver.find_elements(By.CSS_SELECTOR, "a.sesssion_href")
+    sessions_links = [s.get_attribute("href") for s in sessions]  # No sessions for Mono-time
+    driver.switch_to.parent_frame()
+
+    ################################################################
+    # Multi-time management
+    ################################################################
+    for sessions_link in sessions_links:
+        throttle(sessions_link)
+        driver.get(sessions_link)
+        wait.until(lambda driver: driver.execute_script("return document.readyState") == "complete")
+        try:
+            context = wait.until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "#context_title"))
+            ).text
+        except TimeoutException:
+            logging.info(f"Rejecting session {sessions_link}: context not found")
+            continue
+
+        # Parse title, dates, location
+        if match := re.match(
+            r"\s*((?P<title>.*) : )?(?P<event_time>.*)(\n\s*(?P<full_location>.*))?",
+            context,
+        ):
+            if not match.group("title"):
+                sub_title = main_title
+            elif "atelier" in match.group("title").lower():
+                sub_title = match.group("title")
+            else:
+                sub_title = main_title + " - " + match.group("title")
+
+            event_time = match.group("event_time")
+            sub_full_location = (
+                match.group("full_location") if match.group("full_location") else main_full_location
+            )
+        else:
+            raise
+
+        # Is it full?
+        # The presence of div.block indicates that the event is sold out,
+        # except if the text below is displayed.
+        empty = probe_text(driver, "div.block")
+        sold_out = empty is not None and not has_external_tickets(empty)
+
+        # Parse session id
+        session_id = re.search(r"&session=(\d+)", sessions_link).group(1)
+        uuid = f"{event_id}-{session_id}"
+
+        event_info.append([sub_title, event_time, sub_full_location, sold_out, sessions_link, uuid])
+
+    ################################################################
+    # Mono-time management
+    ################################################################
+    if not sessions_links:
+        # Parse start and end dates
+        event_time = probe_text(
+            driver,
+            "#event_title > div.event_start_time > span.text",
+            "#description_block > div.event_title > span > a > div.event_start_time",
+        )
+        if event_time is None:
+            logging.info("Rejecting record: date not found")
+            return []
+
+        # Is it full?
+        try:
             wait.until(
                 EC.frame_to_be_available_and_switch_to_it((By.CSS_SELECTOR, "#shop_block iframe"))
             )
             wait.until(
                 lambda driver: driver.execute_script("return document.readyState") == "complete"
             )
-            back_links = driver.find_elements(By.CSS_SELECTOR, ".back_header_link.summarizable")
-            if back_links:
-                # Case of Multi-time with only one date, we arrive directly to Basket, so get back to sessions
-                driver.get(back_links[0].get_attribute("href"))
-                wait.until(
-                    lambda driver: driver.execute_script("return document.readyState") == "complete"
-                )
-            sessions = driver.find_elements(By.CSS_SELECTOR, "a.sesssion_href")
-            sessions_links = [
-                s.get_attribute("href") for s in sessions
-            ]  # No sessions for Mono-time
+
+            # The presence of div.block indicates that the event is sold out,
+            # except if the text below is displayed.
+            empty = probe_text(driver, "div.block")
+            sold_out = empty is not None and not has_external_tickets(empty)
+        finally:
             driver.switch_to.parent_frame()
 
-            ################################################################
-            # Multi-time management
-            ################################################################
-            for sessions_link in sessions_links:
-                driver.get(sessions_link)
-                wait.until(
-                    lambda driver: driver.execute_script("return document.readyState") == "complete"
-                )
-                context = driver.find_element(By.CSS_SELECTOR, "#context_title").text
-
-                # Parse title, dates, location
-                if match := re.match(
-                    r"\s*((?P<title>.*) : )?(?P<event_time>.*)(\n\s*(?P<full_location>.*))?",
-                    context,
-                ):
-                    if not match.group("title"):
-                        sub_title = main_title
-                    elif "atelier" in match.group("title").lower():
-                        sub_title = match.group("title")
-                    else:
-                        sub_title = main_title + " - " + match.group("title")
-
-                    event_time = match.group("event_time")
-                    sub_full_location = (
-                        match.group("full_location")
-                        if match.group("full_location")
-                        else main_full_location
-                    )
-                else:
-                    raise
-
-                # Is it full?
-                try:
-                    # The presence of div.block indicates that the event is sold out,
-                    # except if the text below is displayed.
-                    empty = driver.find_element(By.CSS_SELECTOR, "div.block")
-                    sold_out = not has_external_tickets(empty.text)
-                except NoSuchElementException:
-                    sold_out = False
-
-                # Parse session id
-                session_id = re.search(r"&session=(\d+)", sessions_link).group(1)
-                uuid = f"{event_id}-{session_id}"
-
-                event_info.append(
-                    [sub_title, event_time, sub_full_location, sold_out, sessions_link, uuid]
-                )
-
-            ################################################################
-            # Mono-time management
-            ################################################################
-            if not sessions_links:
-                # Parse start and end dates
-                try:
-                    event_time = driver.find_element(
-                        by=By.CSS_SELECTOR,
-                        value="#event_title > div.event_start_time > span.text",
-                    ).text
-                except NoSuchElementException:
-                    event_time = driver.find_element(
-                        by=By.CSS_SELECTOR,
-                        value="#description_block > div.event_title > span > a > div.event_start_time",
-                    ).text
-
-                # Is it full?
-                try:
-                    wait.until(
-                        EC.frame_to_be_available_and_switch_to_it(
-                            (By.CSS_SELECTOR, "#shop_block iframe")
-                        )
-                    )
-                    wait.until(
-                        lambda driver: driver.execute_script("return document.readyState")
-                        == "complete"
-                    )
-
-                    # The presence of div.block indicates that the event is sold out,
-                    # except if the text below is displayed.
-                    empty = driver.find_element(By.CSS_SELECTOR, "div.block")
-                    sold_out = not has_external_tickets(empty.text)
-                except NoSuchElementException:
-                    sold_out = False
-                finally:
-                    driver.switch_to.parent_frame()
-
-                event_info.append(
-                    [main_title, event_time, main_full_location, sold_out, link, event_id]
-                )
-
-            ################################################################
-            # Session loop
-            ################################################################
-            for index, (title, event_time, full_location, sold_out, ticket_link, uuid) in enumerate(
-                event_info
-            ):
-                logging.info(
-                    f"\n-> Processing session {index+1}/{len(event_info)} {ticket_link} ..."
-                )
-                if is_gift_card(title):
-                    logging.info("Rejecting record: gift card")
-                    continue
-
-                ################################################################
-                # Date and time
-                ################################################################
-                try:
-                    event_start_datetime, event_end_datetime = get_dates(event_time)
-                except Exception as e:
-                    logging.info(f"Rejecting record: {e}")
-                    continue
-
-                if event_end_datetime - event_start_datetime > timedelta(days=1):
-                    logging.info(f"Rejecting record: event is too long: {event_time}")
-                    continue
-
-                # Is it an online event?
-                online = is_online(title) or is_online(full_location)
-                title = title.replace(" Online event", "")  # Button added by billetweb
-
-                ################################################################
-                # Location data
-                ################################################################
-                location_name = address = city = department = longitude = latitude = zip_code = (
-                    country_code
-                ) = ""
-                if not online:
-                    try:
-                        address_dict = get_address(full_location)
-                        (
-                            location_name,
-                            address,
-                            city,
-                            department,
-                            zip_code,
-                            country_code,
-                            latitude,
-                            longitude,
-                        ) = address_dict.values()
-                    except FreskError as error:
-                        logging.info(f"Rejecting record: {error}.")
-                        continue
+        event_info.append([main_title, event_time, main_full_location, sold_out, link, event_id])
+
+    return build_records(page, link, description, event_info)
 
-                # Training?
-                training = is_training(title)
 
-                # Is it suited for kids?
-                kids = is_for_kids(title) and not training  # no trainings for kids
+def build_records(page, link, description, event_info):
+    """Builds the records of the sessions of an event, listed in event_info."""
+    records = []
+    for index, (title, event_time, full_location, sold_out, ticket_link, uuid) in enumerate(
+        event_info
+    ):
+        logging.info(f"\n-> Processing session {index+1}/{len(event_info)} {ticket_link} ...")
+        if is_gift_card(title):
+            logging.info("Rejecting record: gift card")
+            continue
+
+        ################################################################
+        # Date and time
+        ################################################################
+        try:
+            event_start_datetime, event_end_datetime = get_dates(event_time)
+        except Exception as e:
+            logging.info(f"Rejecting record: {e}")
+            continue
 
-                # Building final object
-                record = get_record_dict(
-                    f"{page['id']}-{uuid}",
-                    page["id"],
-                    title,
-                    event_start_datetime,
-                    event_end_datetime,
-                    full_location,
+        if event_end_datetime - event_start_datetime > timedelta(days=1):
+            logging.info(f"Rejecting record: event is too long: {event_time}")
+            continue
+
+        # Is it an online event?
+        online = is_online(title) or is_online(full_location)
+        title = title.replace(" Online event", "")  # Button added by billetweb
+
+        ################################################################
+        # Location data
+        ################################################################
+        location_name = address = city = department = ""
+        longitude = latitude = zip_code = country_code = ""
+        if not online:
+            try:
+                address_dict = get_address(full_location)
+                (
                     location_name,
                     address,
                     city,
@@ -289,21 +495,46 @@ def get_billetweb_data(sources, service, options):
                     country_code,
                     latitude,
                     longitude,
-                    page.get(
-                        "language_code",
-                        detect_language_code(title, description),
-                    ),
-                    online,
-                    training,
-                    sold_out,
-                    kids,
-                    link,
-                    ticket_link,
-                    description,
-                )
-                records.append(record)
-                logging.info(f"Successfully scraped:\n{json.dumps(record, indent=4)}")
-
-    driver.quit()
+                ) = address_dict.values()
+            except FreskError as error:
+                logging.info(f"Rejecting record: {error}.")
+                continue
+
+        # Training?
+        training = is_training(title)
+
+        # Is it suited for kids?
+        kids = is_for_kids(title) and not training  # no trainings for kids
+
+        # Building final object
+        record = get_record_dict(
+            f"{page['id']}-{uuid}",
+            page["id"],
+            title,
+            event_start_datetime,
+            event_end_datetime,
+            full_location,
+            location_name,
+            address,
+            city,
+            department,
+            zip_code,
+            country_code,
+            latitude,
+            longitude,
+            page.get(
+                "language_code",
+                detect_language_code(title, description),
+            ),
+            online,
+            training,
+            sold_out,
+            kids,
+            link,
+            ticket_link,
+            description,
+        )
+        records.append(record)
+        logging.info(f"Successfully scraped:\n{json.dumps(record, indent=4)}")
 
     return records
@@ -1,20 +1,47 @@
+import atexit
 import json
 import logging
+import os
 import re
-import urllib.request
-import urllib.error
+import threading
+
+import requests
 
 from datetime import datetime, timedelta
+from urllib.parse import urlparse
 
 from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError
 
 from trouver_une_fresque_scraper.db.records import get_record_dict
-from trouver_une_fresque_scraper.utils.browser import managed_browser, DEFAULT_TIMEOUT
+from trouver_une_fresque_scraper.utils.browser import (
+    managed_browser,
+    new_context,
+    goto,
+    is_state_restored,
+    save_storage_state,
+    PagePool,
+    DEFAULT_TIMEOUT,
+)
+from trouver_une_fresque_scraper.utils.checkpoint import source_checkpoint, SourceCheckpoint
 from trouver_une_fresque_scraper.utils.date_and_time import get_dates, DEFAULT_DURATION
 from trouver_une_fresque_scraper.utils.errors import (
     FreskError,
     FreskDateBadFormat,
 )
+from trouver_une_fresque_scraper.utils.event_cache import (
+    cache_event,
+    get_cached_event,
+    listing_fingerprint,
+    skip_unchanged,
+    SourceCache,
+)
+from trouver_une_fresque_scraper.utils.fields import field, present, read_fields
+from trouver_une_fresque_scraper.utils.html import collapse_lines, inner_text, parse_html
+from trouver_une_fresque_scraper.utils.http import (
+    fetch_json,
+    fetch_next_data,
+    map_concurrently,
+)
 from trouver_une_fresque_scraper.utils.keywords import (
     is_plenary,
     is_online,
@@ -23,6 +50,140 @@ from trouver_une_fresque_scraper.utils.keywords import (
 )
 from trouver_une_fresque_scraper.utils.language import detect_language_code
 from trouver_une_fresque_scraper.utils.location import get_address
+from trouver_une_fresque_scraper.utils.waits import (
+    wait_for_dom_stable,
+    wait_for_network_idle,
+    wait_for_selector,
+    wait_until_changed,
+)
+
+
+# Cookies and localStorage are kept between runs under this name, see utils.browser
+STORAGE_DOMAIN = "eventbrite.com"
+
+# Organizer listing endpoint behind the "Voir plus" / "See more" button
+SHOW_MORE_PAGE_SIZE = 50
+SHOW_MORE_MAX_PAGES = 20
+
+# Fields of a listed event that change when its page is edited
+LISTING_FIELDS = (
+    "name",
+    "summary",
+    "start",
+    "end",
+    "start_date",
+    "start_time",
+    "end_date",
+    "end_time",
+    "is_online_event",
+    "is_sold_out",
+    "primary_venue",
+)
+
+# Fields of an event page, read in a single round trip by process_event_page
+LOCATION_SELECTOR = '[data-testid="section-wrapper-location"]'
+OVERVIEW_SELECTOR = '[data-testid="section-wrapper-overview"]'
+READ_MORE_SELECTOR = f'{OVERVIEW_SELECTOR} button[class*="Overview_readMore"]'
+EVENT_PAGE_FIELDS = {
+    "next_data": field("script#__NEXT_DATA__"),
+    "title": field('[data-testid="event-title"]'),
+    "venue": field('[data-testid="event-venue"]'),
+    "venue_text": field('[data-testid="event-venue"]', prop="innerText"),
+    "location_section": present(LOCATION_SELECTOR),
+    "location_name": field(f"{LOCATION_SELECTOR} address h3"),
+    "address_lines": field(
+        f'{LOCATION_SELECTOR} address p[class*="Address_description"]', all=True
+    ),
+    "summary": field(f'{OVERVIEW_SELECTOR} div[class*="Overview_summary"]', prop="innerText"),
+    "read_more": present(READ_MORE_SELECTOR),
+    "date_text": field('[data-testid="event-datetime"]'),
+}
+
+# Disk-backed cache of series occurrences, keyed by series ID
+SERIES_CACHE_MAX_AGE = timedelta(days=7)
+_series_cache = {}
+_series_cache_file = os.environ.get("EVENTBRITE_SERIES_CACHE_FILE")
+_series_cache_lock = threading.Lock()
+
+
+def _load_series_cache():
+    """Load the series cache from disk if EVENTBRITE_SERIES_CACHE_FILE is set."""
+    global _series_cache
+    if _series_cache_file and os.path.exists(_series_cache_file):
+        try:
+            with open(_series_cache_file, "r", encoding="utf-8") as f:
+                _series_cache = json.load(f)
+            logging.info(
+                f"Loaded {len(_series_cache)} series cache entries from {_series_cache_file}"
+            )
+        except (json.JSONDecodeError, OSError) as e:
+            logging.warning(f"Could not load series cache: {e}")
+            _series_cache = {}
+
+
+def save_series_cache():
+    """
+    Save the series cache to disk if EVENTBRITE_SERIES_CACHE_FILE is set.
+
+    Called at the end of get_eventbrite_new_data, and at exit outside of the worker
+    processes of scraper/main.py.
+    """
+    if _series_cache_file and _series_cache:
+        with _series_cache_lock:
+            try:
+                # Write then rename, so that the shards of a run never read a partial file
+                temporary_path = f"{_series_cache_file}.{os.getpid()}.tmp"
+                with open(temporary_path, "w", encoding="utf-8") as f:
+                    json.dump(_series_cache, f, ensure_ascii=False, indent=2)
+                os.replace(temporary_path, _series_cache_file)
+                logging.info(
+                    f"Saved {len(_series_cache)} series cache entries to {_series_cache_file}"
+                )
+            except OSError as e:
+                logging.warning(f"Could not save series cache: {e}")
+
+
+# Load cache on import and register save on exit
+_load_series_cache()
+atexit.register(save_series_cache)
+
+
+def _cache_series(series_id: str, event_info: list, object_count: int | None = None):
+    """Store the occurrences of a series, with the child count used to revalidate them."""
+    entry = {
+        "fetched_at": datetime.now().isoformat(),
+        "object_count": object_count,
+        "events": [
+            [uuid, start.isoformat(), end.isoformat(), link]
+            for uuid, start, end, link in event_info
+        ],
+    }
+    with _series_cache_lock:
+        _series_cache[str(series_id)] = entry
+
+
+def _get_cached_series(series_id: str) -> dict | None:
+    """
+    Return the cache entry of a series if it is recent enough, or None.
+
+    Occurrences that already started are dropped from the returned entry.
+    """
+    entry = _series_cache.get(str(series_id))
+    if not entry:
+        return None
+    try:
+        if datetime.now() - datetime.fromisoformat(entry["fetched_at"]) > SERIES_CACHE_MAX_AGE:
+            return None
+        now = datetime.now()
+        events = []
+        for uuid, start, end, link in entry["events"]:
+            start_dt = parse_iso_datetime(start)
+            if start_dt > now:
+                events.append([uuid, start_dt, parse_iso_datetime(end), link])
+    except (KeyError, TypeError, ValueError) as e:
+        logging.debug(f"Ignoring invalid series cache entry {series_id}: {e}")
+        return None
+    return {"object_count": entry.get("object_count"), "events": events}
 
 
 def extract_event_uuid(url: str) -> str | None:
@@ -32,9 +193,15 @@ def extract_event_uuid(url: str) -> str | None:
 
 
 def delete_cookies_overlay(page: Page):
-    """Remove Transcend cookie consent overlay if present (shadow DOM)."""
+    """Remove Transcend cookie consent overlay if present (shadow DOM).
+
+    Skipped when the browser state of a previous run, where consent was
+    already rejected, was restored.
+    """
+    if is_state_restored(page.context):
+        return
     try:
-        page.wait_for_timeout(1000)
+        wait_for_selector(page, "#transcend-consent-manager", state="attached", timeout=1000)
         clicked = page.evaluate(
             """
             () => {
@@ -55,21 +222,144 @@ def delete_cookies_overlay(page: Page):
         )
         if clicked:
             logging.debug("Cookie consent rejected")
-            page.wait_for_timeout(500)
         else:
             logging.debug("Cookie consent overlay not found or already dismissed")
     except Exception as e:
         logging.debug(f"Cookie consent overlay couldn't be handled: {e}")
 
 
-def collect_event_links(page: Page, source: dict) -> list[str]:
+def extract_organizer_id(url: str) -> str | None:
+    """Extract the organizer ID from an Eventbrite profile URL (numeric ID at the end)."""
+    match = re.search(r"-(\d+)/?(?:\?|$)", url)
+    return match.group(1) if match else None
+
+
+def listed_event_fingerprint(event: dict) -> str | None:
+    """Listing fingerprint of an event from the organizer's JSON data."""
+    fields = {field: event.get(field) for field in LISTING_FIELDS if event.get(field)}
+    return listing_fingerprint(json.dumps(fields, sort_keys=True)) if fields else None
+
+
+def fetch_organizer_event_links(origin: str, organizer_id: str) -> dict[str, str | None] | None:
+    """
+    Fetch the links of all upcoming events of an organizer from the JSON
+    endpoint behind the "Voir plus" / "See more" button.
+
+    Args:
+        origin: Scheme and host of the organizer page (e.g. https://www.eventbrite.fr)
+        organizer_id: Numeric ID of the organizer
+
+    Returns:
+        The listing fingerprint of each event link, or None if the endpoint could not be used
+        or if the listing is longer than SHOW_MORE_MAX_PAGES pages
+    """
+    links = {}
+    page_number = 1
+
+    while page_number <= SHOW_MORE_MAX_PAGES:
+        url = (
+            f"{origin}/org/{organizer_id}/showmore/"
+            f"?type=future&page_size={SHOW_MORE_PAGE_SIZE}&page={page_number}"
+        )
+        logging.debug(f"Fetching organizer events: {url}")
+        try:
+            data = fetch_json(url).get("data", {})
+        except (requests.RequestException, AttributeError) as e:
+            logging.info(f"Organizer events endpoint unavailable ({url}): {e}")
+            return None
+
+        for event in data.get("events", []):
+            link = event.get("url")
+            if link:
+                links[link] = listed_event_fingerprint(event)
+
+        if not data.get("has_next_page", False):
+            return links
+        page_number += 1
+
+    # A partial listing would be cached as if it were complete
+    logging.warning(
+        f"Organizer {organizer_id} still has events after {SHOW_MORE_MAX_PAGES} pages, "
+        "clicking through its listing instead"
+    )
+    return None
+
+
+def click_show_more_links(page: Page) -> dict[str, str | None]:
+    """
+    Click "Voir plus" / "See more" until all events are loaded and return the card links,
+    with the fingerprint of their text.
+    """
+    consecutive_failures = 0
+    max_failures = 3
+
+    # The new template uses a ShowMoreButton wrapper
+    show_more_selector = (
+        'div[class*="ShowMoreButton"] button, '
+        'button:has-text("Voir plus"), '
+        'button:has-text("See more")'
+    )
+    cards = page.locator('a[class*="EventCardLink_event-card-link"]')
+
+    while consecutive_failures < max_failures:
+        try:
+            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+
+            if wait_for_selector(page, show_more_selector, timeout=3000):
+                card_count = cards.count()
+                page.locator(show_more_selector).first.click()
+                # Wait for the next batch of cards rather than a fixed delay
+                if wait_until_changed(page, cards.count, card_count):
+                    consecutive_failures = 0
+                else:
+                    consecutive_failures += 1
+            else:
+                logging.debug("No more 'Show More' button visible")
+                break
+
+        except PlaywrightTimeoutError:
+            consecutive_failures += 1
+            logging.debug(
+                f"Timeout clicking 'Show More' (attempt {consecutive_failures}/{max_failures})"
+            )
+        except Exception as e:
+            consecutive_failures += 1
+            logging.warning(
+                f"Error clicking 'Show More' (attempt {consecutive_failures}/{max_failures}): {e}"
+            )
+
+    # Collect newly loaded event links from the DOM
+    # Use desktop grid cards to avoid duplicates (mobile grid has same cards)
+    card_links = page.locator(
+        'div[class*="EventsBucket_gridDesktopContent"] ' 'a[class*="EventCardLink_event-card-link"]'
+    ).all()
+
+    dom_links = {}
+    for link_el in card_links:
+        href = link_el.get_attribute("href")
+        if href:
+            # Eventbrite card links can be relative (e.g. /e/slug-12345)
+            if href.startswith("/"):
+                # Construct absolute URL from the current page's origin
+                origin = page.evaluate("window.location.origin")
+                href = f"{origin}{href}"
+            dom_links[href] = listing_fingerprint(link_el.inner_text())
+    return dom_links
+
+
+def collect_event_links(page: Page, source: dict) -> dict[str, str | None]:
     """
     Collect all event links from the organizer profile page.
 
-    Parses __NEXT_DATA__ for the first batch of events, then clicks the
-    "Voir plus" / "See more" button to load additional events from the DOM.
+    Parses __NEXT_DATA__ for the first batch of events, then fetches the
+    remaining ones from the organizer's paginated JSON endpoint. Clicking
+    the "Voir plus" / "See more" button is only used if that endpoint fails.
+
+    Returns:
+        The listing fingerprint of each event link
     """
-    all_links = []
+    all_links = {}
+    organizer_id = None
 
     # Phase 1: Extract links from __NEXT_DATA__ JSON
     try:
@@ -82,11 +372,12 @@ def collect_event_links(page: Page, source: dict) -> list[str]:
         upcoming_events = page_props.get("upcomingEvents", [])
         has_more = page_props.get("hasMoreUpcoming", False)
         total_events = page_props.get("upcomingEventsTotal", 0)
+        organizer_id = page_props.get("organizer", {}).get("id")
 
         for event in upcoming_events:
             url = event.get("url")
             if url:
-                all_links.append(url)
+                all_links[url] = listed_event_fingerprint(event)
 
         logging.info(
             f"Extracted {len(all_links)} links from __NEXT_DATA__ "
@@ -96,61 +387,18 @@ def collect_event_links(page: Page, source: dict) -> list[str]:
         logging.warning(f"Could not parse __NEXT_DATA__: {e}")
         has_more = False
 
-    # Phase 2: Click "Voir plus" / "See more" to load remaining events
+    # Phase 2: Load the remaining events, from JSON when possible
     if has_more:
-        consecutive_failures = 0
-        max_failures = 3
-
-        while consecutive_failures < max_failures:
-            try:
-                page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                page.wait_for_timeout(1000)
-
-                # The new template uses a ShowMoreButton wrapper
-                show_more_button = page.locator(
-                    'div[class*="ShowMoreButton"] button, '
-                    'button:has-text("Voir plus"), '
-                    'button:has-text("See more")'
-                ).first
-
-                if show_more_button.is_visible(timeout=3000):
-                    show_more_button.scroll_into_view_if_needed()
-                    page.wait_for_timeout(500)
-                    show_more_button.click()
-                    consecutive_failures = 0
-                    page.wait_for_timeout(2000)
-                else:
-                    logging.debug("No more 'Show More' button visible")
-                    break
-
-            except PlaywrightTimeoutError:
-                consecutive_failures += 1
-                logging.debug(
-                    f"Timeout clicking 'Show More' (attempt {consecutive_failures}/{max_failures})"
-                )
-            except Exception as e:
-                consecutive_failures += 1
-                logging.warning(
-                    f"Error clicking 'Show More' (attempt {consecutive_failures}/{max_failures}): {e}"
-                )
-
-        # Collect newly loaded event links from the DOM
-        # Use desktop grid cards to avoid duplicates (mobile grid has same cards)
-        card_links = page.locator(
-            'div[class*="EventsBucket_gridDesktopContent"] '
-            'a[class*="EventCardLink_event-card-link"]'
-        ).all()
-
-        dom_links = set()
-        for link_el in card_links:
-            href = link_el.get_attribute("href")
-            if href:
-                # Eventbrite card links can be relative (e.g. /e/slug-12345)
-                if href.startswith("/"):
-                    # Construct absolute URL from the current page's origin
-                    origin = page.evaluate("window.location.origin")
-                    href = f"{origin}{href}"
-                dom_links.add(href)
+        more_links = None
+        organizer_id = organizer_id or extract_organizer_id(source["url"])
+        if organizer_id:
+            parsed_url = urlparse(page.url)
+            more_links = fetch_organizer_event_links(
+                f"{parsed_url.scheme}://{parsed_url.netloc}", organizer_id
+            )
+        if more_links is None:
+            logging.info("Falling back to clicking 'Show More'")
+            more_links = click_show_more_links(page)
 
         # Merge with __NEXT_DATA__ links (deduplicate by event ID)
         existing_ids = set()
@@ -159,12 +407,12 @@ def collect_event_links(page: Page, source: dict) -> list[str]:
             if eid:
                 existing_ids.add(eid)
 
-        for link in dom_links:
-            eid = extract_event_uuid(link)
+        for link, fingerprint in more_links.items():
+            # Strip tracking query params
+            clean_link = link.split("?")[0]
+            eid = extract_event_uuid(clean_link)
             if eid and eid not in existing_ids:
-                # Strip tracking query params
-                clean_link = link.split("?")[0]
-                all_links.append(clean_link)
+                all_links[clean_link] = fingerprint
                 existing_ids.add(eid)
 
     logging.info(f"Total links collected: {len(all_links)}")
@@ -192,35 +440,58 @@ def get_eventbrite_new_data(sources, service=None, options=None):
     if options and hasattr(options, "arguments") and len(options.arguments) > 0:
         headless = "-headless" in options.arguments
 
-    with managed_browser(headless=headless) as browser:
-        context = browser.new_context()
-        page = context.new_page()
-        records = []
-
-        for source in sources:
-            try:
-                logging.info(f"==================\nProcessing page {source}")
-                page.goto(source["url"], wait_until="domcontentloaded")
-                page.wait_for_timeout(3000)
-
-                delete_cookies_overlay(page)
-
-                # Phase 1: Collect all event links
-                links = collect_event_links(page, source)
+    try:
+        with managed_browser(headless=headless) as browser:
+            context = new_context(browser, storage_domain=STORAGE_DOMAIN)
+            page = context.new_page()
+            records = []
+
+            with PagePool(page, headless=headless, storage_domain=STORAGE_DOMAIN) as pool:
+                for source in sources:
+                    checkpoint = source_checkpoint(source)
+                    if checkpoint.done:
+                        logging.info(f"Reusing the checkpointed records of {source['url']}")
+                        records.extend(checkpoint.records)
+                        continue
+                    start = len(records)
+                    try:
+                        logging.info(f"==================\nProcessing page {source}")
+                        listing = checkpoint.listing
+                        if listing is None:
+                            goto(page, source["url"], wait_until="domcontentloaded")
+                            wait_for_network_idle(page, timeout=3000)
+
+                            delete_cookies_overlay(page)
+
+                            # Phase 1: Collect all event links
+                            listing = collect_event_links(page, source)
+                            checkpoint.save_listing(listing)
+
+                        # Reuse the records of the last run if the listing is unchanged
+                        source_cache = SourceCache(source, listing)
+                        cached = source_cache.records()
+                        if cached is not None:
+                            records.extend(cached)
+                            checkpoint.finish(cached)
+                            continue
 
-                # Phase 2: Process each event page
-                for link in links:
-                    event_records = process_event_page(page, link, source)
-                    records.extend(event_records)
+                        # Phase 2: Process each event page
+                        for event_records in process_events(pool, listing, source, checkpoint):
+                            records.extend(event_records)
+                        checkpoint.finish(records[start:])
+                        source_cache.save(records[start:])
 
-            except Exception as e:
-                logging.error(
-                    f"Failed to process source page {source.get('url', source)}: {e}",
-                    exc_info=True,
-                )
-                raise
+                    except Exception as e:
+                        logging.error(
+                            f"Failed to process source page {source.get('url', source)}: {e}",
+                            exc_info=True,
+                        )
+                        raise
 
-        context.close()
+            save_storage_state(context, STORAGE_DOMAIN)
+            context.close()
+    finally:
+        save_series_cache()
 
     return records
 
@@ -230,6 +501,273 @@ def parse_iso_datetime(iso_str: str) -> datetime:
     return datetime.fromisoformat(iso_str)
 
 
+def normalize_location(full_location: str) -> str:
+    """Collapse line breaks, repeated spaces and empty parts of an address string."""
+    full_location = full_location.replace("\n", ", ")
+    full_location = " ".join(full_location.split())
+    full_location = re.sub(r",\s*,", ",", full_location)
+    return full_location.strip(", ")
+
+
+def build_records(
+    source: dict,
+    event_info: list,
+    title: str,
+    description: str,
+    full_location: str,
+    location: tuple,
+    online: bool,
+    training: bool,
+    sold_out: bool,
+    kids: bool,
+) -> list[dict]:
+    """
+    Build one record per date session of an event.
+
+    Args:
+        source: Source page configuration dict
+        event_info: List of [uuid, start_datetime, end_datetime, link] lists
+        location: (location_name, address, city, department, zip_code,
+            country_code, latitude, longitude) tuple
+
+    Returns:
+        List of event records
+    """
+    records = []
+    (
+        location_name,
+        address,
+        city,
+        department,
+        zip_code,
+        country_code,
+        latitude,
+        longitude,
+    ) = location
+
+    for uuid, event_start_datetime, event_end_datetime, event_link in event_info:
+        record = get_record_dict(
+            f"{source['id']}-{uuid}",
+            source["id"],
+            title,
+            event_start_datetime,
+            event_end_datetime,
+            full_location,
+            location_name,
+            address,
+            city,
+            department,
+            zip_code,
+            country_code,
+            latitude,
+            longitude,
+            source.get(
+                "language_code",
+                detect_language_code(title, description),
+            ),
+            online,
+            training,
+            sold_out,
+            kids,
+            event_link,
+            event_link,
+            description,
+        )
+        records.append(record)
+        logging.info(f"Successfully scraped {event_link}\n{json.dumps(record, indent=4)}")
+
+    return records
+
+
+def _venue_location(venue: dict) -> str:
+    """Build an address string from the venue object of __NEXT_DATA__."""
+    address = venue.get("address") or {}
+    lines = (
+        address.get("localizedAddressDisplayLines")
+        or address.get("localized_multi_line_address_display")
+        or [address.get("localizedAddressDisplay") or address.get("localized_address_display")]
+    )
+    return normalize_location(", ".join(filter(None, [venue.get("name")] + list(lines))))
+
+
+def _next_data_description(next_data_ctx: dict) -> str:
+    """
+    Read the full overview of the event from the structured content of __NEXT_DATA__.
+
+    basicInfo.summary is only the teaser shown above the overview, so it is not used.
+    Returns an empty string if the page has no structured text.
+    """
+    modules = next_data_ctx.get("structuredContent", {}).get("modules", [])
+    texts = [inner_text(parse_html(module["text"])) for module in modules if module.get("text")]
+    return collapse_lines("\n".join(texts))
+
+
+def process_event_http(link: str, source: dict) -> list[dict] | None:
+    """
+    Process a single Eventbrite event page without a browser.
+
+    Event pages are server-rendered and embed all the data we need in
+    __NEXT_DATA__, so a plain HTTP request is enough for most of them.
+
+    Args:
+        link: URL of the event page
+        source: Source page configuration dict
+
+    Returns:
+        List of event records, or None if the page does not carry enough
+        structured data and has to be rendered in a browser instead.
+    """
+    logging.info(f"\n-> Fetching {link} ...")
+    try:
+        next_data = fetch_next_data(link)
+    except requests.RequestException as e:
+        logging.debug(f"Could not fetch {link}: {e}")
+        return None
+    return records_from_next_data(next_data, link, source)
+
+
+def records_from_next_data(next_data: dict | None, link: str, source: dict) -> list[dict] | None:
+    """
+    Build the records of an event page from its __NEXT_DATA__ alone.
+
+    Returns:
+        List of event records, or None if the structured data is incomplete
+        and the page has to be rendered in a browser instead.
+    """
+    next_data_ctx = (next_data or {}).get("props", {}).get("pageProps", {}).get("context")
+    if not next_data_ctx:
+        return None
+    basic_info = next_data_ctx.get("basicInfo", {})
+
+    status = basic_info.get("status", "")
+    if status == "cancelled" or basic_info.get("isCancelled", False):
+        logging.info("Rejecting record: event cancelled")
+        return []
+    if status == "completed":
+        logging.info("Rejecting record: event completed")
+        return []
+
+    sales_status = next_data_ctx.get("salesStatus", {}).get("salesStatus", "")
+    if sales_status in ("sold_out", "sales_ended"):
+        logging.info("Rejecting record: sold out")
+        return []
+
+    title = basic_info.get("name", "")
+    if not title:
+        return None
+    if is_plenary(title):
+        logging.info("Rejecting record: plenary")
+        return []
+
+    online = is_online(title) or basic_info.get("isOnline", False)
+
+    full_location = ""
+    location = ("",) * 8
+    if not online:
+        venue = basic_info.get("venue") or next_data_ctx.get("venue")
+        if not venue:
+            return None
+        full_location = _venue_location(venue)
+        if not full_location:
+            return None
+        try:
+            location = tuple(get_address(full_location).values())
+        except FreskError as error:
+            logging.info(f"Rejecting record: {error}.")
+            return []
+
+    description = _next_data_description(next_data_ctx)
+    if not description:
+        return None
+
+    if basic_info.get("isSeries", False):
+        series_id = basic_info.get("seriesId") or basic_info.get("id") or extract_event_uuid(link)
+        event_info = _fetch_series_events_from_api(series_id, link)
+        if not event_info:
+            return None
+    else:
+        start_local = basic_info.get("startDate", {}).get("local")
+        end_local = basic_info.get("endDate", {}).get("local")
+        uuid = extract_event_uuid(link)
+        if not start_local or not uuid:
+            return None
+        try:
+            event_start_datetime = parse_iso_datetime(start_local)
+            event_end_datetime = parse_iso_datetime(end_local) if end_local else None
+        except ValueError:
+            return None
+        if not event_end_datetime:
+            event_end_datetime = event_start_datetime + timedelta(hours=DEFAULT_DURATION)
+        event_info = [[uuid, event_start_datetime, event_end_datetime, link]]
+
+    return build_records(
+        source,
+        event_info,
+        title,
+        description,
+        full_location,
+        location,
+        online,
+        is_training(title),
+        False,
+        is_for_kids(title),
+    )
+
+
+def process_events(
+    pool: PagePool,
+    listing: dict[str, str | None],
+    source: dict,
+    checkpoint: SourceCheckpoint | None = None,
+) -> list[list[dict]]:
+    """
+    Process Eventbrite event pages, over plain HTTP when possible.
+
+    Events whose listing fingerprint is unchanged since an earlier run reuse
+    its records. The other pages are first fetched concurrently over HTTP,
+    which also expands the series concurrently. The browser pool is only used
+    for the pages whose __NEXT_DATA__ is missing or incomplete. Links already
+    finished in the checkpoint of the source are not fetched again, and the
+    others are saved to it as they finish.
+
+    Args:
+        listing: The listing fingerprint of each event link
+
+    Returns:
+        One list of records per link, in the order of the listing
+    """
+    checkpoint = checkpoint or SourceCheckpoint()
+    links = list(listing)
+    for link in links:
+        if not checkpoint.has_result(link):
+            cached = get_cached_event(source, extract_event_uuid(link), listing[link])
+            if cached is not None:
+                checkpoint.save_result(link, cached)
+
+    links_to_fetch = [link for link in links if not checkpoint.has_result(link)]
+    results = map_concurrently(lambda link: process_event_http(link, source), links_to_fetch)
+    for link, records in zip(links_to_fetch, results):
+        if records is not None:
+            cache_event(source, extract_event_uuid(link), listing[link], records)
+            checkpoint.save_result(link, records)
+
+    browser_links = [link for link, records in zip(links_to_fetch, results) if records is None]
+    if browser_links:
+        logging.info(
+            f"Structured data incomplete for {len(browser_links)} events, "
+            "rendering them in the browser"
+        )
+    process = skip_unchanged(
+        lambda page, link: process_event_page(page, link, source),
+        source,
+        listing,
+        extract_event_uuid,
+    )
+    pool.map(checkpoint.wrap(process), browser_links, timed_out=[])
+    # Events that timed out have no result
+    return [checkpoint.results.get(link, []) for link in links]
+
+
 def process_event_page(page: Page, link: str, source: dict) -> list[dict]:
     """
     Process a single Eventbrite event page (new template).
@@ -246,22 +784,66 @@ def process_event_page(page: Page, link: str, source: dict) -> list[dict]:
         List of event records (can be multiple for series/collection events)
     """
     logging.info(f"\n-> Processing {link} ...")
-    records = []
 
     try:
-        page.goto(link, wait_until="domcontentloaded")
-        page.wait_for_timeout(3000)
+        goto(page, link, wait_until="domcontentloaded")
+        wait_for_network_idle(page, timeout=3000)
         delete_cookies_overlay(page)
 
+        ################################################################
+        # Read all the fields of the page at once
+        ################################################################
+        wait_for_selector(page, '[data-testid="event-title"]')
+        fields = read_fields(page, EVENT_PAGE_FIELDS)
+        if fields is None:
+            logging.info("Rejecting record: page could not be read")
+            return []
+
+        if fields["read_more"]:
+            # Click "read more" to expand the full description
+            try:
+                page.locator(READ_MORE_SELECTOR).first.click(timeout=2000)
+                wait_for_dom_stable(page, quiet=200, timeout=1000)
+                expanded = read_fields(page, {"summary": EVENT_PAGE_FIELDS["summary"]})
+                if expanded is not None and expanded["summary"] is not None:
+                    fields["summary"] = expanded["summary"]
+            except PlaywrightTimeoutError:
+                pass
+
+        return records_from_page_fields(
+            fields, link, source, lambda ctx: extract_series_dates(page, link, ctx)
+        )
+
+    except Exception as e:
+        logging.error(f"Unexpected error processing event page {link}: {e}", exc_info=True)
+        raise
+
+
+def records_from_page_fields(
+    fields: dict, link: str, source: dict, series_dates=None
+) -> list[dict]:
+    """
+    Build the records of an event page from its EVENT_PAGE_FIELDS, as read by the browser.
+
+    Args:
+        fields: Values of EVENT_PAGE_FIELDS, with the expanded summary
+        link: URL of the event page
+        source: Source page configuration dict
+        series_dates: function returning the [uuid, start, end, link] lists of a series
+            event from its __NEXT_DATA__ context, series are skipped without it
+
+    Returns:
+        List of event records (can be multiple for series/collection events)
+    """
+    records = []
+
+    try:
         ################################################################
         # Extract __NEXT_DATA__ for structured fallback data
         ################################################################
         next_data_ctx = None
         try:
-            next_data_el = page.locator("script#__NEXT_DATA__")
-            next_data_el.wait_for(state="attached", timeout=5000)
-            raw_json = next_data_el.text_content()
-            next_data = json.loads(raw_json)
+            next_data = json.loads(fields["next_data"])
             next_data_ctx = next_data.get("props", {}).get("pageProps", {}).get("context", {})
         except Exception as e:
             logging.debug(f"Could not parse __NEXT_DATA__ on event page: {e}")
@@ -301,11 +883,8 @@ def process_event_page(page: Page, link: str, source: dict) -> list[dict]:
         ################################################################
         # Parse event title
         ################################################################
-        title_el = page.locator('[data-testid="event-title"]').first
-        try:
-            title_el.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-            title = title_el.text_content()
-        except PlaywrightTimeoutError:
+        title = fields["title"]
+        if title is None:
             # Fallback to __NEXT_DATA__
             if next_data_ctx:
                 title = next_data_ctx.get("basicInfo", {}).get("name", "")
@@ -326,14 +905,8 @@ def process_event_page(page: Page, link: str, source: dict) -> list[dict]:
             if next_data_ctx:
                 online = next_data_ctx.get("basicInfo", {}).get("isOnline", False)
             # Also check the venue element on the page
-            if not online:
-                venue_el = page.locator('[data-testid="event-venue"]').first
-                try:
-                    if venue_el.is_visible(timeout=2000):
-                        venue_text = venue_el.text_content()
-                        online = is_online(venue_text)
-                except PlaywrightTimeoutError:
-                    pass
+            if not online and fields["venue"] is not None:
+                online = is_online(fields["venue"])
 
         ################################################################
         # Location data
@@ -350,47 +923,19 @@ def process_event_page(page: Page, link: str, source: dict) -> list[dict]:
 
         if not online:
             # Try to get location from the DOM (full address section)
-            location_section = page.locator('[data-testid="section-wrapper-location"]').first
-            try:
-                location_section.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-
-                # Get venue name
-                venue_name_el = location_section.locator("address h3").first
-                try:
-                    if venue_name_el.is_visible(timeout=2000):
-                        location_name = venue_name_el.text_content().strip()
-                except PlaywrightTimeoutError:
-                    pass
-
-                # Get address lines
-                address_lines_els = location_section.locator(
-                    'address p[class*="Address_description"]'
-                ).all()
-                address_parts = []
-                for el in address_lines_els:
-                    text = el.text_content().strip()
-                    if text:
-                        address_parts.append(text)
+            if fields["location_section"]:
+                location_name = (fields["location_name"] or "").strip()
+                address_parts = [text.strip() for text in fields["address_lines"] if text.strip()]
                 full_location = ", ".join(filter(None, [location_name] + address_parts))
-
-            except PlaywrightTimeoutError:
+            else:
                 # Fallback: use compact venue text from hero area
-                venue_el = page.locator('[data-testid="event-venue"]').first
-                try:
-                    if venue_el.is_visible(timeout=2000):
-                        full_location = venue_el.inner_text().strip()
-                except PlaywrightTimeoutError:
-                    pass
+                full_location = (fields["venue_text"] or "").strip()
 
             if not full_location:
                 logging.info("Rejecting record: location not found for in-person event")
                 return records
 
-            # Normalize the location string
-            full_location = full_location.replace("\n", ", ")
-            full_location = " ".join(full_location.split())
-            full_location = re.sub(r",\s*,", ",", full_location)
-            full_location = full_location.strip(", ")
+            full_location = normalize_location(full_location)
 
             try:
                 address_dict = get_address(full_location)
@@ -411,30 +956,12 @@ def process_event_page(page: Page, link: str, source: dict) -> list[dict]:
         ################################################################
         # Description
         ################################################################
-        description = ""
-        description_el = page.locator('[data-testid="section-wrapper-overview"]').first
-        try:
-            description_el.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-            # Click "read more" if present to expand the full description
-            read_more_btn = description_el.locator('button[class*="Overview_readMore"]').first
-            try:
-                if read_more_btn.is_visible(timeout=1000):
-                    read_more_btn.click()
-                    page.wait_for_timeout(500)
-            except PlaywrightTimeoutError:
-                pass
-            summary_el = description_el.locator('div[class*="Overview_summary"]').first
-            description = summary_el.text_content()
-        except PlaywrightTimeoutError:
+        description = collapse_lines(fields["summary"] or "")
+        if not description and next_data_ctx:
             # Fallback to __NEXT_DATA__
-            if next_data_ctx:
-                description = next_data_ctx.get("basicInfo", {}).get("summary", "")
-                if not description:
-                    modules = next_data_ctx.get("structuredContent", {}).get("modules", [])
-                    if modules:
-                        # Strip HTML tags from the structured content
-                        html_desc = modules[0].get("text", "")
-                        description = re.sub(r"<[^>]+>", "", html_desc)
+            description = _next_data_description(next_data_ctx) or collapse_lines(
+                next_data_ctx.get("basicInfo", {}).get("summary", "")
+            )
 
         if not description:
             logging.info("Rejecting record: description not found")
@@ -460,18 +987,13 @@ def process_event_page(page: Page, link: str, source: dict) -> list[dict]:
 
         if not is_series:
             # Also check the date text on the page
-            date_el = page.locator('[data-testid="event-datetime"]').first
-            try:
-                date_el.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-                date_text = date_el.text_content().strip()
+            if fields["date_text"] is not None:
                 is_series = bool(
                     re.match(
                         r"(?i)^\s*(multiple dates|plusieurs dates|dates multiples|mehrere termine)\s*$",
-                        date_text,
+                        fields["date_text"].strip(),
                     )
                 )
-            except PlaywrightTimeoutError:
-                pass
 
         event_info = []
 
@@ -479,7 +1001,10 @@ def process_event_page(page: Page, link: str, source: dict) -> list[dict]:
             ################################################################
             # Series event: extract dates from the collection modal
             ################################################################
-            event_info = extract_series_dates(page, link, next_data_ctx)
+            if series_dates is None:
+                logging.info("Rejecting record: series dates cannot be read")
+                return records
+            event_info = series_dates(next_data_ctx)
         else:
             ################################################################
             # Single event: parse the date from the page
@@ -508,12 +1033,14 @@ def process_event_page(page: Page, link: str, source: dict) -> list[dict]:
 
             # Fallback: parse date text from the DOM
             if not event_start_datetime:
-                date_el = page.locator('[data-testid="event-datetime"]').first
+                if fields["date_text"] is None:
+                    logging.info("Rejecting record: date not found")
+                    return records
                 try:
-                    date_el.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-                    date_text = date_el.text_content().strip()
-                    event_start_datetime, event_end_datetime = get_dates(date_text)
-                except (PlaywrightTimeoutError, FreskDateBadFormat) as error:
+                    event_start_datetime, event_end_datetime = get_dates(
+                        fields["date_text"].strip()
+                    )
+                except FreskDateBadFormat as error:
                     logging.info(f"Rejecting record: {error}")
                     return records
 
@@ -534,14 +1061,13 @@ def process_event_page(page: Page, link: str, source: dict) -> list[dict]:
         ################################################################
         # Build records for all date sessions
         ################################################################
-        for uuid, event_start_datetime, event_end_datetime, event_link in event_info:
-            record = get_record_dict(
-                f"{source['id']}-{uuid}",
-                source["id"],
-                title,
-                event_start_datetime,
-                event_end_datetime,
-                full_location,
+        records = build_records(
+            source,
+            event_info,
+            title,
+            description,
+            full_location,
+            (
                 location_name,
                 address,
                 city,
@@ -550,27 +1076,16 @@ def process_event_page(page: Page, link: str, source: dict) -> list[dict]:
                 country_code,
                 latitude,
                 longitude,
-                source.get(
-                    "language_code",
-                    detect_language_code(title, description),
-                ),
-                online,
-                training,
-                sold_out,
-                kids,
-                event_link,
-                event_link,
-                description,
-            )
-            records.append(record)
-            logging.info(f"Successfully scraped {event_link}\n{json.dumps(record, indent=4)}")
+            ),
+            online,
+            training,
+            sold_out,
+            kids,
+        )
 
     except (FreskDateBadFormat, FreskError) as e:
         logging.info(f"Skipping event {link}: {e}")
         return records
-    except Exception as e:
-        logging.error(f"Unexpected error processing event page {link}: {e}", exc_info=True)
-        raise
 
     return records
 
@@ -622,13 +1137,23 @@ def extract_series_dates(page: Page, link: str, next_data_ctx: dict | None) -> l
     # Fallback: scrape the checkout modal (legacy approach)
     # ------------------------------------------------------------------
     logging.info("API approach failed, falling back to modal scraping...")
-    return _extract_series_dates_from_modal(page, link, base_uuid)
+    event_info = _extract_series_dates_from_modal(page, link, base_uuid)
+    if event_info:
+        _cache_series(series_id, event_info)
+    return event_info
+
+
+# Series API domains whose last call failed, shared by all the threads of the process
+_failing_api_domains = set()
 
 
 def _fetch_series_events_from_api(series_id: str, link: str) -> list:
     """Fetch child events for a series via the Eventbrite public API.
 
-    Tries both ``.fr`` and ``.com`` domains.  Paginates if necessary.
+    Tries both ``.fr`` and ``.com`` domains, skipping one that failed
+    earlier in the run.  Paginates if necessary, unless the first page shows
+    that a cached expansion of the series is still up to date.  The cached
+    occurrences are also used when the API cannot be reached at all.
 
     Returns:
         List of [uuid, start_datetime, end_datetime, child_link] lists
@@ -642,25 +1167,49 @@ def _fetch_series_events_from_api(series_id: str, link: str) -> list:
     else:
         domains = ["www.eventbrite.com", "www.eventbrite.fr"]
 
+    # Don't retry a domain already known to fail while another one still works
+    working_domains = [domain for domain in domains if domain not in _failing_api_domains]
+    domains = working_domains or domains
+
+    cached = _get_cached_series(series_id)
+
     for domain in domains:
         try:
-            event_info = _fetch_all_pages(domain, series_id)
+            event_info, object_count = _fetch_all_pages(domain, series_id, cached)
+            _failing_api_domains.discard(domain)
             if event_info:
                 logging.info(
                     f"Fetched {len(event_info)} child events from API "
                     f"({domain}) for series {series_id}"
                 )
+                # Keep the original timestamp of revalidated entries, so that
+                # they are fully refetched once they get too old
+                if not cached or event_info is not cached["events"]:
+                    _cache_series(series_id, event_info, object_count)
                 return event_info
-        except Exception as e:
+        except requests.RequestException as e:
             logging.debug(f"API call to {domain} failed: {e}")
+            _failing_api_domains.add(domain)
             continue
 
+    if cached and cached["events"]:
+        logging.info(f"Using {len(cached['events'])} cached child events for series {series_id}")
+        return cached["events"]
+
     logging.warning(f"Could not fetch series events from API for series {series_id}")
     return event_info
 
 
-def _fetch_all_pages(domain: str, series_id: str) -> list:
-    """Fetch all pages of child events from the series API endpoint."""
+def _fetch_all_pages(domain: str, series_id: str, cached: dict | None = None) -> tuple:
+    """Fetch all pages of child events from the series API endpoint.
+
+    When the series spans several pages and its child count did not change
+    since it was cached, the cached occurrences are returned after the
+    first page.
+
+    Returns:
+        (event_info, object_count) tuple
+    """
     event_info = []
     page_number = 1
 
@@ -671,34 +1220,31 @@ def _fetch_all_pages(domain: str, series_id: str) -> list:
         )
         logging.debug(f"Fetching series API: {url}")
 
-        req = urllib.request.Request(
-            url,
-            headers={
-                "User-Agent": (
-                    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
-                    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                ),
-                "Accept": "application/json",
-            },
-        )
-
         try:
-            with urllib.request.urlopen(req, timeout=15) as response:
-                data = json.loads(response.read().decode("utf-8"))
-        except (urllib.error.HTTPError, urllib.error.URLError) as e:
+            data = fetch_json(url)
+        except requests.RequestException as e:
             logging.debug(f"HTTP error fetching {url}: {e}")
             raise
 
         events = data.get("events", [])
         pagination = data.get("pagination", {})
+        object_count = pagination.get("object_count")
+
+        if (
+            page_number == 1
+            and cached
+            and pagination.get("has_more_items", False)
+            and object_count is not None
+            and object_count == cached["object_count"]
+        ):
+            logging.debug(f"Series {series_id} unchanged since cached ({object_count} children)")
+            return cached["events"], object_count
 
         for ev in events:
             status = ev.get("status", "")
             # Skip completed / cancelled / draft events
             if status not in ("live", "started"):
-                logging.debug(
-                    f"Skipping child event {ev.get('id')} with status '{status}'"
-                )
+                logging.debug(f"Skipping child event {ev.get('id')} with status '{status}'")
                 continue
 
             start_info = ev.get("start", {})
@@ -742,7 +1288,7 @@ def _fetch_all_pages(domain: str, series_id: str) -> list:
         else:
             break
 
-    return event_info
+    return event_info, object_count
 
 
 def _extract_series_dates_from_modal(page: Page, link: str, base_uuid: str) -> list:
@@ -873,8 +1419,6 @@ def _extract_series_dates_from_modal(page: Page, link: str, base_uuid: str) -> l
                         except PlaywrightTimeoutError:
                             logging.warning(f"Time slot list did not load for date: {date_text}")
                             continue
-
-                        page.wait_for_timeout(500)
                     except Exception as e:
                         logging.debug(f"Could not click date card: {e}")
 
@@ -0,0 +1,169 @@
+import copy
+import json
+import logging
+
+from trouver_une_fresque_scraper.scraper import eventbrite_new
+from trouver_une_fresque_scraper.utils.fields import read_html_fields
+from trouver_une_fresque_scraper.utils.html import collapse_lines, parse_html
+from trouver_une_fresque_scraper.utils.http import parse_next_data
+from trouver_une_fresque_scraper.utils.testing import (
+    collected_errors,
+    same_records,
+    temporary_config,
+)
+
+
+LINK = "https://www.eventbrite.fr/e/fresque-du-climat-en-ligne-tickets-1234567890"
+SOURCE = {"id": 200, "url": "https://www.eventbrite.fr/o/fresque-123", "language_code": "fr"}
+
+# __NEXT_DATA__ of an online event page, as served over HTTP
+NEXT_DATA = {
+    "props": {
+        "pageProps": {
+            "context": {
+                "basicInfo": {
+                    "name": "Fresque du Climat en ligne",
+                    "status": "live",
+                    "isOnline": True,
+                    "isSeries": False,
+                    "summary": "Un atelier de 3h pour comprendre le climat.",
+                    "startDate": {"local": "2026-11-05T18:30:00"},
+                    "endDate": {"local": "2026-11-05T21:30:00"},
+                },
+                "salesStatus": {"salesStatus": "on_sale"},
+                "structuredContent": {
+                    "modules": [
+                        {
+                            "type": "text",
+                            "text": "<p>Un atelier de 3h pour comprendre le climat.</p>"
+                            "<p>Venez <strong>nombreux</strong> !<br>Inscription gratuite.</p>",
+                        },
+                        {"type": "image", "url": "https://img.evbuc.com/1.jpg"},
+                    ]
+                },
+            }
+        }
+    }
+}
+
+# EVENT_PAGE_FIELDS read by the browser on the same page, once "read more" was clicked
+PAGE_FIELDS = {
+    "next_data": json.dumps(NEXT_DATA),
+    "title": "Fresque du Climat en ligne",
+    "venue": "Online",
+    "venue_text": "Online",
+    "location_section": False,
+    "location_name": None,
+    "address_lines": [],
+    "summary": "Un atelier de 3h pour comprendre le climat.\n\nVenez nombreux !\n"
+    "Inscription gratuite.",
+    "read_more": True,
+    "date_text": "Thursday, November 5 · 6:30 - 9:30pm CET",
+}
+
+# The same page as served over HTTP, Next.js escapes "<" in its JSON
+NEXT_DATA_SCRIPT = json.dumps(NEXT_DATA).replace("<", "\\u003c")
+PAGE_HTML = f"""<!DOCTYPE html>
+<html>
+<head>
+<title>Fresque du Climat en ligne Tickets</title>
+<script id="__NEXT_DATA__" type="application/json">{NEXT_DATA_SCRIPT}</script>
+</head>
+<body>
+<main>
+<h1 data-testid="event-title" class="event-title">Fresque du Climat en ligne</h1>
+<div data-testid="event-datetime">Thursday, November 5 · 6:30 - 9:30pm CET</div>
+<div data-testid="event-venue">Online</div>
+<section data-testid="section-wrapper-overview">
+<h2>Overview</h2>
+<div class="Overview_summary__x1y2z">
+<p>Un atelier de 3h pour comprendre le climat.</p>
+<p>Venez <strong>nombreux</strong> !<br>Inscription gratuite.</p>
+</div>
+<button class="Overview_readMore__a1b2c">Read more</button>
+</section>
+</main>
+</body>
+</html>
+"""
+
+DESCRIPTION = "Un atelier de 3h pour comprendre le climat.\nVenez nombreux !\nInscription gratuite."
+
+
+def endless_listing(url):
+    """Stands in for fetch_json on an organizer endpoint that always has a next page."""
+    page = url.split("page=")[-1]
+    return {"data": {"events": [{"url": f"{LINK}?page={page}"}], "has_next_page": True}}
+
+
+def fetch_capped_listing():
+    fetch_json = eventbrite_new.fetch_json
+    eventbrite_new.fetch_json = endless_listing
+    try:
+        # The cap is logged as a warning
+        with collected_errors():
+            return eventbrite_new.fetch_organizer_event_links("https://www.eventbrite.fr", "123")
+    finally:
+        eventbrite_new.fetch_json = fetch_json
+
+
+def run_tests():
+    teaser_only = copy.deepcopy(NEXT_DATA)
+    del teaser_only["props"]["pageProps"]["context"]["structuredContent"]
+
+    html_fields = read_html_fields(parse_html(PAGE_HTML), eventbrite_new.EVENT_PAGE_FIELDS, LINK)
+
+    with temporary_config(timezone="Europe/Paris"):
+        http_records = eventbrite_new.records_from_next_data(NEXT_DATA, LINK, SOURCE)
+        page_records = eventbrite_new.records_from_next_data(
+            parse_next_data(PAGE_HTML), LINK, SOURCE
+        )
+        html_records = eventbrite_new.records_from_page_fields(html_fields, LINK, SOURCE)
+        browser_records = eventbrite_new.records_from_page_fields(PAGE_FIELDS, LINK, SOURCE)
+        teaser_records = eventbrite_new.records_from_next_data(teaser_only, LINK, SOURCE)
+
+    # tuple fields:
+    # 1. Test case name
+    # 2. Actual value
+    # 3. Expected value
+    test_cases = [
+        (
+            "HTTP description is the full overview",
+            [record["description"] for record in http_records or []],
+            [DESCRIPTION],
+        ),
+        same_records("HTTP and browser records match", http_records, browser_records),
+        ("teaser only falls back to the browser", teaser_records, None),
+        ("listing longer than the page cap falls back", fetch_capped_listing(), None),
+        ("__NEXT_DATA__ parsed from the page", parse_next_data(PAGE_HTML), NEXT_DATA),
+        ("page without __NEXT_DATA__", parse_next_data("<html><body></body></html>"), None),
+        (
+            "truncated __NEXT_DATA__",
+            parse_next_data(
+                '<script id="__NEXT_DATA__" type="application/json">{"props": </script>'
+            ),
+            None,
+        ),
+        (
+            "EVENT_PAGE_FIELDS read from the page",
+            {
+                **html_fields,
+                "next_data": json.loads(html_fields["next_data"]),
+                "summary": collapse_lines(html_fields["summary"]),
+            },
+            {
+                **PAGE_FIELDS,
+                "next_data": NEXT_DATA,
+                "summary": collapse_lines(PAGE_FIELDS["summary"]),
+            },
+        ),
+        same_records("page __NEXT_DATA__ and fields records match", page_records, html_records),
+        same_records("page and browser records match", html_records, browser_records),
+    ]
+
+    for name, actual, expected in test_cases:
+        logging.info(f"Running {name}")
+        if actual == expected:
+            logging.info("Result matches")
+        else:
+            logging.error(f"{name}: expected {expected} but got {actual}")
@@ -1,17 +1,43 @@
+import asyncio
 import json
 import re
 import logging
 
-from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+import requests
+
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 
 from trouver_une_fresque_scraper.db.records import get_record_dict
-from trouver_une_fresque_scraper.utils.browser import managed_browser, DEFAULT_TIMEOUT
+from trouver_une_fresque_scraper.utils.browser import (
+    async_goto,
+    gather_pages,
+    managed_async_browser,
+    new_async_context,
+    DEFAULT_TIMEOUT,
+)
+from trouver_une_fresque_scraper.utils.checkpoint import source_checkpoint
+from trouver_une_fresque_scraper.utils.concurrency import async_single_flight
 from trouver_une_fresque_scraper.utils.date_and_time import get_dates
 from trouver_une_fresque_scraper.utils.errors import (
     FreskError,
     FreskDateBadFormat,
     FreskLanguageNotRecognized,
 )
+from trouver_une_fresque_scraper.utils.event_cache import (
+    listing_fingerprint,
+    skip_unchanged,
+    SourceCache,
+)
+from trouver_une_fresque_scraper.utils.fields import (
+    async_read_fields,
+    field,
+    present,
+    read_html_fields,
+)
+from trouver_une_fresque_scraper.utils.html import collapse_lines, select, select_one
+from trouver_une_fresque_scraper.utils.http import fetch_html, map_concurrently
 from trouver_une_fresque_scraper.utils.keywords import (
     is_training,
     is_sold_out,
@@ -19,6 +45,36 @@ from trouver_une_fresque_scraper.utils.keywords import (
 )
 from trouver_une_fresque_scraper.utils.language import get_language_code
 from trouver_une_fresque_scraper.utils.location import get_address
+from trouver_une_fresque_scraper.utils.waits import (
+    async_wait_for_selector,
+    async_wait_until_changed,
+    POLL_INTERVAL,
+)
+
+
+# Query parameters holding the page number in the pagination links of the listing iframe
+PAGE_PARAMS = ("page", "p", "page_number", "pagenumber")
+
+# Links of a listing page and the text of their row, read in a single round trip. The
+# resolved href property is read, as page.goto() can't handle the raw relative paths.
+LISTING_FIELDS = {
+    "hrefs": field("a.link-dark", prop="href", all=True),
+    "rows": field("a.link-dark", prop="innerText", closest="tr", all=True),
+    "parents": field("a.link-dark", prop="innerText", up=1, all=True),
+}
+
+# Fields of an event page, read in a single round trip by process_event_page
+EVENT_FIELDS = {
+    "title": field("h3", prop="innerText"),
+    "event_time": field(".fa-clock", prop="innerText", up=1),
+    "language": field("div.mb-3 > i.fa-globe", prop="innerText", up=1),
+    "online": present(".fa-video"),
+    "full_location": field(".fa-map-pin", prop="innerText", up=1),
+    "description": field("strong", prop="innerText", up=1, has_text="Description"),
+    "attendance": field(".fa-user", prop="innerText", up=2),
+    "tickets_link": field(".fa-user", prop="href", up=1),
+}
+REQUIRED_EVENT_FIELDS = ("title", "event_time", "description", "attendance")
 
 
 def extract_event_uuid(link: str) -> str | None:
@@ -28,43 +84,52 @@ def extract_event_uuid(link: str) -> str | None:
     return uuids[0] if uuids else None
 
 
-def collect_links_from_iframe(page: Page, source: dict) -> list[str]:
+async def collect_links_from_iframe(page: Page, source: dict) -> dict[str, str | None]:
     """
     Collect all event links from the listing page, handling pagination.
 
     Navigates the iframe's pagination to gather links across all pages,
     without ever leaving the listing page.
+
+    Returns:
+        The listing fingerprint of each event link, taken from the text of its row
     """
-    all_links = []
+    all_links = {}
 
     while True:
         iframe = page.frame_locator("iframe")
 
         # Wait for iframe content to load
         try:
-            iframe.locator("a.link-dark").first.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
+            await iframe.locator("a.link-dark").first.wait_for(
+                state="visible", timeout=DEFAULT_TIMEOUT
+            )
         except PlaywrightTimeoutError:
             logging.warning(f"No events found in iframe for {source['url']}")
             break
 
-        link_elements = iframe.locator("a.link-dark").all()
-        for el in link_elements:
-            # Use evaluate to get the resolved absolute URL (get_attribute
-            # returns the raw relative path, which page.goto() can't handle)
-            href = el.evaluate("node => node.href")
-            if href:
-                all_links.append(href)
+        fields = await async_read_fields(iframe.locator("body"), LISTING_FIELDS)
+        if fields is None:
+            logging.warning(f"Could not read the iframe of {source['url']}")
+            break
+        all_links.update(listing_from_fields(fields))
 
-        logging.info(f"Collected {len(link_elements)} links from current page")
+        logging.info(f"Collected {len(fields['hrefs'])} links from current page")
 
         # Try clicking "Suivant" for pagination
         try:
             next_button = iframe.locator("a.page-link:has-text('Suivant')")
-            if next_button.is_visible(timeout=2000):
-                next_button.scroll_into_view_if_needed()
-                page.wait_for_timeout(500)
-                next_button.click()
-                page.wait_for_timeout(5000)
+            if await next_button.is_visible():
+                first_link = iframe.locator("a.link-dark").first
+                first_href = await first_link.evaluate("node => node.href")
+                await next_button.click()
+                # The next page is loaded once the first link points to another event
+                if not await async_wait_until_changed(
+                    lambda: first_link.evaluate("node => node.href", timeout=POLL_INTERVAL),
+                    first_href,
+                ):
+                    logging.warning("Next listing page did not load")
+                    break
             else:
                 break
         except PlaywrightTimeoutError:
@@ -74,12 +139,91 @@ def collect_links_from_iframe(page: Page, source: dict) -> list[str]:
     return all_links
 
 
+def listing_from_fields(fields: dict) -> dict[str, str | None]:
+    """Maps the links of a listing page to their listing fingerprint, from its LISTING_FIELDS."""
+    return {
+        href: listing_fingerprint(row_text or parent_text)
+        for href, row_text, parent_text in zip(fields["hrefs"], fields["rows"], fields["parents"])
+        if href
+    }
+
+
+def _listing_links(doc, iframe_url: str) -> dict[str, str | None]:
+    return listing_from_fields(read_html_fields(doc, LISTING_FIELDS, base_url=iframe_url))
+
+
+def _page_numbers(doc, iframe_url: str) -> dict[int, str]:
+    """Maps the page numbers linked by the pagination of a listing page to their URL."""
+    pages = {}
+    for a in select(doc, "a.page-link"):
+        url = urljoin(iframe_url, a.get("href", ""))
+        for name, value in parse_qsl(urlsplit(url).query):
+            if name.lower() in PAGE_PARAMS and value.isdigit():
+                pages[int(value)] = url
+    return pages
+
+
+def _with_page(url: str, number: int) -> str:
+    """Returns url with its page query parameter set to number."""
+    parts = urlsplit(url)
+    query = [
+        (name, str(number) if name.lower() in PAGE_PARAMS and value.isdigit() else value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+    ]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def get_event_links_http(source: dict) -> dict[str, str | None] | None:
+    """
+    Reads the event links of the listing iframe without a browser.
+
+    The iframe is a server-rendered paginated listing. Its first page gives the page count,
+    then the other pages are fetched in parallel. Pagination that only shows a window of
+    pages is followed until no new page number shows up.
+
+    Returns:
+        The listing fingerprint of each event link, taken from the text of its row, or None
+        if the listing could not be read over HTTP
+    """
+    try:
+        doc = fetch_html(source["url"])
+        iframe = select_one(doc, "iframe")
+        if iframe is None or not iframe.get("src"):
+            return None
+        iframe_url = urljoin(source["url"], iframe.get("src"))
+        first_page = fetch_html(iframe_url)
+
+        links = _listing_links(first_page, iframe_url)
+        pages = _page_numbers(first_page, iframe_url)
+        if not pages and select(first_page, "a.page-link"):
+            # Pages are switched by scripts, only a browser can read them
+            logging.info(f"Listing pagination of {source['url']} is not made of links")
+            return None
+
+        fetched = {1}
+        while missing := sorted(set(pages) - fetched):
+            urls = [_with_page(pages[number], number) for number in missing]
+            for page_doc in map_concurrently(fetch_html, urls):
+                links.update(_listing_links(page_doc, iframe_url))
+                pages.update(_page_numbers(page_doc, iframe_url))
+            fetched.update(missing)
+    except requests.RequestException as e:
+        logging.info(f"Could not fetch {source['url']} over HTTP: {e}")
+        return None
+
+    logging.info(f"Collected {len(links)} links from {len(fetched)} listing pages over HTTP")
+    return links
+
+
 # ==================== Main Entry Point ====================
 
 
 def get_fdc_data(sources, service=None, options=None):
     """
-    Scrape FDC (Fresque du Climat) events using Playwright.
+    Scrape FDC (Fresque du Climat) events over plain HTTP, falling back to Playwright.
+
+    Event pages are processed concurrently by the async Playwright engine, on up to
+    page_concurrency pages (config key).
 
     Args:
         sources: List of source page configurations (dicts with 'id' and 'url')
@@ -95,24 +239,56 @@ def get_fdc_data(sources, service=None, options=None):
     if options and hasattr(options, "arguments") and len(options.arguments) > 0:
         headless = "-headless" in options.arguments
 
-    with managed_browser(headless=headless) as browser:
-        context = browser.new_context()
-        page = context.new_page()
-        records = []
+    return asyncio.run(scrape_sources(sources, headless))
+
+
+async def scrape_sources(sources: list[dict], headless: bool) -> list[dict]:
+    """Scrape the FDC sources one after the other in a single async browser."""
+    records = []
+
+    async with managed_async_browser(headless=headless) as browser:
+        context = await new_async_context(browser)
+        page = await context.new_page()
 
         for source in sources:
+            checkpoint = source_checkpoint(source)
+            if checkpoint.done:
+                logging.info(f"Reusing the checkpointed records of {source['url']}")
+                records.extend(checkpoint.records)
+                continue
+            start = len(records)
             try:
                 logging.info(f"========================\nProcessing source {source}")
-                page.goto(source["url"], wait_until="domcontentloaded")
-
-                # Phase 1: Collect all event links across pagination pages
-                links = collect_links_from_iframe(page, source)
-
-                # Phase 2: Process each event page
-                for link in links:
-                    event_record = process_event_page(page, link, source)
+                listing = checkpoint.listing
+                if listing is None:
+                    # Phase 1: Collect all event links across pagination pages, over plain
+                    # HTTP unless the listing needs a browser
+                    listing = await asyncio.to_thread(get_event_links_http, source)
+                    if listing is None:
+                        await async_goto(page, source["url"], wait_until="domcontentloaded")
+                        listing = await collect_links_from_iframe(page, source)
+                    checkpoint.save_listing(listing)
+
+                # Reuse the records of the last run if the listing is unchanged
+                source_cache = SourceCache(source, listing)
+                cached = source_cache.records()
+                if cached is not None:
+                    records.extend(cached)
+                    checkpoint.finish(cached)
+                    continue
+
+                # Phase 2: Process each event page, unless unchanged since the last run
+                async def process_link(page, link):
+                    return await process_event_page_once(page, link, source)
+
+                process = skip_unchanged(process_link, source, listing, extract_event_uuid)
+                for event_record in await gather_pages(
+                    context, checkpoint.wrap(process), list(listing)
+                ):
                     if event_record:
                         records.append(event_record)
+                checkpoint.finish(records[start:])
+                source_cache.save(records[start:])
 
             except Exception as e:
                 logging.error(
@@ -121,12 +297,62 @@ def get_fdc_data(sources, service=None, options=None):
                 )
                 raise
 
-        context.close()
+        await context.close()
 
     return records
 
 
-def process_event_page(page: Page, link: str, source: dict) -> dict | None:
+async def process_event_page_once(page: Page, link: str, source: dict) -> dict | None:
+    """
+    Process an FDC event page once, while its record stays in the single_flight cache.
+
+    The same event can be listed by several sources (workshops and trainings,
+    languages, countries), so its record is shared by all the sources with
+    the same workshop type.
+    """
+    key = ("fdc", extract_event_uuid(link) or link, source["id"])
+    return await async_single_flight(key, lambda: process_event(page, link, source))
+
+
+async def process_event(page: Page, link: str, source: dict) -> dict | None:
+    """Process an FDC event page over plain HTTP, or with page if it cannot be read that way."""
+    event_records = await asyncio.to_thread(process_event_http, link, source)
+    if event_records is not None:
+        return event_records[0] if event_records else None
+    logging.info(f"Falling back to Playwright for {link}")
+    return await process_event_page(page, link, source)
+
+
+def process_event_http(link: str, source: dict) -> list[dict] | None:
+    """
+    Process a single FDC event page over plain HTTP.
+
+    Reads EVENT_FIELDS from the server-rendered HTML, like process_event_page does in the
+    browser, and builds the record the same way.
+
+    Returns:
+        A list with the event record, an empty list if the event should be skipped, or None
+        if an expected element is missing from the HTML and the page has to be rendered by a
+        browser
+    """
+    logging.info(f"\n-> Fetching {link} ...")
+
+    try:
+        doc = fetch_html(link)
+    except requests.RequestException as e:
+        logging.info(f"Could not fetch {link} over HTTP: {e}")
+        return None
+
+    fields = read_html_fields(doc, EVENT_FIELDS, base_url=link)
+    if any(fields[name] is None for name in REQUIRED_EVENT_FIELDS):
+        return None
+    if not fields["online"] and fields["full_location"] is None:
+        return None
+    record = record_from_fields(fields, link, source)
+    return [record] if record is not None else []
+
+
+async def process_event_page(page: Page, link: str, source: dict) -> dict | None:
     """
     Process a single FDC event page.
 
@@ -141,8 +367,47 @@ def process_event_page(page: Page, link: str, source: dict) -> dict | None:
     logging.info(f"\n-> Processing {link} ...")
 
     try:
-        page.goto(link, wait_until="domcontentloaded")
+        await async_goto(page, link, wait_until="domcontentloaded")
+
+        ################################################################
+        # Read all the fields at once
+        ################################################################
+        await async_wait_for_selector(page, "h3")
+        fields = await async_read_fields(page, EVENT_FIELDS, required=REQUIRED_EVENT_FIELDS)
+        if fields is None:
+            logging.info("Rejecting record: page could not be read")
+            return None
+        for name in REQUIRED_EVENT_FIELDS:
+            if fields[name] is None:
+                logging.info(f"Rejecting record: {name} not found")
+                return None
+
+        return record_from_fields(fields, link, source)
+
+    except (FreskDateBadFormat, FreskError) as e:
+        logging.info(f"Skipping event {link}: {e}")
+        return None
+    except Exception as e:
+        logging.error(f"Unexpected error processing event page {link}: {e}", exc_info=True)
+        raise
+
+
+def record_from_fields(fields: dict, link: str, source: dict) -> dict | None:
+    """
+    Build the record of an FDC event page from its EVENT_FIELDS.
+
+    Shared by process_event_page, which reads the fields in the browser, and
+    process_event_http, which reads them from the server-rendered HTML.
+
+    Args:
+        fields: Values of EVENT_FIELDS, with all of REQUIRED_EVENT_FIELDS set
+        link: URL of the event page
+        source: Source page configuration dict
 
+    Returns:
+        Event record dict, or None if the event should be skipped
+    """
+    try:
         ################################################################
         # Parse event id
         ################################################################
@@ -154,17 +419,12 @@ def process_event_page(page: Page, link: str, source: dict) -> dict | None:
         ################################################################
         # Parse event title
         ################################################################
-        title_el = page.locator("h3").first
-        title_el.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-        title = title_el.inner_text()
+        title = fields["title"]
 
         ################################################################
         # Parse start and end dates
         ################################################################
-        clock_icon = page.locator(".fa-clock").first
-        clock_icon.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-        parent_div = clock_icon.locator("xpath=..")
-        event_time = parent_div.inner_text().strip()
+        event_time = fields["event_time"].strip()
 
         try:
             event_start_datetime, event_end_datetime = get_dates(event_time)
@@ -176,22 +436,18 @@ def process_event_page(page: Page, link: str, source: dict) -> dict | None:
         # Workshop language
         ################################################################
         language_code = None
-        try:
-            globe_icon = page.locator("div.mb-3 > i.fa-globe").first
-            globe_icon.wait_for(state="visible", timeout=2000)
-            parent = globe_icon.locator("xpath=..")
-            language_code = get_language_code(parent.inner_text())
-        except FreskLanguageNotRecognized as e:
-            logging.warning(f"Unable to parse workshop language: {e}")
-            language_code = None
-        except (PlaywrightTimeoutError, Exception):
+        if fields["language"] is None:
             logging.warning("Unable to find workshop language on the page.")
-            language_code = None
+        else:
+            try:
+                language_code = get_language_code(fields["language"])
+            except FreskLanguageNotRecognized as e:
+                logging.warning(f"Unable to parse workshop language: {e}")
 
         ################################################################
         # Is it an online event?
         ################################################################
-        online = page.locator(".fa-video").count() > 0
+        online = fields["online"]
 
         ################################################################
         # Location data
@@ -207,10 +463,10 @@ def process_event_page(page: Page, link: str, source: dict) -> dict | None:
         country_code = ""
 
         if not online:
-            pin_icon = page.locator(".fa-map-pin").first
-            pin_icon.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-            parent_div = pin_icon.locator("xpath=..")
-            full_location = parent_div.inner_text()
+            full_location = fields["full_location"]
+            if full_location is None:
+                logging.info("Rejecting record: location not found")
+                return None
 
             try:
                 logging.info(f"Full location: {full_location}")
@@ -232,10 +488,7 @@ def process_event_page(page: Page, link: str, source: dict) -> dict | None:
         ################################################################
         # Description
         ################################################################
-        description_title_el = page.locator("strong:has-text('Description')").first
-        description_title_el.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-        parent_description_el = description_title_el.locator("xpath=..")
-        description = parent_description_el.inner_text()
+        description = collapse_lines(fields["description"])
 
         ################################################################
         # Training?
@@ -245,10 +498,7 @@ def process_event_page(page: Page, link: str, source: dict) -> dict | None:
         ################################################################
         # Is it full?
         ################################################################
-        user_icon = page.locator(".fa-user").first
-        user_icon.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-        parent_container = user_icon.locator("xpath=../..")
-        sold_out = is_sold_out(parent_container.inner_text())
+        sold_out = is_sold_out(fields["attendance"])
 
         ################################################################
         # Is it suited for kids?
@@ -258,9 +508,7 @@ def process_event_page(page: Page, link: str, source: dict) -> dict | None:
         ################################################################
         # Parse tickets link
         ################################################################
-        user_icon_link = page.locator(".fa-user").first
-        parent_link = user_icon_link.locator("xpath=..")
-        tickets_link = parent_link.evaluate("node => node.href")
+        tickets_link = fields["tickets_link"]
 
         ################################################################
         # Building final object
@@ -293,9 +541,6 @@ def process_event_page(page: Page, link: str, source: dict) -> dict | None:
         logging.info(f"Successfully scraped {link}\n{json.dumps(record, indent=4)}")
         return record
 
-    except (FreskDateBadFormat, FreskError) as e:
+    except FreskError as e:
         logging.info(f"Skipping event {link}: {e}")
         return None
-    except Exception as e:
-        logging.error(f"Unexpected error processing event page {link}: {e}", exc_info=True)
-        raise
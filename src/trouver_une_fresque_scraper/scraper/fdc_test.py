@@ -0,0 +1,117 @@
+import logging
+
+from trouver_une_fresque_scraper.scraper import fdc
+from trouver_une_fresque_scraper.utils.fields import read_html_fields
+from trouver_une_fresque_scraper.utils.html import parse_html
+from trouver_une_fresque_scraper.utils.testing import same_records, temporary_config
+
+
+SOURCE = {"id": 200, "url": "https://fresqueduclimat.org/participer-a-un-atelier-grand-public"}
+IFRAME_URL = "https://association.climatefresk.org/training_sessions/search_public_wp?language=fr"
+LINK = (
+    "https://association.climatefresk.org/training_sessions/"
+    "3f2b1c4d-5e6f-4a7b-8c9d-0e1f2a3b4c5d/show_public"
+)
+
+# Page of the listing iframe, as served over HTTP
+LISTING_HTML = """
+<html><body>
+<table>
+  <tr>
+    <td><a class="link-dark" href="/training_sessions/3f2b1c4d-5e6f-4a7b-8c9d-0e1f2a3b4c5d/show_public">
+      Atelier en ligne</a></td>
+    <td>16 mai 2026</td>
+  </tr>
+  <tr>
+    <td><a class="link-dark" href="/training_sessions/7a8b9c0d-1e2f-4a3b-8c4d-5e6f7a8b9c0d/show_public">
+      Atelier à Lyon</a></td>
+    <td>23 mai 2026</td>
+  </tr>
+</table>
+<nav>
+  <a class="page-link" href="/training_sessions/search_public_wp?language=fr&amp;page=2">2</a>
+  <a class="page-link" href="/training_sessions/search_public_wp?language=fr&amp;page=3">3</a>
+  <a class="page-link" href="/training_sessions/search_public_wp?language=fr&amp;page=2">Suivant</a>
+</nav>
+</body></html>
+"""
+
+# Event page, as served over HTTP
+EVENT_HTML = """
+<html><body>
+<h3>Atelier Fresque du Climat en ligne</h3>
+<div class="mb-3"><i class="fa fa-clock"></i> 16 mai 2026, de 18h30 à 21h30 (heure de Paris)</div>
+<div class="mb-3"><i class="fa fa-globe"></i> Français</div>
+<div class="mb-3"><i class="fa fa-video"></i> En ligne</div>
+<div><strong>Description</strong>
+  <p>Un atelier pour comprendre le changement climatique.</p>
+  <p>Ouvert à tous.</p>
+</div>
+<div class="mb-3">
+  <a href="/training_sessions/3f2b1c4d-5e6f-4a7b-8c9d-0e1f2a3b4c5d/register"><i class="fa fa-user"></i></a>
+  Il reste 4 places
+</div>
+</body></html>
+"""
+
+# EVENT_FIELDS read by the browser on the same page
+PAGE_FIELDS = {
+    "title": "Atelier Fresque du Climat en ligne",
+    "event_time": "16 mai 2026, de 18h30 à 21h30 (heure de Paris)",
+    "language": "Français",
+    "online": True,
+    "full_location": None,
+    # Browsers separate paragraphs with a blank line
+    "description": "Description\n\nUn atelier pour comprendre le changement climatique.\n\n"
+    "Ouvert à tous.",
+    "attendance": "Il reste 4 places",
+    "tickets_link": "https://association.climatefresk.org/training_sessions/"
+    "3f2b1c4d-5e6f-4a7b-8c9d-0e1f2a3b4c5d/register",
+}
+
+
+def run_tests():
+    listing_doc = parse_html(LISTING_HTML)
+    event_doc = parse_html(EVENT_HTML)
+    html_fields = read_html_fields(event_doc, fdc.EVENT_FIELDS, base_url=LINK)
+
+    with temporary_config(timezone="Europe/Paris"):
+        http_record = fdc.record_from_fields(html_fields, LINK, SOURCE)
+        browser_record = fdc.record_from_fields(PAGE_FIELDS, LINK, SOURCE)
+
+    # tuple fields:
+    # 1. Test case name
+    # 2. Actual value
+    # 3. Expected value
+    test_cases = [
+        (
+            "listing links",
+            list(fdc._listing_links(listing_doc, IFRAME_URL)),
+            [
+                "https://association.climatefresk.org/training_sessions/"
+                "3f2b1c4d-5e6f-4a7b-8c9d-0e1f2a3b4c5d/show_public",
+                "https://association.climatefresk.org/training_sessions/"
+                "7a8b9c0d-1e2f-4a3b-8c4d-5e6f7a8b9c0d/show_public",
+            ],
+        ),
+        ("listing page numbers", sorted(fdc._page_numbers(listing_doc, IFRAME_URL)), [2, 3]),
+        (
+            "listing page URL",
+            fdc._with_page(f"{IFRAME_URL}&page=2", 5),
+            f"{IFRAME_URL}&page=5",
+        ),
+        (
+            "HTTP fields match the browser ones",
+            {k: v for k, v in html_fields.items() if k != "description"},
+            {k: v for k, v in PAGE_FIELDS.items() if k != "description"},
+        ),
+        same_records("HTTP and browser records match", http_record, browser_record),
+        ("record language", (browser_record or {}).get("language_code"), "fr"),
+    ]
+
+    for name, actual, expected in test_cases:
+        logging.info(f"Running {name}")
+        if actual == expected:
+            logging.info("Result matches")
+        else:
+            logging.error(f"{name}: expected {expected} but got {actual}")
@@ -1,14 +1,15 @@
 import json
-import time
 import logging
 
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 from trouver_une_fresque_scraper.db.records import get_record_dict
+from trouver_une_fresque_scraper.utils.checkpoint import source_checkpoint
+from trouver_une_fresque_scraper.utils.concurrency import throttle
 from trouver_une_fresque_scraper.utils.date_and_time import get_dates
 from trouver_une_fresque_scraper.utils.errors import (
     FreskError,
@@ -16,16 +17,39 @@ from trouver_une_fresque_scraper.utils.errors import (
     FreskDateNotFound,
     FreskDateDifferentTimezone,
 )
+from trouver_une_fresque_scraper.utils.event_cache import (
+    cache_event,
+    get_cached_event,
+    listing_fingerprint,
+    SourceCache,
+)
 from trouver_une_fresque_scraper.utils.keywords import *
 from trouver_une_fresque_scraper.utils.language import detect_language_code
 from trouver_une_fresque_scraper.utils.location import get_address
+from trouver_une_fresque_scraper.utils.scraping import (
+    DriverRecycler,
+    probe,
+    probe_text,
+    safe_find_element,
+    wait_for_count_change,
+    wait_for_page_load,
+)
+from trouver_une_fresque_scraper.utils.watchdog import event_deadline
+
+
+EVENT_CARDS_SELECTOR = 'li[data-hook="events-card"]'
+ABOUT_SECTION_SELECTOR = 'div[data-hook="about-section"]'
+
+
+def extract_event_uuid(link):
+    """Returns the slug of a FEC event, the part of its link after /event-details/."""
+    return link.split("/event-details/")[-1]
 
 
 def scroll_to_bottom(driver):
     while True:
         logging.info("Scrolling to the bottom...")
         try:
-            time.sleep(2)
             next_button = WebDriverWait(driver, 10).until(
                 EC.element_to_be_clickable(
                     (
@@ -40,8 +64,10 @@ def scroll_to_bottom(driver):
             current_y = (window_h / 2) + window_y
             scroll_y_by = desired_y - current_y
             driver.execute_script("window.scrollBy(0, arguments[0]);", scroll_y_by)
-            time.sleep(2)
+            card_count = len(driver.find_elements(By.CSS_SELECTOR, EVENT_CARDS_SELECTOR))
             next_button.click()
+            # Wait for the next batch of cards rather than a fixed delay
+            wait_for_count_change(driver, By.CSS_SELECTOR, EVENT_CARDS_SELECTOR, card_count)
         except TimeoutException:
             break
 
@@ -49,207 +75,224 @@ def scroll_to_bottom(driver):
 def get_fec_data(sources, service, options):
     logging.info("Scraping data from lafresquedeleconomiecirculaire.com")
 
-    driver = webdriver.Firefox(service=service, options=options)
+    drivers = DriverRecycler(lambda: webdriver.Firefox(service=service, options=options))
 
     records = []
 
     for page in sources:
-        logging.info("========================")
-        driver.get(page["url"])
-        driver.implicitly_wait(2)
+        checkpoint = source_checkpoint(page)
+        if checkpoint.done:
+            logging.info(f"Reusing the checkpointed records of {page['url']}")
+            records.extend(checkpoint.records)
+            continue
+        start = len(records)
 
-        # Scroll to bottom to load all events
-        scroll_to_bottom(driver)
-        driver.execute_script("window.scrollTo(0, 0);")
-
-        ele = driver.find_elements(
-            By.CSS_SELECTOR, 'li[data-hook="events-card"] a[data-hook="title"]'
-        )
-        links = [e.get_attribute("href") for e in ele]
+        logging.info("========================")
+        listing = checkpoint.listing
+        if listing is None:
+            driver = drivers.get()
+            throttle(page["url"])
+            driver.get(page["url"])
+            # The event cards are rendered client-side, wait for the first one to show up
+            safe_find_element(driver, By.CSS_SELECTOR, EVENT_CARDS_SELECTOR)
+
+            # Scroll to bottom to load all events
+            scroll_to_bottom(driver)
+            driver.execute_script("window.scrollTo(0, 0);")
+
+            # Links and the text of their cards, read in a single round trip
+            cards = driver.execute_script(
+                "return Array.from(document.querySelectorAll(arguments[0]))"
+                ".map(a => [a.href, (a.closest('li') || a).innerText]);",
+                f'{EVENT_CARDS_SELECTOR} a[data-hook="title"]',
+            )
 
-        # Only events published on lafresquedeleconomiecirculaire.com can be extracted
-        links = [l for l in links if "lafresquedeleconomiecirculaire.com" in l]
+            # Only events published on lafresquedeleconomiecirculaire.com can be extracted
+            listing = {
+                link: listing_fingerprint(text)
+                for link, text in cards
+                if "lafresquedeleconomiecirculaire.com" in link
+            }
+            checkpoint.save_listing(listing)
+
+        # Reuse the records of the last run if the listing is unchanged
+        source_cache = SourceCache(page, listing)
+        cached = source_cache.records()
+        if cached is not None:
+            records.extend(cached)
+            checkpoint.finish(cached)
+            continue
+
+        for link in listing:
+            if not checkpoint.has_result(link):
+                # Events unchanged in the listing since an earlier run reuse its records
+                cached = get_cached_event(page, extract_event_uuid(link), listing[link])
+                if cached is not None:
+                    checkpoint.save_result(link, cached)
+            if checkpoint.has_result(link):
+                records.extend(checkpoint.results[link])
+                continue
 
-        for link in links:
             logging.info(f"\n-> Processing {link} ...")
-            driver.get(link)
-            driver.implicitly_wait(3)
-            time.sleep(5)
-
-            ################################################################
-            # Parse event id
-            ################################################################
-            # Define the regex pattern for UUIDs
-            uuid = link.split("/event-details/")[-1]
-            if not uuid:
-                logging.info("Rejecting record: UUID not found")
-                continue
+            with event_deadline(link, kill=drivers.kill):
+                driver = drivers.get()
+                throttle(link)
+                driver.get(link)
+                # The event details are rendered client-side, wait for the date to show up
+                wait_for_page_load(driver)
+                safe_find_element(driver, By.CSS_SELECTOR, 'p[data-hook="event-full-date"]')
+
+                ################################################################
+                # Parse event id
+                ################################################################
+                # Define the regex pattern for UUIDs
+                uuid = extract_event_uuid(link)
+                if not uuid:
+                    logging.info("Rejecting record: UUID not found")
+                    continue
 
-            ################################################################
-            # Parse event title
-            ################################################################
-            title_el = driver.find_element(
-                by=By.TAG_NAME,
-                value="h1",
-            )
-            title = title_el.text
-
-            ################################################################
-            # Parse start and end dates
-            ################################################################
-            try:
-                date_info_el = driver.find_element(
-                    by=By.CSS_SELECTOR,
-                    value='p[data-hook="event-full-date"]',
-                )
-                event_time = date_info_el.text
-            except NoSuchElementException:
-                raise FreskDateNotFound
-
-            try:
-                event_start_datetime, event_end_datetime = get_dates(event_time)
-            except FreskDateBadFormat as error:
-                logging.info(f"Reject record: {error}")
-                continue
+                ################################################################
+                # Parse event title
+                ################################################################
+                title = probe_text(driver, "h1")
+                if title is None:
+                    logging.info("Rejecting record: title not found")
+                    continue
 
-            ################################################################
-            # Is it an online event?
-            ################################################################
-            online = False
-            try:
-                online_el = driver.find_element(
-                    By.CSS_SELECTOR, 'p[data-hook="event-full-location"]'
-                )
-                if is_online(online_el.text):
-                    online = True
-            except NoSuchElementException:
-                pass
-
-            ################################################################
-            # Location data
-            ################################################################
-            full_location = ""
-            location_name = ""
-            address = ""
-            city = ""
-            department = ""
-            longitude = ""
-            latitude = ""
-            zip_code = ""
-            country_code = ""
-
-            if not online:
-                location_el = driver.find_element(
-                    By.CSS_SELECTOR, 'p[data-hook="event-full-location"]'
-                )
-                full_location = location_el.text
+                ################################################################
+                # Parse start and end dates
+                ################################################################
+                event_time = probe_text(driver, 'p[data-hook="event-full-date"]')
+                if event_time is None:
+                    raise FreskDateNotFound
 
                 try:
-                    address_dict = get_address(full_location)
-                    (
-                        location_name,
-                        address,
-                        city,
-                        department,
-                        zip_code,
-                        country_code,
-                        latitude,
-                        longitude,
-                    ) = address_dict.values()
-                except FreskError as error:
-                    logging.info(f"Rejecting record: {error}.")
+                    event_start_datetime, event_end_datetime = get_dates(event_time)
+                except FreskDateBadFormat as error:
+                    logging.info(f"Reject record: {error}")
                     continue
 
-            ################################################################
-            # Description
-            ################################################################
-            driver.execute_script("window.scrollBy(0, document.body.scrollHeight);")
-
-            # Click on "show more" button
-            try:
-                show_more_el = driver.find_element(
-                    By.CSS_SELECTOR, 'button[data-hook="about-section-button"]'
+                ################################################################
+                # Is it an online event?
+                ################################################################
+                location_text = probe_text(driver, 'p[data-hook="event-full-location"]')
+                online = location_text is not None and is_online(location_text)
+
+                ################################################################
+                # Location data
+                ################################################################
+                full_location = ""
+                location_name = ""
+                address = ""
+                city = ""
+                department = ""
+                longitude = ""
+                latitude = ""
+                zip_code = ""
+                country_code = ""
+
+                if not online:
+                    if location_text is None:
+                        logging.info("Rejecting record: no location")
+                        continue
+                    full_location = location_text
+
+                    try:
+                        address_dict = get_address(full_location)
+                        (
+                            location_name,
+                            address,
+                            city,
+                            department,
+                            zip_code,
+                            country_code,
+                            latitude,
+                            longitude,
+                        ) = address_dict.values()
+                    except FreskError as error:
+                        logging.info(f"Rejecting record: {error}.")
+                        continue
+
+                ################################################################
+                # Description
+                ################################################################
+                driver.execute_script("window.scrollBy(0, document.body.scrollHeight);")
+                # The about section may only be rendered once scrolled into view
+                safe_find_element(driver, By.CSS_SELECTOR, ABOUT_SECTION_SELECTOR, timeout=3)
+
+                # Click on "show more" button
+                show_more_el = probe(driver, 'button[data-hook="about-section-button"]')
+                if show_more_el is not None:
+                    show_more_el.click()
+
+                description = probe_text(
+                    driver,
+                    'div[data-hook="about-section-text"]',
+                    ABOUT_SECTION_SELECTOR,
                 )
-                show_more_el.click()
-            except NoSuchElementException:
-                pass
-
-            try:
-                description_el = driver.find_element(
-                    By.CSS_SELECTOR, 'div[data-hook="about-section-text"]'
-                )
-            except NoSuchElementException:
-                try:
-                    description_el = driver.find_element(
-                        By.CSS_SELECTOR, 'div[data-hook="about-section"]'
-                    )
-                except NoSuchElementException:
+                if description is None:
                     logging.info(f"Rejecting record: no description")
                     continue
 
-            description = description_el.text
-
-            ################################################################
-            # Training?
-            ################################################################
-            training = is_training(title)
-
-            ################################################################
-            # Is it full?
-            ################################################################
-            sold_out = True
-            try:
-                _ = driver.find_element(
-                    by=By.CSS_SELECTOR,
-                    value='div[data-hook="event-sold-out"]',
+                ################################################################
+                # Training?
+                ################################################################
+                training = is_training(title)
+
+                ################################################################
+                # Is it full?
+                ################################################################
+                sold_out = probe(driver, 'div[data-hook="event-sold-out"]') is not None
+
+                ################################################################
+                # Is it suited for kids?
+                ################################################################
+                kids = is_for_kids(title)
+
+                ################################################################
+                # Parse tickets link
+                ################################################################
+                tickets_link = link
+
+                ################################################################
+                # Building final object
+                ################################################################
+                record = get_record_dict(
+                    f"{page['id']}-{uuid}",
+                    page["id"],
+                    title,
+                    event_start_datetime,
+                    event_end_datetime,
+                    full_location,
+                    location_name,
+                    address,
+                    city,
+                    department,
+                    zip_code,
+                    country_code,
+                    latitude,
+                    longitude,
+                    page.get(
+                        "language_code",
+                        detect_language_code(title, description),
+                    ),
+                    online,
+                    training,
+                    sold_out,
+                    kids,
+                    link,
+                    tickets_link,
+                    description,
                 )
-            except NoSuchElementException:
-                sold_out = False
-
-            ################################################################
-            # Is it suited for kids?
-            ################################################################
-            kids = is_for_kids(title)
-
-            ################################################################
-            # Parse tickets link
-            ################################################################
-            tickets_link = link
-
-            ################################################################
-            # Building final object
-            ################################################################
-            record = get_record_dict(
-                f"{page['id']}-{uuid}",
-                page["id"],
-                title,
-                event_start_datetime,
-                event_end_datetime,
-                full_location,
-                location_name,
-                address,
-                city,
-                department,
-                zip_code,
-                country_code,
-                latitude,
-                longitude,
-                page.get(
-                    "language_code",
-                    detect_language_code(title, description),
-                ),
-                online,
-                training,
-                sold_out,
-                kids,
-                link,
-                tickets_link,
-                description,
-            )
 
-            records.append(record)
-            logging.info(f"Successfully scraped {link}\n{json.dumps(record, indent=4)}")
+                records.append(record)
+                cache_event(page, uuid, listing[link], [record])
+                checkpoint.save_result(link, [record])
+                logging.info(f"Successfully scraped {link}\n{json.dumps(record, indent=4)}")
+
+        checkpoint.finish(records[start:])
+        source_cache.save(records[start:])
 
-    driver.quit()
+    drivers.quit()
 
     return records
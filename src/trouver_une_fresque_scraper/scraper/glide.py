@@ -1,15 +1,34 @@
 import json
 import logging
 
-from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError
+from contextlib import contextmanager
+
+from playwright.sync_api import (
+    Error as PlaywrightError,
+    Page,
+    TimeoutError as PlaywrightTimeoutError,
+)
 
 from trouver_une_fresque_scraper.db.records import get_record_dict
-from trouver_une_fresque_scraper.utils.browser import managed_browser, DEFAULT_TIMEOUT
+from trouver_une_fresque_scraper.utils.browser import (
+    managed_browser,
+    new_context,
+    goto,
+    PagePool,
+    DEFAULT_TIMEOUT,
+)
+from trouver_une_fresque_scraper.utils.checkpoint import source_checkpoint
 from trouver_une_fresque_scraper.utils.date_and_time import get_dates
 from trouver_une_fresque_scraper.utils.errors import (
     FreskError,
     FreskDateBadFormat,
 )
+from trouver_une_fresque_scraper.utils.event_cache import (
+    listing_fingerprint,
+    skip_unchanged,
+    SourceCache,
+)
+from trouver_une_fresque_scraper.utils.fields import field, read_fields
 from trouver_une_fresque_scraper.utils.keywords import (
     is_canceled,
     is_online,
@@ -17,76 +36,248 @@ from trouver_une_fresque_scraper.utils.keywords import (
 )
 from trouver_une_fresque_scraper.utils.language import detect_language_code
 from trouver_une_fresque_scraper.utils.location import get_address
+from trouver_une_fresque_scraper.utils.waits import (
+    wait_for_dom_stable,
+    wait_for_selector,
+    wait_until,
+    wait_until_changed,
+    POLL_INTERVAL,
+)
 
 
-def collect_event_links(page: Page, source: dict) -> list[str]:
+# Selector of the clickable event rows of a Glide collection
+ITEMS_SELECTOR = "div.collection-item[role='button']"
+
+# Fields of an event page, read in a single round trip by process_event_page. The values
+# of the details list follow their label in the same row.
+EVENT_FIELDS = {
+    "large_title": field("h2.headlineMedium"),
+    "title": field("h2.headlineSmall"),
+    "event_time": field("li div", up=1, child=1, has_text="Date"),
+    "format": field("li div", up=1, child=1, has_text="Format"),
+    "full_location": field("li div", up=1, child=1, has_text="Adresse"),
+    "description": field("li div", up=1, child=1, has_text="Description"),
+    "attendees": field("li div", up=1, child=1, has_text="participant"),
+}
+REQUIRED_EVENT_FIELDS = ("title", "event_time", "format", "description", "attendees")
+
+# Keys holding the id of a row in the JSON loaded by Glide apps
+ROW_ID_KEYS = ("$rowID", "rowID")
+
+
+def extract_event_uuid(link: str) -> str:
+    """Extract the row id, the last segment of a Glide event URL."""
+    return link.split("/")[-1]
+
+
+def row_id(row: dict) -> str | None:
+    """Returns the id of a Glide row, or None if the dict is not a row."""
+    for key in ROW_ID_KEYS:
+        if isinstance(row.get(key), str):
+            return row[key]
+    return None
+
+
+def find_tables(data) -> list[list[dict]]:
+    """Returns every list of rows found in the JSON data loaded by a Glide app."""
+    tables = []
+    pending = [data]
+    while pending:
+        current = pending.pop()
+        if isinstance(current, dict):
+            pending.extend(current.values())
+        elif isinstance(current, list):
+            rows = [item for item in current if isinstance(item, dict) and row_id(item)]
+            if rows:
+                tables.append(rows)
+            pending.extend(item for item in current if isinstance(item, (dict, list)))
+    return tables
+
+
+class GlideData:
     """
-    Collect all event links from a Glide listing page.
+    Tables of the Glide app, read from the JSON responses captured while its listing loads.
 
-    Clicks the filter tab, then iterates through all collection items
-    across pagination pages, collecting event URLs.
+    Glide apps download their rows as JSON and render the collections client-side, so the rows
+    of a listing are known without opening any of its items.
     """
-    all_links = []
 
-    # Click the filter tab button
-    tab_button = page.locator(f"div.button-text:has-text('{source['filter']}')")
-    tab_button.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-    tab_button.click()
-    page.wait_for_timeout(5000)
+    def __init__(self, responses: list):
+        self.responses = responses
+        self.tables = []
+        self._read = 0
 
-    while True:
-        # Wait for collection items to appear
-        items = page.locator("div.collection-item[role='button']")
-        try:
-            items.first.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-        except PlaywrightTimeoutError:
-            logging.warning(f"No collection items found for {source['url']}")
+    def update(self):
+        """Reads the responses captured since the last update."""
+        for response in self.responses[self._read :]:
+            try:
+                self.tables.extend(find_tables(response.json()))
+            except (PlaywrightError, ValueError):
+                # Not JSON, or the body is no longer available
+                continue
+        self._read = len(self.responses)
+
+    def table_of(self, uuid: str) -> list[dict] | None:
+        """Returns the latest rows of the table holding the row uuid, or None."""
+        for table in reversed(self.tables):
+            if any(row_id(row) == uuid for row in table):
+                return table
+        return None
+
+
+@contextmanager
+def captured_responses(page: Page):
+    """Collects the fetch and XHR responses received by page while the block runs."""
+    responses = []
+
+    def on_response(response):
+        if response.request.resource_type in ("fetch", "xhr"):
+            responses.append(response)
+
+    page.on("response", on_response)
+    try:
+        yield responses
+    finally:
+        page.remove_listener("response", on_response)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(str(text).split()).lower()
+
+
+def match_row(item_text: str, rows: list[dict], taken: set) -> dict | None:
+    """
+    Returns the row displayed by a collection item, or None if it is not certain.
+
+    Each row is scored by how many of its values appear in the text of the item. The row
+    with the best score is only returned if no other row has the same score, and if no other
+    item was matched to it already (their row ids are in taken).
+    """
+    text = _normalize(item_text)
+    best_score, best_rows = 0, []
+    for row in rows:
+        values = {
+            _normalize(value)
+            for key, value in row.items()
+            if key not in ROW_ID_KEYS and isinstance(value, (str, int, float))
+        }
+        score = sum(1 for value in values if len(value) >= 3 and value in text)
+        if score > best_score:
+            best_score, best_rows = score, [row]
+        elif score and score == best_score:
+            best_rows.append(row)
+    if len(best_rows) != 1 or row_id(best_rows[0]) in taken:
+        return None
+    return best_rows[0]
+
+
+def link_of_row(known_link: str, row: dict) -> str:
+    """Derives the event URL of a row from the URL of another event of the same table."""
+    # Event URLs end with the row id
+    return f"{known_link.rsplit('/', 1)[0]}/{row_id(row)}"
+
+
+def row_fingerprint(row: dict) -> str | None:
+    return listing_fingerprint(json.dumps(row, sort_keys=True, ensure_ascii=False))
+
+
+def click_event_link(page: Page, items, index: int, item_count: int) -> str:
+    """Opens the event of a collection item to read its URL, then goes back to the listing."""
+    # Wait until the expected number of items is loaded again (DOM may have changed
+    # after back navigation), reloading the page if they never show up
+    max_tries = 10
+    for attempt in range(max_tries):
+        if wait_until(page, lambda: items.count() == item_count):
             break
+        page.reload()
+    else:
+        raise RuntimeError(f"Cannot load the {item_count} JS elements after {max_tries} tries.")
 
-        item_count = items.count()
-        logging.info(f"Found {item_count} elements on current page")
+    listing_url = page.url
+    items.nth(index).click()
+    wait_until_changed(page, lambda: page.url, listing_url)
+    link = page.url
 
-        for i in range(item_count):
-            # Re-query items each iteration (DOM may have changed after back navigation)
-            items = page.locator("div.collection-item[role='button']")
+    page.go_back()
+    wait_until(page, lambda: items.count() == item_count)
+    return link
 
-            # Wait until the expected number of items is loaded again
-            max_tries = 10
-            for attempt in range(max_tries):
-                if items.count() == item_count:
-                    break
-                page.reload()
-                page.wait_for_timeout(5000)
-                items = page.locator("div.collection-item[role='button']")
-            else:
-                raise RuntimeError(
-                    f"Cannot load the {item_count} JS elements after {max_tries} tries."
-                )
 
-            items.nth(i).click()
-            page.wait_for_timeout(5000)
+def collect_event_links(page: Page, source: dict) -> dict[str, str | None]:
+    """
+    Collect all event links from a Glide listing page.
 
-            link = page.url
-            all_links.append(link)
-            logging.info(f"Collected link: {link}")
+    Clicks the filter tab, then iterates through all collection items across pagination pages.
+    The rows behind the items are read from the JSON loaded by the app: only the first item is
+    opened, to learn how event URLs are built from row ids, and the URL of the other items is
+    derived from their row. Items that cannot be matched to a single row are opened as well.
 
-            page.go_back()
-            page.wait_for_timeout(5000)
+    Returns:
+        The listing fingerprint of each event link, taken from its row, or from the text of
+        its item when the row is unknown
+    """
+    all_links = {}
+    taken = set()
+    known_link = None
+    events = None
+
+    with captured_responses(page) as responses:
+        data = GlideData(responses)
+
+        # Click the filter tab button
+        tab_button = page.locator(f"div.button-text:has-text('{source['filter']}')")
+        tab_button.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
+        tab_button.click()
+        wait_for_dom_stable(page)
+
+        items = page.locator(ITEMS_SELECTOR)
+        while True:
+            # Wait for collection items to appear
+            try:
+                items.first.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
+            except PlaywrightTimeoutError:
+                logging.warning(f"No collection items found for {source['url']}")
+                break
 
-        # Try clicking the "Next" pagination button
-        try:
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            page.wait_for_timeout(2000)
-            next_button = page.locator("button[aria-label='Next']")
-            if next_button.is_visible(timeout=DEFAULT_TIMEOUT):
-                next_button.scroll_into_view_if_needed()
-                page.wait_for_timeout(2000)
-                next_button.click()
-                page.wait_for_timeout(2000)
-            else:
+            item_texts = items.all_inner_texts()
+            item_count = len(item_texts)
+            logging.info(f"Found {item_count} elements on current page")
+            data.update()
+
+            for i, item_text in enumerate(item_texts):
+                row = match_row(item_text, events, taken) if events else None
+                if row is not None:
+                    link = link_of_row(known_link, row)
+                else:
+                    link = click_event_link(page, items, i, item_count)
+                    uuid = extract_event_uuid(link)
+                    if events is None and (table := data.table_of(uuid)):
+                        known_link, events = link, table
+                        logging.info(f"Deriving the links of {len(table)} rows from {link}")
+                    row = next((r for r in events or () if row_id(r) == uuid), None)
+
+                if row is not None:
+                    taken.add(row_id(row))
+                    all_links[link] = row_fingerprint(row)
+                else:
+                    all_links[link] = listing_fingerprint(item_text)
+                logging.info(f"Collected link: {link}")
+
+            # Try clicking the "Next" pagination button
+            try:
+                next_button = page.locator("button[aria-label='Next']")
+                if next_button.is_visible():
+                    first_item_text = items.first.text_content()
+                    next_button.click()
+                    wait_until_changed(
+                        page,
+                        lambda: items.first.text_content(timeout=POLL_INTERVAL),
+                        first_item_text,
+                    )
+                else:
+                    break
+            except PlaywrightTimeoutError:
                 break
-        except PlaywrightTimeoutError:
-            break
 
     logging.info(f"Total links collected: {len(all_links)}")
     return all_links
@@ -114,31 +305,57 @@ def get_glide_data(sources, service=None, options=None):
         headless = "-headless" in options.arguments
 
     with managed_browser(headless=headless) as browser:
-        context = browser.new_context()
+        context = new_context(browser)
         page = context.new_page()
         records = []
 
-        for source in sources:
-            try:
-                logging.info(f"==================\nProcessing page {source}")
-                page.goto(source["url"], wait_until="domcontentloaded")
-                page.wait_for_timeout(20000)
-
-                # Phase 1: Collect all event links across pagination pages
-                links = collect_event_links(page, source)
-
-                # Phase 2: Process each event page
-                for link in links:
-                    event_record = process_event_page(page, link, source)
-                    if event_record:
-                        records.append(event_record)
-
-            except Exception as e:
-                logging.error(
-                    f"Failed to process source page {source.get('url', source)}: {e}",
-                    exc_info=True,
-                )
-                raise
+        with PagePool(page, headless=headless) as pool:
+            for source in sources:
+                checkpoint = source_checkpoint(source)
+                if checkpoint.done:
+                    logging.info(f"Reusing the checkpointed records of {source['url']}")
+                    records.extend(checkpoint.records)
+                    continue
+                start = len(records)
+                try:
+                    logging.info(f"==================\nProcessing page {source}")
+                    listing = checkpoint.listing
+                    if listing is None:
+                        goto(page, source["url"], wait_until="domcontentloaded")
+                        # The app is rendered client-side, wait for the filter tabs to show up
+                        wait_for_selector(page, "div.button-text", timeout=20000)
+
+                        # Phase 1: Collect all event links across pagination pages
+                        listing = collect_event_links(page, source)
+                        checkpoint.save_listing(listing)
+
+                    # Reuse the records of the last run if the listing is unchanged
+                    source_cache = SourceCache(source, listing)
+                    cached = source_cache.records()
+                    if cached is not None:
+                        records.extend(cached)
+                        checkpoint.finish(cached)
+                        continue
+
+                    # Phase 2: Process each event page, unless unchanged since the last run
+                    process = skip_unchanged(
+                        lambda page, link: process_event_page(page, link, source),
+                        source,
+                        listing,
+                        extract_event_uuid,
+                    )
+                    for event_record in pool.map(checkpoint.wrap(process), list(listing)):
+                        if event_record:
+                            records.append(event_record)
+                    checkpoint.finish(records[start:])
+                    source_cache.save(records[start:])
+
+                except Exception as e:
+                    logging.error(
+                        f"Failed to process source page {source.get('url', source)}: {e}",
+                        exc_info=True,
+                    )
+                    raise
 
         context.close()
 
@@ -160,45 +377,42 @@ def process_event_page(page: Page, link: str, source: dict) -> dict | None:
     logging.info(f"\n-> Processing {link} ...")
 
     try:
-        page.goto(link, wait_until="domcontentloaded")
-        page.wait_for_timeout(5000)
+        goto(page, link, wait_until="domcontentloaded")
+        wait_for_selector(page, "h2.headlineSmall")
+        fields = read_fields(page, EVENT_FIELDS, required=REQUIRED_EVENT_FIELDS)
+        if fields is None:
+            logging.info("Rejecting record: page could not be read")
+            return None
 
         ################################################################
         # Is it canceled?
         ################################################################
-        large_title_el = page.locator("h2.headlineMedium").first
-        try:
-            if large_title_el.is_visible(timeout=3000):
-                large_title = large_title_el.text_content()
-                if is_canceled(large_title):
-                    logging.info("Rejecting record: canceled")
-                    return None
-        except PlaywrightTimeoutError:
-            pass
+        if fields["large_title"] is not None and is_canceled(fields["large_title"]):
+            logging.info("Rejecting record: canceled")
+            return None
 
         ################################################################
         # Parse event id
         ################################################################
-        uuid = link.split("/")[-1]
+        uuid = extract_event_uuid(link)
         if not uuid:
             logging.info("Rejecting record: UUID not found")
             return None
 
+        for name in REQUIRED_EVENT_FIELDS:
+            if fields[name] is None:
+                logging.info(f"Rejecting record: {name} not found")
+                return None
+
         ################################################################
         # Parse event title
         ################################################################
-        title_el = page.locator("h2.headlineSmall").first
-        title_el.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-        title = title_el.text_content()
+        title = fields["title"]
 
         ################################################################
         # Parse start and end dates
         ################################################################
-        date_label_el = page.locator("li div:has-text('Date')").first
-        date_label_el.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-        parent_el = date_label_el.locator("xpath=..")
-        event_time_el = parent_el.locator("> *:nth-child(2)")
-        event_time = event_time_el.text_content().lower()
+        event_time = fields["event_time"].lower()
 
         try:
             event_start_datetime, event_end_datetime = get_dates(event_time)
@@ -209,11 +423,7 @@ def process_event_page(page: Page, link: str, source: dict) -> dict | None:
         ################################################################
         # Is it an online event?
         ################################################################
-        format_label_el = page.locator("li div:has-text('Format')").first
-        format_label_el.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-        parent_el = format_label_el.locator("xpath=..")
-        online_el = parent_el.locator("> *:nth-child(2)")
-        online = is_online(online_el.text_content())
+        online = is_online(fields["format"])
 
         ################################################################
         # Location data
@@ -229,13 +439,8 @@ def process_event_page(page: Page, link: str, source: dict) -> dict | None:
         country_code = ""
 
         if not online:
-            try:
-                address_label_el = page.locator("li div:has-text('Adresse')").first
-                address_label_el.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-                parent_el = address_label_el.locator("xpath=..")
-                address_el = parent_el.locator("> *:nth-child(2)")
-                full_location = address_el.text_content()
-            except PlaywrightTimeoutError:
+            full_location = fields["full_location"]
+            if full_location is None:
                 logging.info("Rejecting record: empty address")
                 return None
 
@@ -258,11 +463,7 @@ def process_event_page(page: Page, link: str, source: dict) -> dict | None:
         ################################################################
         # Description
         ################################################################
-        description_label_el = page.locator("li div:has-text('Description')").first
-        description_label_el.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-        parent_el = description_label_el.locator("xpath=..")
-        description_el = parent_el.locator("> *:nth-child(2)")
-        description = description_el.text_content()
+        description = fields["description"]
 
         ################################################################
         # Training?
@@ -272,13 +473,7 @@ def process_event_page(page: Page, link: str, source: dict) -> dict | None:
         ################################################################
         # Is it full?
         ################################################################
-        attendees_label_el = page.locator("li div:has-text('participant')").first
-        attendees_label_el.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-        parent_el = attendees_label_el.locator("xpath=..")
-        attendees_el = parent_el.locator("> *:nth-child(2)")
-        attendees = attendees_el.text_content()
-
-        parts = attendees.split("/")
+        parts = fields["attendees"].split("/")
         sold_out = len(parts) == 2 and parts[0].strip() == parts[1].strip()
 
         ################################################################
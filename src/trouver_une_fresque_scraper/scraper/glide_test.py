@@ -0,0 +1,107 @@
+import copy
+import logging
+
+from trouver_une_fresque_scraper.scraper import glide
+
+
+APP_URL = "https://1erdegre.glide.page/dl/ateliers/s/6b1c2d"
+
+# JSON loaded by the Glide app while its listing renders: the events and a settings table
+APP_DATA = {
+    "data": {
+        "tables": [
+            {
+                "name": "Ateliers",
+                "rows": [
+                    {
+                        "$rowID": "Xk2Pq9",
+                        "Nom": "Atelier 1erdegré",
+                        "Date": "12/11/2026 18:30 - 21:30",
+                        "Ville": "Lyon",
+                        "Places": 12,
+                    },
+                    {
+                        "$rowID": "Bt7Rw3",
+                        "Nom": "Atelier 1erdegré",
+                        "Date": "19/11/2026 09:00 - 12:00",
+                        "Ville": "Grenoble",
+                        "Places": 8,
+                    },
+                    {
+                        "$rowID": "Mn4Zs8",
+                        "Nom": "Formation animateur",
+                        "Date": "26/11/2026 14:00 - 17:00",
+                        "Ville": "En ligne",
+                        "Places": 20,
+                    },
+                ],
+            },
+            {"name": "Réglages", "rows": [{"$rowID": "cfg", "Couleur": "vert"}]},
+        ]
+    }
+}
+
+# Text of each collection item and the URL the browser lands on when it is clicked
+ITEMS = [
+    ("Atelier 1erdegré\n12/11/2026 18:30 - 21:30\nLyon", f"{APP_URL}/Xk2Pq9"),
+    ("Atelier 1erdegré\n19/11/2026 09:00 - 12:00\nGrenoble", f"{APP_URL}/Bt7Rw3"),
+    ("Formation animateur\n26/11/2026 14:00 - 17:00\nEn ligne", f"{APP_URL}/Mn4Zs8"),
+]
+
+
+class Response:
+    """Stands in for a Playwright response captured while the listing loads."""
+
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        if self.body is None:
+            raise ValueError("not JSON")
+        return copy.deepcopy(self.body)
+
+
+def derive_links(items):
+    """Derives the links of items as collect_event_links does, opening the first one only."""
+    data = glide.GlideData([Response(None), Response(APP_DATA)])
+    data.update()
+    first_link = items[0][1]
+    events = data.table_of(glide.extract_event_uuid(first_link))
+    links, taken = [first_link], {glide.extract_event_uuid(first_link)}
+    for text, _ in items[1:]:
+        row = glide.match_row(text, events, taken)
+        if row is None:
+            links.append(None)
+            continue
+        taken.add(glide.row_id(row))
+        links.append(glide.link_of_row(first_link, row))
+    return links
+
+
+def run_tests():
+    events = APP_DATA["data"]["tables"][0]["rows"]
+
+    # tuple fields:
+    # 1. Test case name
+    # 2. Actual value
+    # 3. Expected value
+    test_cases = [
+        ("tables of the app", [len(table) for table in glide.find_tables(APP_DATA)], [1, 3]),
+        ("row id", [glide.row_id(row) for row in events], ["Xk2Pq9", "Bt7Rw3", "Mn4Zs8"]),
+        ("not a row", glide.row_id({"Nom": "Atelier"}), None),
+        ("derived links match the clicked ones", derive_links(ITEMS), [url for _, url in ITEMS]),
+        ("ambiguous item", glide.match_row("Atelier 1erdegré", events, set()), None),
+        ("row already taken", glide.match_row(ITEMS[1][0], events, {"Bt7Rw3"}), None),
+        (
+            "row fingerprint follows its values",
+            glide.row_fingerprint(events[0]) == glide.row_fingerprint({**events[0], "Places": 0}),
+            False,
+        ),
+    ]
+
+    for name, actual, expected in test_cases:
+        logging.info(f"Running {name}")
+        if actual == expected:
+            logging.info("Result matches")
+        else:
+            logging.error(f"{name}: expected {expected} but got {actual}")
@@ -1,15 +1,37 @@
 import json
 import logging
 
-from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from playwright.sync_api import (
+    Error as PlaywrightError,
+    Page,
+    TimeoutError as PlaywrightTimeoutError,
+)
 
 from trouver_une_fresque_scraper.db.records import get_record_dict
-from trouver_une_fresque_scraper.utils.browser import managed_browser, DEFAULT_TIMEOUT
+from trouver_une_fresque_scraper.utils.browser import (
+    managed_browser,
+    new_context,
+    goto,
+    is_state_restored,
+    save_storage_state,
+    PagePool,
+)
+from trouver_une_fresque_scraper.utils.checkpoint import source_checkpoint
 from trouver_une_fresque_scraper.utils.date_and_time import get_dates
 from trouver_une_fresque_scraper.utils.errors import (
     FreskError,
     FreskDateBadFormat,
 )
+from trouver_une_fresque_scraper.utils.event_cache import (
+    listing_fingerprint,
+    skip_unchanged,
+    SourceCache,
+)
+from trouver_une_fresque_scraper.utils.fields import field, read_fields
+from trouver_une_fresque_scraper.utils.html import collapse_lines, inner_text, parse_html
 from trouver_une_fresque_scraper.utils.keywords import (
     is_online,
     is_training,
@@ -17,11 +39,58 @@ from trouver_une_fresque_scraper.utils.keywords import (
 )
 from trouver_une_fresque_scraper.utils.language import detect_language_code
 from trouver_une_fresque_scraper.utils.location import get_address
+from trouver_une_fresque_scraper.utils.utils import get_config
+from trouver_une_fresque_scraper.utils.waits import (
+    wait_for_dom_stable,
+    wait_for_network_idle,
+    wait_for_selector,
+)
 
 
 # Maximum time (ms) to wait for a Cloudflare Turnstile challenge to auto-resolve
 TURNSTILE_WAIT_TIMEOUT = 30000
 
+# Domains whose requests are never blocked by the browser (Turnstile challenge)
+ALLOWED_DOMAINS = ("challenges.cloudflare.com",)
+
+# Cookies and localStorage are kept between runs under this name, see utils.browser
+STORAGE_DOMAIN = "helloasso.com"
+
+# Time (ms) to wait for a challenge or a consent modal to show up, when the
+# browser state of a previous run was restored and they are not expected
+RESTORED_PROBE_TIMEOUT = 500
+
+# Links of the organization page and the text of their card, read in a single round trip
+LISTING_FIELDS = {
+    "hrefs": field("a.ActionLink-Event", attr="href", all=True),
+    "cards": field("a.ActionLink-Event", prop="innerText", all=True),
+}
+
+# Fields of an event page, read at once when its embedded state is missing
+CAMPAIGN_FIELDS = {
+    "title": field("h1"),
+    "event_time": field("span.CampaignHeader--Date"),
+    "full_location": field("section.CardAddress--Location"),
+    "description": field("div.CampaignHeader--Description", prop="innerText"),
+}
+
+# Reads the state serialized in an event page: its JSON-LD blocks and the Nuxt state, if any
+EMBEDDED_STATE_SCRIPT = """
+() => {
+    let nuxt = null;
+    try {
+        nuxt = window.__NUXT__ ? JSON.stringify(window.__NUXT__) : null;
+    } catch (e) {}
+    const nuxtData = document.getElementById('__NUXT_DATA__');
+    return {
+        jsonLd: [...document.querySelectorAll('script[type="application/ld+json"]')].map(
+            (script) => script.textContent
+        ),
+        nuxt: nuxt || (nuxtData && nuxtData.textContent),
+    };
+}
+"""
+
 
 def wait_for_turnstile(page: Page):
     """Wait for a Cloudflare Turnstile challenge to resolve, if present.
@@ -31,23 +100,31 @@ def wait_for_turnstile(page: Page):
     user interaction. This function detects the iframe and waits for it to
     disappear (meaning the challenge was passed).
 
+    When the browser state of a previous run was restored, the clearance is
+    usually still valid and the challenge is only probed for briefly.
+
     If the challenge doesn't resolve within TURNSTILE_WAIT_TIMEOUT, a warning
     is logged but execution continues (the subsequent page element waits
     will fail with a clearer error if the page is still blocked).
     """
+    restored = is_state_restored(page.context)
     turnstile_iframe = page.locator('iframe[src*="challenges.cloudflare.com"]')
     try:
-        turnstile_iframe.wait_for(state="visible", timeout=3000)
+        turnstile_iframe.wait_for(
+            state="visible", timeout=RESTORED_PROBE_TIMEOUT if restored else 3000
+        )
     except PlaywrightTimeoutError:
         # No Turnstile challenge detected, continue normally
         return
 
+    if restored:
+        logging.info("Stored challenge clearance expired")
     logging.info("Cloudflare Turnstile challenge detected, waiting for it to resolve...")
     try:
         turnstile_iframe.wait_for(state="hidden", timeout=TURNSTILE_WAIT_TIMEOUT)
         logging.info("Turnstile challenge resolved successfully")
         # Give the page a moment to load after the challenge
-        page.wait_for_timeout(2000)
+        wait_for_network_idle(page, timeout=2000)
     except PlaywrightTimeoutError:
         logging.warning(
             f"Turnstile challenge did not resolve within {TURNSTILE_WAIT_TIMEOUT}ms. "
@@ -60,39 +137,51 @@ def dismiss_cookie_modal(page: Page):
     """Dismiss the Axeptio cookie consent modal if present."""
     try:
         reject_button = page.locator("#axeptio_btn_dismiss")
-        reject_button.wait_for(state="visible", timeout=5000)
+        restored = is_state_restored(page.context)
+        reject_button.wait_for(
+            state="visible", timeout=RESTORED_PROBE_TIMEOUT if restored else 5000
+        )
         reject_button.click()
         logging.info("Cookie consent modal dismissed")
-        page.wait_for_timeout(1000)
+        wait_for_selector(page, "#axeptio_btn_dismiss", state="hidden", timeout=1000)
     except PlaywrightTimeoutError:
         logging.debug("Cookie consent modal not found or already dismissed")
     except Exception as e:
         logging.debug(f"Cookie consent modal couldn't be handled: {e}")
 
 
-def collect_event_links(page: Page) -> list[str]:
+def extract_event_uuid(link: str) -> str:
+    """Extract the event slug, the last segment of a HelloAsso event URL."""
+    return link.split("/")[-1]
+
+
+def collect_event_links(page: Page) -> dict[str, str | None]:
     """
     Collect all event links from the organization page.
 
     Scrolls down to load all events, clicks the "show all" button if
     present, then extracts all event links.
+
+    Returns:
+        The listing fingerprint of each event link, taken from the text of its card
     """
     # Try clicking the "show all actions" button if present
     show_all_button = page.locator(
         'button[data-ux="Explore_OrganizationPublicPage_Actions_ActionEvent_ShowAllActions"]'
     )
     try:
-        if show_all_button.is_visible(timeout=2000):
+        if show_all_button.is_visible():
             show_all_button.click()
+            wait_for_dom_stable(page, timeout=2000)
     except Exception:
         pass
 
-    link_elements = page.locator("a.ActionLink-Event").all()
-    links = []
-    for el in link_elements:
-        href = el.get_attribute("href")
-        if href:
-            links.append(href)
+    fields = read_fields(page, LISTING_FIELDS)
+    links = {}
+    if fields is not None:
+        for href, card_text in zip(fields["hrefs"], fields["cards"]):
+            if href:
+                links[href] = listing_fingerprint(card_text)
 
     logging.info(f"Found {len(links)} events")
     return links
@@ -120,41 +209,235 @@ def get_helloasso_data(sources, service=None, options=None):
         headless = "-headless" in options.arguments
 
     with managed_browser(headless=headless) as browser:
-        context = browser.new_context()
+        context = new_context(browser, allow_domains=ALLOWED_DOMAINS, storage_domain=STORAGE_DOMAIN)
         page = context.new_page()
         records = []
 
-        for source in sources:
-            try:
-                logging.info(f"==================\nProcessing page {source}")
-                page.goto(source["url"], wait_until="domcontentloaded")
-                page.wait_for_timeout(3000)
+        with PagePool(
+            page, headless=headless, allow_domains=ALLOWED_DOMAINS, storage_domain=STORAGE_DOMAIN
+        ) as pool:
+            for source in sources:
+                checkpoint = source_checkpoint(source)
+                if checkpoint.done:
+                    logging.info(f"Reusing the checkpointed records of {source['url']}")
+                    records.extend(checkpoint.records)
+                    continue
+                start = len(records)
+                try:
+                    logging.info(f"==================\nProcessing page {source}")
+                    listing = checkpoint.listing
+                    if listing is None:
+                        goto(page, source["url"], wait_until="domcontentloaded")
+                        wait_for_network_idle(page, timeout=3000)
+
+                        # Handle Cloudflare Turnstile challenge if present
+                        wait_for_turnstile(page)
+
+                        # Dismiss cookie consent modal if present
+                        dismiss_cookie_modal(page)
+
+                        # Collect all event links from the listing page
+                        listing = collect_event_links(page)
+                        checkpoint.save_listing(listing)
+
+                    # Reuse the records of the last run if the listing is unchanged
+                    source_cache = SourceCache(source, listing)
+                    cached = source_cache.records()
+                    if cached is not None:
+                        records.extend(cached)
+                        checkpoint.finish(cached)
+                        continue
+
+                    # Process each event page, unless unchanged since the last run
+                    process = skip_unchanged(
+                        lambda page, link: process_event_page(page, link, source),
+                        source,
+                        listing,
+                        extract_event_uuid,
+                    )
+                    for event_record in pool.map(checkpoint.wrap(process), list(listing)):
+                        if event_record:
+                            records.append(event_record)
+                    checkpoint.finish(records[start:])
+                    source_cache.save(records[start:])
+
+                except Exception as e:
+                    logging.error(
+                        f"Failed to process source page {source.get('url', source)}: {e}",
+                        exc_info=True,
+                    )
+                    raise
+
+        save_storage_state(context, STORAGE_DOMAIN)
+        context.close()
 
-                # Handle Cloudflare Turnstile challenge if present
-                wait_for_turnstile(page)
+    return records
 
-                # Dismiss cookie consent modal if present
-                dismiss_cookie_modal(page)
 
-                # Collect all event links from the listing page
-                links = collect_event_links(page)
+def find_campaign(data) -> dict | None:
+    """Returns the first object of the embedded state that describes a dated event, or None."""
+    pending = [data]
+    while pending:
+        current = pending.pop(0)
+        if isinstance(current, dict):
+            if isinstance(current.get("startDate"), str) and (
+                current.get("name") or current.get("title")
+            ):
+                return current
+            pending.extend(current.values())
+        elif isinstance(current, list):
+            pending.extend(current)
+    return None
+
+
+def _local_datetime(value) -> datetime | None:
+    """Parses an ISO 8601 date of the embedded state into a naive datetime, in local time."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(ZoneInfo(get_config("timezone"))).replace(tzinfo=None)
+    return parsed
+
+
+def _location_text(location) -> str:
+    """Formats a JSON-LD Place or a HelloAsso place as an address line."""
+    if isinstance(location, list):
+        location = location[0] if location else None
+    if isinstance(location, str):
+        return location
+    if not isinstance(location, dict):
+        return ""
+    address = location.get("address")
+    if isinstance(address, dict):
+        street = address.get("streetAddress") or address.get("address")
+        postal_code = address.get("postalCode") or address.get("zipCode")
+        city = address.get("addressLocality") or address.get("city")
+    else:
+        street = address
+        postal_code = location.get("zipCode")
+        city = location.get("city")
+    locality = " ".join(part for part in (postal_code, city) if part)
+    parts = (location.get("name"), street, locality)
+    return ", ".join(str(part).strip() for part in parts if part and str(part).strip())
+
+
+def read_embedded_campaign(page: Page) -> dict | None:
+    """
+    Reads the fields of an event from the state embedded in its page, in a single round trip.
 
-                # Process each event page
-                for link in links:
-                    event_record = process_event_page(page, link, source)
-                    if event_record:
-                        records.append(event_record)
+    HelloAsso pages are server-rendered with their campaign serialized as JSON-LD and as Nuxt
+    state, so no element has to be waited for.
 
-            except Exception as e:
-                logging.error(
-                    f"Failed to process source page {source.get('url', source)}: {e}",
-                    exc_info=True,
-                )
-                raise
+    Returns:
+        The campaign read by parse_embedded_state, or None if the state is missing or
+        incomplete and the page elements have to be read instead
+    """
+    try:
+        state = page.evaluate(EMBEDDED_STATE_SCRIPT)
+    except PlaywrightError as e:
+        logging.debug(f"Could not read the embedded state: {e}")
+        return None
+    return parse_embedded_state(state)
 
-        context.close()
 
-    return records
+def parse_embedded_state(state: dict) -> dict | None:
+    """
+    Reads the fields of an event from the state returned by EMBEDDED_STATE_SCRIPT.
+
+    Returns:
+        The title, start, end, full_location and description of the event, or None if the
+        state is missing or incomplete
+    """
+    for text in [*state["jsonLd"], state["nuxt"]]:
+        try:
+            campaign = find_campaign(json.loads(text)) if text else None
+        except json.JSONDecodeError:
+            continue
+        if campaign is None:
+            continue
+
+        title = campaign.get("name") or campaign.get("title")
+        start = _local_datetime(campaign.get("startDate"))
+        end = _local_datetime(campaign.get("endDate"))
+        description = inner_text(parse_html(campaign.get("description") or ""))
+        full_location = _location_text(campaign.get("location") or campaign.get("place"))
+        if not (isinstance(title, str) and start and end and description):
+            continue
+        if not full_location and not is_online(title):
+            continue
+        return {
+            "title": title.strip(),
+            "start": start,
+            "end": end,
+            "full_location": full_location,
+            "description": description,
+        }
+    return None
+
+
+def read_campaign_elements(page: Page) -> dict | None:
+    """
+    Reads the fields of an event from the elements of its page, once they are rendered.
+
+    Fallback of read_embedded_campaign.
+
+    Returns:
+        The campaign read by campaign_from_fields, or None if the event should be skipped
+    """
+    # The header is rendered along with the dates, wait for them before reading all fields
+    if not wait_for_selector(page, "span.CampaignHeader--Date"):
+        logging.info("Rejecting record: date not found")
+        return None
+    fields = read_fields(page, CAMPAIGN_FIELDS, required=("title", "description"))
+    if fields is None:
+        logging.info("Rejecting record: title not found")
+        return None
+    return campaign_from_fields(fields)
+
+
+def campaign_from_fields(fields: dict) -> dict | None:
+    """
+    Reads the fields of an event from the CAMPAIGN_FIELDS of its page.
+
+    Returns:
+        The title, start, end, full_location and description of the event, or None if the
+        event should be skipped
+    """
+    if fields["title"] is None:
+        logging.info("Rejecting record: title not found")
+        return None
+    title = fields["title"].strip()
+
+    if fields["event_time"] is None:
+        logging.info("Rejecting record: date not found")
+        return None
+    try:
+        event_start_datetime, event_end_datetime = get_dates(fields["event_time"].strip())
+    except FreskDateBadFormat as error:
+        logging.info(f"Rejecting record: {error}")
+        return None
+
+    full_location = ""
+    if not is_online(title):
+        if fields["full_location"] is None:
+            logging.info("Rejecting record: no location")
+            return None
+        full_location = fields["full_location"]
+
+    if fields["description"] is None:
+        logging.info("Rejecting record: no description")
+        return None
+
+    return {
+        "title": title,
+        "start": event_start_datetime,
+        "end": event_end_datetime,
+        "full_location": full_location,
+        # Rendered like the description of the embedded state
+        "description": collapse_lines(fields["description"]),
+    }
 
 
 def process_event_page(page: Page, link: str, source: dict) -> dict | None:
@@ -172,7 +455,7 @@ def process_event_page(page: Page, link: str, source: dict) -> dict | None:
     logging.info(f"\n-> Processing {link} ...")
 
     try:
-        page.goto(link, wait_until="domcontentloaded")
+        goto(page, link, wait_until="domcontentloaded")
 
         # Handle Cloudflare Turnstile challenge if present
         wait_for_turnstile(page)
@@ -180,144 +463,128 @@ def process_event_page(page: Page, link: str, source: dict) -> dict | None:
         ################################################################
         # Parse event id
         ################################################################
-        uuid = link.split("/")[-1]
+        uuid = extract_event_uuid(link)
         if not uuid:
             logging.info("Rejecting record: UUID not found")
             return None
 
         ################################################################
-        # Parse event title
+        # Parse title, dates, location and description
         ################################################################
-        title_el = page.locator("h1").first
-        title_el.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-        title = title_el.text_content()
+        campaign = read_embedded_campaign(page)
+        if campaign is None:
+            logging.info("Embedded state not found, reading the page elements")
+            campaign = read_campaign_elements(page)
+            if campaign is None:
+                return None
 
-        ################################################################
-        # Parse start and end dates
-        ################################################################
-        date_info_el = page.locator("span.CampaignHeader--Date").first
-        try:
-            date_info_el.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-        except PlaywrightTimeoutError:
-            logging.info("Rejecting record: date not found")
-            return None
+        return record_from_campaign(campaign, uuid, link, source)
 
-        event_time = date_info_el.text_content().strip()
+    except (FreskDateBadFormat, FreskError) as e:
+        logging.info(f"Skipping event {link}: {e}")
+        return None
+    except Exception as e:
+        logging.error(f"Unexpected error processing event page {link}: {e}", exc_info=True)
+        raise
 
-        try:
-            event_start_datetime, event_end_datetime = get_dates(event_time)
-        except FreskDateBadFormat as error:
-            logging.info(f"Rejecting record: {error}")
-            return None
 
-        ################################################################
-        # Is it an online event?
-        ################################################################
-        online = is_online(title)
+def record_from_campaign(campaign: dict, uuid: str, link: str, source: dict) -> dict | None:
+    """
+    Build the record of a HelloAsso event from its campaign fields.
 
-        ################################################################
-        # Location data
-        ################################################################
-        full_location = ""
-        location_name = ""
-        address = ""
-        city = ""
-        department = ""
-        longitude = ""
-        latitude = ""
-        zip_code = ""
-        country_code = ""
-
-        if not online:
-            location_el = page.locator("section.CardAddress--Location").first
-            try:
-                location_el.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-            except PlaywrightTimeoutError:
-                logging.info("Rejecting record: no location")
-                return None
+    The campaign comes from parse_embedded_state, or from campaign_from_fields when the
+    page elements had to be read instead.
 
-            full_location = location_el.text_content()
-
-            try:
-                address_dict = get_address(full_location)
-                (
-                    location_name,
-                    address,
-                    city,
-                    department,
-                    zip_code,
-                    country_code,
-                    latitude,
-                    longitude,
-                ) = address_dict.values()
-            except FreskError as error:
-                logging.info(f"Rejecting record: {error}.")
-                return None
+    Returns:
+        Event record dict, or None if the event should be skipped
+    """
+    title = campaign["title"]
+    event_start_datetime = campaign["start"]
+    event_end_datetime = campaign["end"]
+    description = campaign["description"]
+
+    ################################################################
+    # Is it an online event?
+    ################################################################
+    online = is_online(title)
+
+    ################################################################
+    # Location data
+    ################################################################
+    full_location = ""
+    location_name = ""
+    address = ""
+    city = ""
+    department = ""
+    longitude = ""
+    latitude = ""
+    zip_code = ""
+    country_code = ""
+
+    if not online:
+        full_location = campaign["full_location"]
 
-        ################################################################
-        # Description
-        ################################################################
-        description_el = page.locator("div.CampaignHeader--Description").first
         try:
-            description_el.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
-        except PlaywrightTimeoutError:
-            logging.info("Rejecting record: no description")
+            address_dict = get_address(full_location)
+            (
+                location_name,
+                address,
+                city,
+                department,
+                zip_code,
+                country_code,
+                latitude,
+                longitude,
+            ) = address_dict.values()
+        except FreskError as error:
+            logging.info(f"Rejecting record: {error}.")
             return None
 
-        description = description_el.text_content()
-
-        ################################################################
-        # Training?
-        ################################################################
-        training = is_training(title)
-
-        ################################################################
-        # Is it full?
-        ################################################################
-        sold_out = False
-
-        ################################################################
-        # Is it suited for kids?
-        ################################################################
-        kids = is_for_kids(title)
-
-        ################################################################
-        # Building final object
-        ################################################################
-        record = get_record_dict(
-            f"{source['id']}-{uuid}",
-            source["id"],
-            title,
-            event_start_datetime,
-            event_end_datetime,
-            full_location,
-            location_name,
-            address,
-            city,
-            department,
-            zip_code,
-            country_code,
-            latitude,
-            longitude,
-            source.get(
-                "language_code",
-                detect_language_code(title, description),
-            ),
-            online,
-            training,
-            sold_out,
-            kids,
-            link,
-            link,
-            description,
-        )
-
-        logging.info(f"Successfully scraped {link}\n{json.dumps(record, indent=4)}")
-        return record
+    ################################################################
+    # Training?
+    ################################################################
+    training = is_training(title)
+
+    ################################################################
+    # Is it full?
+    ################################################################
+    sold_out = False
+
+    ################################################################
+    # Is it suited for kids?
+    ################################################################
+    kids = is_for_kids(title)
+
+    ################################################################
+    # Building final object
+    ################################################################
+    record = get_record_dict(
+        f"{source['id']}-{uuid}",
+        source["id"],
+        title,
+        event_start_datetime,
+        event_end_datetime,
+        full_location,
+        location_name,
+        address,
+        city,
+        department,
+        zip_code,
+        country_code,
+        latitude,
+        longitude,
+        source.get(
+            "language_code",
+            detect_language_code(title, description),
+        ),
+        online,
+        training,
+        sold_out,
+        kids,
+        link,
+        link,
+        description,
+    )
 
-    except (FreskDateBadFormat, FreskError) as e:
-        logging.info(f"Skipping event {link}: {e}")
-        return None
-    except Exception as e:
-        logging.error(f"Unexpected error processing event page {link}: {e}", exc_info=True)
-        raise
+    logging.info(f"Successfully scraped {link}\n{json.dumps(record, indent=4)}")
+    return record
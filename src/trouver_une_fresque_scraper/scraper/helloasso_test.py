@@ -0,0 +1,100 @@
+import json
+import logging
+
+from trouver_une_fresque_scraper.scraper import helloasso
+from trouver_une_fresque_scraper.utils.testing import same_records, temporary_config
+
+
+LINK = "https://www.helloasso.com/associations/fresque-asso/evenements/fresque-en-ligne-12-fevrier"
+SOURCE = {"id": 300, "url": "https://www.helloasso.com/associations/fresque-asso"}
+
+DESCRIPTION_HTML = (
+    "<p>Un atelier de 3h pour comprendre le climat.</p>"
+    "<p>Venez <strong>nombreux</strong> !<br>Inscription gratuite.</p>"
+)
+
+# JSON-LD block of an online event page, dates in UTC
+JSON_LD = {
+    "@context": "https://schema.org",
+    "@type": "Event",
+    "name": "Fresque du Climat en ligne ",
+    "startDate": "2026-02-12T17:00:00Z",
+    "endDate": "2026-02-12T19:00:00Z",
+    "eventAttendanceMode": "https://schema.org/OnlineEventAttendanceMode",
+    "description": DESCRIPTION_HTML,
+}
+
+# Nuxt state of the same page, dates with their offset
+NUXT = {
+    "data": [
+        {
+            "organization": {"name": "Fresque Asso"},
+            "campaign": {
+                "title": "Fresque du Climat en ligne",
+                "startDate": "2026-02-12T18:00:00+01:00",
+                "endDate": "2026-02-12T20:00:00+01:00",
+                "description": DESCRIPTION_HTML,
+            },
+        }
+    ]
+}
+
+# CAMPAIGN_FIELDS read by the browser on the same page
+PAGE_FIELDS = {
+    "title": "Fresque du Climat en ligne\n",
+    "event_time": " Le 12 février 2026, de 18h à 20h ",
+    "full_location": None,
+    "description": "Un atelier de 3h pour comprendre le climat.\n\nVenez nombreux !\n"
+    "Inscription gratuite.",
+}
+
+DESCRIPTION = "Un atelier de 3h pour comprendre le climat.\nVenez nombreux !\nInscription gratuite."
+
+
+def run_tests():
+    json_ld_state = {"jsonLd": ["not json", json.dumps(JSON_LD)], "nuxt": None}
+    nuxt_state = {"jsonLd": [], "nuxt": json.dumps(NUXT)}
+    undated = {**JSON_LD, "startDate": None}
+    undated_state = {"jsonLd": [json.dumps(undated)], "nuxt": None}
+    offline = {**JSON_LD, "name": "Fresque du Climat"}
+    no_location_state = {"jsonLd": [json.dumps(offline)], "nuxt": None}
+
+    with temporary_config(timezone="Europe/Paris"):
+        json_ld_campaign = helloasso.parse_embedded_state(json_ld_state)
+        nuxt_campaign = helloasso.parse_embedded_state(nuxt_state)
+        browser_campaign = helloasso.campaign_from_fields(PAGE_FIELDS)
+        undated_campaign = helloasso.parse_embedded_state(undated_state)
+        no_location_campaign = helloasso.parse_embedded_state(no_location_state)
+        uuid = helloasso.extract_event_uuid(LINK)
+        embedded_record = helloasso.record_from_campaign(json_ld_campaign, uuid, LINK, SOURCE)
+        browser_record = helloasso.record_from_campaign(browser_campaign, uuid, LINK, SOURCE)
+
+    # tuple fields:
+    # 1. Test case name
+    # 2. Actual value
+    # 3. Expected value
+    test_cases = [
+        (
+            "JSON-LD description is rendered",
+            (json_ld_campaign or {}).get("description"),
+            DESCRIPTION,
+        ),
+        ("JSON-LD and browser campaigns match", json_ld_campaign, browser_campaign),
+        ("Nuxt and browser campaigns match", nuxt_campaign, browser_campaign),
+        same_records("embedded and browser records match", embedded_record, browser_record),
+        ("record id", (embedded_record or {}).get("id"), f"300-{uuid}"),
+        ("undated state falls back to the browser", undated_campaign, None),
+        ("offline state without location falls back", no_location_campaign, None),
+        (
+            "browser page without date is rejected",
+            helloasso.campaign_from_fields({**PAGE_FIELDS, "event_time": None}),
+            None,
+        ),
+    ]
+
+    for name, actual, expected in test_cases:
+        logging.info(f"Running {name}")
+        if actual == expected:
+            logging.info("Result matches")
+        else:
+            logging.error(f"{name}: expected {expected} but got {actual}")
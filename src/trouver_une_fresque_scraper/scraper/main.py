@@ -1,14 +1,28 @@
+import atexit
+import logging
+import multiprocessing
 import os
 import pandas as pd
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from logging.handlers import QueueHandler, QueueListener
+
 from trouver_une_fresque_scraper.scraper.fdc import get_fdc_data
 from trouver_une_fresque_scraper.scraper.fec import get_fec_data
 from trouver_une_fresque_scraper.scraper.billetweb import get_billetweb_data
-from trouver_une_fresque_scraper.scraper.eventbrite_new import get_eventbrite_new_data
+from trouver_une_fresque_scraper.scraper.eventbrite_new import (
+    get_eventbrite_new_data,
+    save_series_cache,
+)
 from trouver_une_fresque_scraper.scraper.glide import get_glide_data
 from trouver_une_fresque_scraper.scraper.helloasso import get_helloasso_data
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from selenium.webdriver.firefox.service import Service
+from trouver_une_fresque_scraper.utils.browser import BrowserServerLost
+from trouver_une_fresque_scraper.utils.concurrency import split_into_shards
+from trouver_une_fresque_scraper.utils.event_cache import save_event_cache
+from trouver_une_fresque_scraper.utils.location import save_geocode_cache, share_geocode_rate_limit
 from trouver_une_fresque_scraper.utils.utils import get_config
 
 SCRAPER_FNS = {
@@ -30,9 +44,7 @@ def get_webdriver_executable():
     return webdriver_path
 
 
-def main(scrapers, headless=False):
-    records = []
-
+def get_webdriver_options(headless=False):
     # geckodriver
     service = Service(executable_path=get_webdriver_executable())
 
@@ -45,6 +57,111 @@ def main(scrapers, headless=False):
     if headless:
         options.add_argument("-headless")
 
+    return service, options
+
+
+def run_scraper(fn, sources, headless=False, shards=1):
+    """
+    Runs a single platform scraper on its sources.
+
+    The webdriver service and options are built here rather than passed in, so that this
+    function can be shipped to a worker process where each platform gets its own browser.
+
+    When shards is greater than 1, the sources are split into contiguous shards scraped by
+    as many threads, each with its own browser. Requests to a given domain are spaced out by
+    the run-wide throttle, and results are concatenated in shard order so that the records
+    come out in the same order as a single-shard run. A shard that fails is logged and the
+    records of the other shards are still returned. A shard whose browser server browser goes
+    away is scraped again once.
+    """
+    if shards <= 1 or len(sources) <= 1:
+        service, options = get_webdriver_options(headless)
+        try:
+            return fn(sources, service=service, options=options)
+        except BrowserServerLost as e:
+            # Connects to another browser, or launches one, and reuses the checkpoints of the
+            # sources and events already scraped
+            logging.warning(f"{e}, scraping the sources of {fn.__name__} again")
+            return fn(sources, service=service, options=options)
+
+    chunks = split_into_shards(sources, shards)
+    logging.info(f"Splitting {len(sources)} {fn.__name__} sources into {len(chunks)} shards")
+    with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+        futures = [executor.submit(run_scraper, fn, chunk, headless) for chunk in chunks]
+        records = []
+        for index, future in enumerate(futures):
+            try:
+                records += future.result()
+            except Exception as e:
+                logging.error(
+                    f"Shard {index + 1}/{len(chunks)} of {fn.__name__} failed: {e}", exc_info=True
+                )
+    return records
+
+
+def run_platform(fn, sources, headless=False, shards=1):
+    """
+    Runs run_scraper, then saves the event and geocode caches of the process that ran it.
+
+    The entries cached while scraping a platform are saved as soon as the platform is done,
+    so that they are kept even if the worker process running it dies afterwards. Worker
+    processes then skip the save at exit, see init_worker.
+    """
+    try:
+        return run_scraper(fn, sources, headless=headless, shards=shards)
+    finally:
+        save_event_cache()
+        save_geocode_cache()
+
+
+def init_worker(log_queue, level, geocode_slot):
+    """
+    Sends the logs of a worker process to the main process, which writes them to its handlers.
+
+    Geocoder requests are spaced out with the other processes of the run through
+    geocode_slot, see share_geocode_rate_limit.
+
+    The caches saved at exit are already saved by the worker once each platform is done, by
+    run_platform and get_eventbrite_new_data, so their atexit handlers are dropped.
+    """
+    logger = logging.getLogger()
+    logger.handlers.clear()
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(level)
+    share_geocode_rate_limit(geocode_slot)
+    atexit.unregister(save_event_cache)
+    atexit.unregister(save_geocode_cache)
+    atexit.unregister(save_series_cache)
+
+
+def run_isolated(fn, sources, headless, shards, initargs):
+    """
+    Runs run_platform in a fresh worker process of its own, initialized with initargs.
+
+    Raises:
+        BrokenProcessPool: if the worker process dies
+    """
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        initargs=initargs,
+    ) as executor:
+        return executor.submit(run_platform, fn, sources, headless, shards).result()
+
+
+def main(scrapers, headless=False, max_workers=1, shards=1):
+    """
+    Runs the scrapers for all the given sources and merges the results into a DataFrame.
+
+    When max_workers is greater than 1, each platform runs in its own worker process, whose
+    logs go to the handlers of this process. A platform that crashes is logged and skipped so
+    that the other platforms still return their records. If a worker process dies, the pool
+    is broken and every platform that had not returned yet is scraped again, each in a fresh
+    process of its own. A platform whose process dies again is logged and given up. shards
+    is the number of browsers sharing the sources of each platform.
+    """
+    records = []
     sorted_workshops = {}
 
     # Make sure that we have a scraper available for each fresk entry
@@ -56,8 +173,73 @@ def main(scrapers, headless=False):
                     sorted_workshops[fn_value] = []
                 sorted_workshops[fn_value].append(workshop)
 
-    for fn_key, sourcev in sorted_workshops.items():
-        records += fn_key(sourcev, service=service, options=options)
+    if max_workers <= 1:
+        for fn_key, sourcev in sorted_workshops.items():
+            records += run_platform(fn_key, sourcev, headless=headless, shards=shards)
+        return pd.DataFrame(records)
+
+    workers = min(max_workers, len(sorted_workshops)) or 1
+    logging.info(f"Running {len(sorted_workshops)} platforms on {workers} worker processes")
+    results = {}
+    broken = []
+    # Worker processes are spawned rather than forked, as forking a process that runs other
+    # threads (such as the APIs in scrape.py) can copy locks held by those threads
+    context = multiprocessing.get_context("spawn")
+    log_queue = context.Queue()
+    # This process and the workers share a single Nominatim rate limit
+    geocode_slot = context.Value("d", 0.0)
+    share_geocode_rate_limit(geocode_slot)
+    initargs = (log_queue, logging.getLogger().level, geocode_slot)
+    listener = QueueListener(log_queue, *logging.getLogger().handlers, respect_handler_level=True)
+    listener.start()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=init_worker,
+            initargs=initargs,
+        ) as executor:
+            futures = {
+                fn_key: executor.submit(run_platform, fn_key, sourcev, headless, shards)
+                for fn_key, sourcev in sorted_workshops.items()
+            }
+            for fn_key, future in futures.items():
+                try:
+                    results[fn_key] = future.result()
+                except BrokenProcessPool:
+                    logging.error(
+                        f"Platform {fn_key.__name__} was stopped by a dead worker process"
+                    )
+                    broken.append(fn_key)
+                except Exception as e:
+                    logging.error(f"Platform {fn_key.__name__} failed: {e}", exc_info=True)
+
+        # The platforms of a broken pool are scraped again once, each in a process of its own,
+        # so that the platform that killed its worker is found without taking the others, or
+        # this process, down with it
+        if broken:
+            with ThreadPoolExecutor(max_workers=min(workers, len(broken))) as executor:
+                futures = {
+                    fn_key: executor.submit(
+                        run_isolated, fn_key, sorted_workshops[fn_key], headless, shards, initargs
+                    )
+                    for fn_key in broken
+                }
+                for fn_key, future in futures.items():
+                    try:
+                        results[fn_key] = future.result()
+                    except BrokenProcessPool:
+                        logging.error(
+                            f"Platform {fn_key.__name__} killed its worker process, giving up on it"
+                        )
+                    except Exception as e:
+                        logging.error(f"Platform {fn_key.__name__} failed: {e}", exc_info=True)
+    finally:
+        listener.stop()
+
+    # Merge in submission order so that the output does not depend on timing
+    for fn_key in sorted_workshops:
+        records += results.get(fn_key, [])
 
     return pd.DataFrame(records)
 
@@ -0,0 +1,105 @@
+import importlib
+import logging
+import os
+
+from trouver_une_fresque_scraper.scraper.main import run_scraper
+from trouver_une_fresque_scraper.utils.browser import BrowserServerLost
+from trouver_une_fresque_scraper.utils.concurrency import split_into_shards
+from trouver_une_fresque_scraper.utils.testing import collected_errors, temporary_config
+
+# The scraper package exports the main function under the name of its module
+main = importlib.import_module("trouver_une_fresque_scraper.scraper.main")
+
+
+def scrape_urls(sources, service=None, options=None):
+    """Stands in for a platform scraper, failing on the sources marked as such."""
+    if any(source.get("fail") for source in sources):
+        raise RuntimeError("scraper crashed")
+    return [{"url": source["url"]} for source in sources]
+
+
+# Sources of each call to lose_browser_once
+lost_browser_attempts = []
+
+
+def lose_browser_once(sources, service=None, options=None):
+    """Stands in for a platform scraper whose browser server browser goes away once."""
+    lost_browser_attempts.append(sources)
+    if len(lost_browser_attempts) == 1:
+        raise BrowserServerLost("Lost the browser server at http://127.0.0.1:9222")
+    return scrape_urls(sources)
+
+
+def kill_worker(sources, service=None, options=None):
+    """Stands in for a platform scraper whose browser takes its worker process down."""
+    os._exit(1)
+
+
+def run_sharded(sources, shards):
+    """Runs run_scraper on sources and returns its records and the errors it logged."""
+    # The webdriver options are read from the config file
+    with temporary_config(), collected_errors() as errors:
+        records = run_scraper(scrape_urls, sources, headless=True, shards=shards)
+    return [record["url"] for record in records], errors
+
+
+def run_with_dead_worker():
+    """Runs main with a platform that kills its worker, returning its records and errors."""
+    scraper_fns = main.SCRAPER_FNS
+    main.SCRAPER_FNS = {"example.org": scrape_urls, "example.com": kill_worker}
+    sources = [{"url": "https://example.org/0"}, {"url": "https://example.com/0"}]
+    try:
+        with temporary_config(), collected_errors() as errors:
+            records = main.main(sources, headless=True, max_workers=2)
+    finally:
+        main.SCRAPER_FNS = scraper_fns
+    return list(records["url"]), errors
+
+
+def run_tests():
+    sources = [{"url": f"https://example.org/{index}"} for index in range(6)]
+    urls = [source["url"] for source in sources]
+    failing = sources[:2] + [{"url": "https://example.org/2", "fail": True}] + sources[3:]
+
+    single, single_errors = run_sharded(sources, 1)
+    sharded, sharded_errors = run_sharded(sources, 3)
+    partial, partial_errors = run_sharded(failing, 3)
+    survivors, dead_worker_errors = run_with_dead_worker()
+    with temporary_config(), collected_errors() as lost_browser_errors:
+        reconnected = run_scraper(lose_browser_once, sources[:1], headless=True)
+
+    # tuple fields:
+    # 1. Test case name
+    # 2. Actual value
+    # 3. Expected value
+    test_cases = [
+        ("shards of similar sizes", split_into_shards(list(range(5)), 2), [[0, 1, 2], [3, 4]]),
+        ("no more shards than items", split_into_shards([1, 2], 4), [[1], [2]]),
+        ("a single empty shard", split_into_shards([], 3), [[]]),
+        ("single shard records", (single, single_errors), (urls, [])),
+        ("sharded records in source order", (sharded, sharded_errors), (urls, [])),
+        ("healthy shards kept", partial, urls[:2] + urls[4:]),
+        (
+            "failing shard logged",
+            [message.split(":")[0] for message in partial_errors],
+            ["Shard 2/3 of scrape_urls failed"],
+        ),
+        (
+            "platform scraped again without its browser server",
+            (reconnected, lost_browser_errors),
+            ([{"url": urls[0]}], []),
+        ),
+        ("platforms of a broken pool scraped again", survivors, ["https://example.org/0"]),
+        (
+            "platform killing its worker given up once",
+            [message for message in dead_worker_errors if "giving up" in message],
+            ["Platform kill_worker killed its worker process, giving up on it"],
+        ),
+    ]
+
+    for name, actual, expected in test_cases:
+        logging.info(f"Running {name}")
+        if actual == expected:
+            logging.info("Result matches")
+        else:
+            logging.error(f"{name}: expected {expected} but got {actual}")
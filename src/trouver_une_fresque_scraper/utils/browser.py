@@ -1,18 +1,330 @@
+import asyncio
+import itertools
+import json
 import logging
-from contextlib import contextmanager
+import os
+import queue
+import socket
+import threading
+import time
+import weakref
 
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright
 from playwright.sync_api import sync_playwright
-from playwright_stealth import Stealth
+
+from trouver_une_fresque_scraper.browser_server import close_target, is_endpoint_healthy
+from trouver_une_fresque_scraper.utils.concurrency import (
+    async_throttle,
+    domain_slot,
+    throttle,
+    DOMAIN_MAX_CONCURRENCY,
+)
+from trouver_une_fresque_scraper.utils import stealth
+from trouver_une_fresque_scraper.utils.memory import RecyclePolicy
+from trouver_une_fresque_scraper.utils.utils import get_config
+from trouver_une_fresque_scraper.utils.watchdog import (
+    event_deadline,
+    record_timeout,
+    EVENT_DEADLINE,
+)
 
 
 DEFAULT_TIMEOUT = 10000  # milliseconds
 
-# Stealth instance configured for French locale (most HelloAsso users are French).
-# Automatically patches navigator.webdriver, user-agent, plugins, WebGL, etc.
-_stealth = Stealth(
-    navigator_languages_override=("fr-FR", "fr"),
+# Resources that the scrapers never read, aborted before they are downloaded.
+# Both lists can be overridden with the blocked_resource_types and blocked_domains config keys.
+BLOCKED_RESOURCE_TYPES = ("image", "media", "font")
+BLOCKED_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "facebook.net",
+    "facebook.com",
+    "hotjar.com",
+    "clarity.ms",
+    "segment.io",
+    "segment.com",
+    "nr-data.net",
+    "newrelic.com",
+    "criteo.com",
+    "criteo.net",
+    "bat.bing.com",
+    "analytics.tiktok.com",
+    "snap.licdn.com",
+    "px.ads.linkedin.com",
+    "ct.pinterest.com",
+    "browser-intake-datadoghq.com",
+    "youtube.com",
 )
 
+# Rough transfer size of each blocked resource type, to estimate the bandwidth saved.
+# Aborted responses are never received, so their actual size is unknown.
+ESTIMATED_RESOURCE_SIZES = {"image": 40_000, "media": 500_000, "font": 40_000, "script": 60_000}
+ESTIMATED_OTHER_RESOURCE_SIZE = 5_000
+
+
+def _matches_domain(host, domains):
+    return any(host == domain or host.endswith(f".{domain}") for domain in domains)
+
+
+class _RequestBlocker:
+    """Route handler aborting heavy and third-party requests, unless their domain is allowed."""
+
+    def __init__(self, allow_domains=()):
+        self.allow_domains = tuple(allow_domains)
+        self.blocked_types = tuple(get_config("blocked_resource_types", BLOCKED_RESOURCE_TYPES))
+        self.blocked_domains = tuple(get_config("blocked_domains", BLOCKED_DOMAINS))
+        self.blocked = {}
+
+    def should_block(self, request):
+        host = urlparse(request.url).hostname or ""
+        if _matches_domain(host, self.allow_domains):
+            return False
+        if request.resource_type in self.blocked_types:
+            return True
+        return _matches_domain(host, self.blocked_domains)
+
+    def _count(self, request):
+        resource_type = request.resource_type
+        self.blocked[resource_type] = self.blocked.get(resource_type, 0) + 1
+
+    def handle(self, route):
+        if self.should_block(route.request):
+            self._count(route.request)
+            route.abort()
+        else:
+            route.fallback()
+
+    async def handle_async(self, route):
+        if self.should_block(route.request):
+            self._count(route.request)
+            await route.abort()
+        else:
+            await route.fallback()
+
+    def report(self, *args):
+        if not self.blocked:
+            return
+        saved = sum(
+            count * ESTIMATED_RESOURCE_SIZES.get(resource_type, ESTIMATED_OTHER_RESOURCE_SIZE)
+            for resource_type, count in self.blocked.items()
+        )
+        details = ", ".join(f"{t}: {c}" for t, c in sorted(self.blocked.items()))
+        logging.info(
+            f"Blocked {sum(self.blocked.values())} requests ({details}), "
+            f"about {saved // 1000} kB saved"
+        )
+
+
+# Directory where the cookies and localStorage of each scraped site are kept between runs
+_storage_state_dir = os.environ.get("BROWSER_STATE_DIR")
+
+# Stored states older than this are considered expired (hours)
+STORAGE_STATE_MAX_AGE = 24
+
+# Contexts created with a stored state, whose consent and challenges were already cleared
+_restored_contexts = weakref.WeakSet()
+
+
+def _storage_state_path(domain):
+    return os.path.join(_storage_state_dir, f"{domain}.json")
+
+
+def load_storage_state(domain):
+    """Loads the storage state saved for domain, or None if there is none or it has expired.
+
+    States are only kept when the BROWSER_STATE_DIR environment variable is
+    set. A state expires when it is older than the browser_state_max_age
+    config key (in hours), or when none of its cookies are still valid.
+    """
+    if not _storage_state_dir:
+        return None
+    path = _storage_state_path(domain)
+    try:
+        age = time.time() - os.path.getmtime(path)
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (json.JSONDecodeError, OSError) as e:
+        logging.warning(f"Could not load browser state for {domain}: {e}")
+        return None
+
+    if age > get_config("browser_state_max_age", STORAGE_STATE_MAX_AGE) * 3600:
+        logging.info(f"Browser state for {domain} expired, starting from a fresh one")
+        return None
+    now = time.time()
+    cookies = [
+        c for c in state.get("cookies", []) if c.get("expires", -1) < 0 or c["expires"] > now
+    ]
+    if not cookies:
+        logging.info(f"All the cookies stored for {domain} expired, starting from a fresh state")
+        return None
+    logging.info(f"Restored browser state for {domain} ({len(cookies)} cookies)")
+    return {**state, "cookies": cookies}
+
+
+def save_storage_state(context, domain):
+    """Saves the cookies and localStorage of context for the next runs, see load_storage_state."""
+    if not _storage_state_dir:
+        return
+    _write_storage_state(domain, context.storage_state())
+
+
+async def save_async_storage_state(context, domain):
+    """Async counterpart of save_storage_state."""
+    if not _storage_state_dir:
+        return
+    _write_storage_state(domain, await context.storage_state())
+
+
+def _write_storage_state(domain, state):
+    path = _storage_state_path(domain)
+    try:
+        os.makedirs(_storage_state_dir, exist_ok=True)
+        # Write then rename, so that concurrent runs never read a partial file
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(temporary_path, path)
+        logging.info(f"Saved browser state for {domain}")
+    except OSError as e:
+        logging.warning(f"Could not save browser state for {domain}: {e}")
+
+
+def is_state_restored(context):
+    """Tells whether context was created with a stored state, see new_context."""
+    return context in _restored_contexts
+
+
+def _context_options(storage_domain, kwargs):
+    if storage_domain and "storage_state" not in kwargs:
+        state = load_storage_state(storage_domain)
+        if state is not None:
+            return {**kwargs, "storage_state": state}
+    return kwargs
+
+
+def new_context(browser, allow_domains=(), storage_domain=None, **kwargs):
+    """Creates a browser context that aborts heavy and third-party requests.
+
+    Images, media, fonts and known analytics or ad domains are never loaded,
+    the scrapers only read text and embedded data. Requests to allow_domains
+    (e.g. a Cloudflare challenge, or an iframe hosted on a CDN) always go
+    through. The number of blocked requests and an estimate of the bytes
+    saved are logged when the context is closed. The stealth init scripts
+    are added too, including on the browsers of the browser server.
+
+    When storage_domain is set, the context starts with the cookies and
+    localStorage saved for it by save_storage_state, if they have not
+    expired, so that consent banners and challenges are not shown again.
+
+    Extra keyword arguments are passed to browser.new_context.
+    """
+    blocker = _RequestBlocker(allow_domains)
+    options = _context_options(storage_domain, kwargs)
+    context = browser.new_context(**options)
+    stealth.apply_stealth_sync(context)
+    if options.get("storage_state") is not None:
+        _restored_contexts.add(context)
+    context.route("**/*", blocker.handle)
+    context.on("close", blocker.report)
+    return context
+
+
+async def new_async_context(browser, allow_domains=(), storage_domain=None, **kwargs):
+    """Async counterpart of new_context."""
+    blocker = _RequestBlocker(allow_domains)
+    options = _context_options(storage_domain, kwargs)
+    context = await browser.new_context(**options)
+    await stealth.apply_stealth_async(context)
+    if options.get("storage_state") is not None:
+        _restored_contexts.add(context)
+    await context.route("**/*", blocker.handle_async)
+    context.on("close", blocker.report)
+    return context
+
+
+class BrowserServerLost(Exception):
+    """Raised by managed_browser when the browser server browser it used went away mid-run."""
+
+
+_endpoint_counter = itertools.count()
+
+
+def _server_endpoint():
+    """Returns the endpoint of a healthy browser of the browser server, or None.
+
+    Endpoints are taken in turn, so that the browsers of a run are spread
+    over all the browsers of the server. Unhealthy ones are skipped, and
+    None makes the caller launch its own browser.
+    """
+    endpoints = get_config("browser_server", [])
+    start = os.getpid() + next(_endpoint_counter)
+    for index in range(len(endpoints)):
+        endpoint = endpoints[(start + index) % len(endpoints)]
+        if is_endpoint_healthy(endpoint):
+            return endpoint
+        logging.warning(f"Browser server endpoint {endpoint} is not healthy, skipping it")
+    return None
+
+
+# DevTools HTTP endpoint of each browser, used to close its pages from other threads
+_browser_endpoints = weakref.WeakKeyDictionary()
+
+
+def browser_endpoint(browser):
+    """Returns the DevTools HTTP endpoint of a browser from managed_browser, or None."""
+    return _browser_endpoints.get(browser)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _launch_options(headless, port):
+    """Chromium launch options shared by the sync and async browsers."""
+    return {"headless": headless, "args": [f"--remote-debugging-port={port}"]}
+
+
+@asynccontextmanager
+async def managed_async_browser(headless=False):
+    """Async context manager for a stealth Playwright browser.
+
+    Same browser as managed_browser, driven through Playwright's asyncio API
+    so that several pages can be worked on at once with asyncio.gather.
+
+    Yields a Chromium browser instance managed by Playwright.
+    Ensures proper cleanup of both browser and Playwright on exit.
+    """
+    async with stealth.STEALTH.use_async(async_playwright()) as playwright:
+        endpoint = _server_endpoint()
+        served = endpoint is not None
+        if served:
+            browser = await playwright.chromium.connect_over_cdp(endpoint)
+            logging.info(f"Connected to the browser server at {endpoint}")
+        else:
+            port = _free_port()
+            browser = await playwright.chromium.launch(**_launch_options(headless, port))
+            endpoint = f"http://127.0.0.1:{port}"
+            logging.info("Playwright stealth async browser initialized successfully")
+        _browser_endpoints[browser] = endpoint
+        try:
+            yield browser
+        except Exception as e:
+            if served and not browser.is_connected():
+                raise BrowserServerLost(f"Lost the browser server at {endpoint}") from e
+            raise
+        finally:
+            await browser.close()
+            logging.info("Browser closed successfully")
+
 
 @contextmanager
 def managed_browser(headless=False):
@@ -22,14 +334,373 @@ def managed_browser(headless=False):
     headless indicators, etc.) so that Cloudflare Turnstile and similar
     challenges are less likely to trigger.
 
+    When the browser_server config key lists the endpoints of a running
+    browser server (see trouver_une_fresque_scraper.browser_server), connects
+    to one of its warm browsers instead of launching a new one. The headless
+    flag is then decided by the server.
+
     Yields a Chromium browser instance managed by Playwright.
-    Ensures proper cleanup of both browser and Playwright on exit.
+    Ensures proper cleanup of both browser and Playwright on exit. A browser
+    of the server is only disconnected from, with the contexts created by
+    this run. Launched browsers also listen on a free local DevTools port,
+    see browser_endpoint.
+
+    Raises:
+        BrowserServerLost: if the block failed because the browser of the
+            server went away, e.g. when the server restarted it. run_scraper
+            then scrapes the platform again, with another browser.
     """
-    with _stealth.use_sync(sync_playwright()) as playwright:
-        browser = playwright.chromium.launch(headless=headless)
-        logging.info("Playwright stealth browser initialized successfully")
+    with stealth.STEALTH.use_sync(sync_playwright()) as playwright:
+        endpoint = _server_endpoint()
+        served = endpoint is not None
+        if served:
+            browser = playwright.chromium.connect_over_cdp(endpoint)
+            logging.info(f"Connected to the browser server at {endpoint}")
+        else:
+            port = _free_port()
+            browser = playwright.chromium.launch(**_launch_options(headless, port))
+            endpoint = f"http://127.0.0.1:{port}"
+            logging.info("Playwright stealth browser initialized successfully")
+        _browser_endpoints[browser] = endpoint
         try:
             yield browser
+        except Exception as e:
+            if served and not browser.is_connected():
+                raise BrowserServerLost(f"Lost the browser server at {endpoint}") from e
+            raise
         finally:
             browser.close()
             logging.info("Browser closed successfully")
+
+
+@contextmanager
+def connected_browser(endpoint):
+    """Context manager connecting the current thread to the browser at a DevTools endpoint.
+
+    Playwright's sync objects can only be used from the thread that created
+    them, so a thread sharing the browser of another one opens its own
+    connection to it rather than launching a new browser.
+
+    Yields the connected browser. Only the connection, and the contexts it
+    created, are closed on exit.
+    """
+    with stealth.STEALTH.use_sync(sync_playwright()) as playwright:
+        browser = playwright.chromium.connect_over_cdp(endpoint)
+        _browser_endpoints[browser] = endpoint
+        try:
+            yield browser
+        finally:
+            browser.close()
+
+
+def goto(page, url, **kwargs):
+    """Navigates page to url once the run-wide per-domain throttle allows it."""
+    throttle(url)
+    return page.goto(url, **kwargs)
+
+
+async def async_goto(page, url, **kwargs):
+    """Async counterpart of goto."""
+    await async_throttle(url)
+    return await page.goto(url, **kwargs)
+
+
+async def gather_pages(context, process, links, size=None):
+    """
+    Awaits process(page, link) for every link on a bounded set of pages of context.
+
+    This is the asyncio counterpart of PagePool.map: up to size pages (the page_concurrency
+    config key by default) are opened in the context, at most domain_max_concurrency of them
+    work on the same domain, and the results are returned in the order of links. A link
+    still running after event_deadline seconds (config key) is given up: None is returned for
+    it and its page is replaced.
+    """
+    size = size if size is not None else get_config("page_concurrency", 1)
+    deadline = get_config("event_deadline", EVENT_DEADLINE)
+    pages = asyncio.Queue()
+    for _ in range(max(1, min(size, len(links)))):
+        pages.put_nowait(await context.new_page())
+
+    domain_limit = get_config("domain_max_concurrency", DOMAIN_MAX_CONCURRENCY)
+    domain_slots = {}
+
+    async def run(link):
+        slot = domain_slots.setdefault(urlparse(link).netloc, asyncio.Semaphore(domain_limit))
+        async with slot:
+            page = await pages.get()
+            try:
+                return await asyncio.wait_for(process(page, link), deadline or None)
+            except asyncio.TimeoutError:
+                record_timeout(link, deadline)
+                await page.close()
+                page = await context.new_page()
+                return None
+            finally:
+                pages.put_nowait(page)
+
+    try:
+        return await asyncio.gather(*(run(link) for link in links))
+    finally:
+        while not pages.empty():
+            await pages.get_nowait().close()
+
+
+def map_pages(process, links, headless=False, size=None, allow_domains=(), storage_domain=None):
+    """
+    Sync entry point to the async engine, for scrapers whose page work is written as coroutines.
+
+    Launches an async browser, runs gather_pages in a fresh context and returns its results.
+    The storage state of storage_domain is restored in that context and saved back at the end.
+    """
+
+    async def run():
+        async with managed_async_browser(headless=headless) as browser:
+            context = await new_async_context(
+                browser, allow_domains=allow_domains, storage_domain=storage_domain
+            )
+            try:
+                results = await gather_pages(context, process, links, size=size)
+                if storage_domain:
+                    await save_async_storage_state(context, storage_domain)
+                return results
+            finally:
+                await context.close()
+
+    return asyncio.run(run())
+
+
+class PageRecycler:
+    """
+    Page of a long-lived context, replaced by a fresh page when its RecyclePolicy says so.
+
+    Recycling happens between two links, in page(), so that processing resumes with the next
+    link on the new page. When make_context is given, the recycler owns the context and
+    replaces it too: make_context(storage_state=...) must return a new context, which starts
+    with the cookies and localStorage of the old one.
+    """
+
+    def __init__(self, context, make_context=None, name="browser page"):
+        self.context = context
+        self.make_context = make_context
+        self.policy = RecyclePolicy(name)
+        self._page = None
+        self._target = None
+
+    def page(self):
+        """Returns the current page, first replacing it if it is closed or due for recycling."""
+        if self._page is not None and self._page.is_closed():
+            self._page = None
+        if self._page is not None and self.policy.is_due():
+            self.recycle()
+        if self._page is None:
+            self._page = self.context.new_page()
+            self._page.on("domcontentloaded", lambda _: self.policy.record_navigation())
+            self._target = self._target_of(self._page)
+        return self._page
+
+    def _target_of(self, page):
+        """Returns the DevTools endpoint and target id that kill() needs to close page."""
+        endpoint = browser_endpoint(self.context.browser)
+        if endpoint is None:
+            return None
+        session = self.context.new_cdp_session(page)
+        try:
+            return endpoint, session.send("Target.getTargetInfo")["targetInfo"]["targetId"]
+        finally:
+            session.detach()
+
+    def recycle(self):
+        self._close_page()
+        if self.make_context is not None:
+            state = self.context.storage_state()
+            self.context.close()
+            self.context = self.make_context(storage_state=state)
+        self.policy.reset()
+
+    def kill(self):
+        """
+        Closes the current page from any thread, so that a call hanging on it fails.
+
+        Sync Playwright objects can only be used from the thread that created them, which is
+        the one hanging: the page is closed by the browser itself, through its DevTools HTTP
+        endpoint. The next page() opens a new page.
+        """
+        target = self._target
+        if target is None:
+            logging.warning("The current page has no DevTools target, it cannot be closed")
+        elif not close_target(*target):
+            logging.warning(f"The browser at {target[0]} did not close page {target[1]}")
+
+    def _close_page(self):
+        if self._page is not None:
+            try:
+                self._page.close()
+            except Exception as e:
+                logging.warning(f"Could not close page: {e}")
+            self._page = None
+            self._target = None
+
+    def close(self):
+        """Closes the page, and the context if the recycler owns it."""
+        self._close_page()
+        if self.make_context is not None:
+            self.context.close()
+
+
+def _process_with_deadline(process, pages, link, timed_out):
+    """Calls process on a page of pages, returning timed_out if the event deadline expired."""
+    result = timed_out
+    with event_deadline(link, kill=pages.kill) as deadline:
+        result = process(pages.page(), link)
+    return timed_out if deadline.expired else result
+
+
+class _Batch:
+    """A list of links shared by the pages of a PagePool, each page taking the next one."""
+
+    def __init__(self, process, links, participants, timed_out=None):
+        self.process = process
+        self.links = links
+        self.timed_out = timed_out
+        self.results = [None] * len(links)
+        self.error = None
+        self._next_index = 0
+        self._participants = participants
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def _take(self):
+        with self._lock:
+            if self.error is not None or self._next_index >= len(self.links):
+                return None
+            index = self._next_index
+            self._next_index += 1
+            return index
+
+    def run(self, pages):
+        try:
+            while pages is not None and (index := self._take()) is not None:
+                link = self.links[index]
+                try:
+                    with domain_slot(link):
+                        self.results[index] = _process_with_deadline(
+                            self.process, pages, link, self.timed_out
+                        )
+                except Exception as e:
+                    with self._lock:
+                        if self.error is None:
+                            self.error = e
+        finally:
+            with self._lock:
+                self._participants -= 1
+                if self._participants == 0:
+                    self._done.set()
+
+    def wait(self):
+        self._done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.results
+
+
+class PagePool:
+    """
+    Bounded pool of browser pages processing event links concurrently.
+
+    The first page of the pool is opened in the context of the caller's page, which stays
+    free for the listings. Playwright's sync objects can only be used from the thread that
+    created them, so every extra page lives in a worker thread, started on first use and
+    kept until the pool is closed. Worker threads connect to the caller's browser through
+    its DevTools endpoint (see connected_browser) and open their own context in it, so that
+    a pool costs a single browser whatever its size. Only a caller's browser that does not
+    come from managed_browser makes each worker launch a browser of its own. The pool size
+    is set by the page_concurrency config key and defaults to a single page.
+
+    Pages are recycled as set by RecyclePolicy, to bound the memory of long runs. Worker
+    pages get a fresh context as well, with the cookies and localStorage of the previous one.
+
+    Example:
+        with PagePool(page, headless=headless) as pool:
+            records = pool.map(lambda page, link: process_event_page(page, link, source), links)
+    """
+
+    def __init__(self, page, headless=False, size=None, allow_domains=(), storage_domain=None):
+        self.page = page
+        self.headless = headless
+        self.allow_domains = allow_domains
+        self.storage_domain = storage_domain
+        self.size = size if size is not None else get_config("page_concurrency", 1)
+        self._batches = queue.SimpleQueue()
+        self._workers = []
+        self._pages = PageRecycler(page.context)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _serve(self, pages):
+        """Runs the batches sent to this worker until the pool is closed."""
+        while (batch := self._batches.get()) is not None:
+            batch.run(pages)
+        return True
+
+    def _worker_browser(self):
+        browser = self.page.context.browser
+        endpoint = browser_endpoint(browser) if browser is not None else None
+        if endpoint is None:
+            return managed_browser(headless=self.headless)
+        return connected_browser(endpoint)
+
+    def _work(self):
+        closed = False
+        try:
+            with self._worker_browser() as browser:
+
+                def make_context(**kwargs):
+                    return new_context(
+                        browser,
+                        allow_domains=self.allow_domains,
+                        storage_domain=self.storage_domain,
+                        **kwargs,
+                    )
+
+                pages = PageRecycler(make_context(), make_context=make_context)
+                closed = self._serve(pages)
+                pages.close()
+        except Exception as e:
+            logging.error(f"Page pool worker failed: {e}", exc_info=True)
+        if not closed:
+            # Keep releasing batches so that the pool doesn't wait on this worker
+            self._serve(None)
+
+    def map(self, process, links, timed_out=None):
+        """
+        Calls process(page, link) for every link and returns the results in the order of links.
+
+        Each call is bound by the event deadline (see event_deadline): a page still busy after
+        it is closed and replaced, and timed_out is returned for its link. Otherwise, the first
+        exception raised by process stops the batch and is raised again here.
+        """
+        if self.size <= 1 or len(links) <= 1:
+            return [_process_with_deadline(process, self._pages, link, timed_out) for link in links]
+
+        while len(self._workers) < self.size - 1:
+            worker = threading.Thread(target=self._work, daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+        batch = _Batch(process, links, participants=len(self._workers) + 1, timed_out=timed_out)
+        for _ in self._workers:
+            self._batches.put(batch)
+        batch.run(self._pages)
+        return batch.wait()
+
+    def close(self):
+        self._pages.close()
+        for _ in self._workers:
+            self._batches.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
@@ -0,0 +1,156 @@
+import hashlib
+import inspect
+import json
+import logging
+import os
+import shutil
+import threading
+
+from trouver_une_fresque_scraper.utils.watchdog import deadline_expired
+
+
+class SourceCheckpoint:
+    """
+    Progress of a single source, appended to a JSON Lines file as it is scraped.
+
+    Each line holds one of:
+        {"listing": {...}}: the event links collected from the source, with their listing
+            fingerprints
+        {"link": ..., "result": ...}: what the scraper returned for a finished event
+        {"records": [...]}: all the records of the source, once it is finished
+
+    Appending keeps the file valid whenever the run is interrupted: a line cut short by a
+    crash is ignored when the file is read back. Without a path, nothing is saved and the
+    checkpoint starts empty.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.listing = None
+        self.results = {}
+        self.records = None
+        self._lock = threading.Lock()
+        self._truncated = False
+        if path and os.path.exists(path):
+            self._load()
+
+    @property
+    def done(self):
+        return self.records is not None
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.warning(f"Ignoring a truncated line of checkpoint {self.path}")
+                    # Start the next line on a fresh one
+                    self._truncated = not line.endswith("\n")
+                    continue
+                if "listing" in entry:
+                    self.listing = entry["listing"]
+                elif "link" in entry:
+                    self.results[entry["link"]] = entry["result"]
+                elif "records" in entry:
+                    self.records = entry["records"]
+
+    def _append(self, entry):
+        if not self.path:
+            return
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                if self._truncated:
+                    f.write("\n")
+                    self._truncated = False
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def save_listing(self, listing):
+        """Saves the links collected from the source, mapped to their listing fingerprints."""
+        self.listing = dict(listing)
+        self._append({"listing": self.listing})
+
+    def has_result(self, link):
+        return link in self.results
+
+    def save_result(self, link, result):
+        """Saves what the scraper returned for link, unless its event deadline expired."""
+        if deadline_expired():
+            return
+        self.results[link] = result
+        self._append({"link": link, "result": result})
+
+    def wrap(self, process):
+        """
+        Returns process(page, link), as used by PagePool.map, skipping the finished links.
+
+        The saved result is returned for a link finished by an earlier attempt of the run,
+        and the result of the others is saved as soon as it is known. A coroutine function
+        gives a coroutine function, as used by gather_pages.
+        """
+        if inspect.iscoroutinefunction(process):
+
+            async def process_once_async(page, link):
+                if self.has_result(link):
+                    return self.results[link]
+                result = await process(page, link)
+                self.save_result(link, result)
+                return result
+
+            return process_once_async
+
+        def process_once(page, link):
+            if self.has_result(link):
+                return self.results[link]
+            result = process(page, link)
+            self.save_result(link, result)
+            return result
+
+        return process_once
+
+    def finish(self, records):
+        self.records = list(records)
+        self._append({"records": self.records})
+
+
+def source_digest(source):
+    """Returns a short hash of the configuration of a source, which changes with any of its keys."""
+    return hashlib.sha1(json.dumps(source, sort_keys=True).encode()).hexdigest()[:8]
+
+
+def source_checkpoint(source):
+    """
+    Returns the checkpoint of a source in the current run.
+
+    Checkpoints are kept in the directory set by the CHECKPOINT_DIR environment variable,
+    which scrape.py points to the results directory of the run. The file of a source is named
+    after its id and a hash of its configuration. The directory is deleted by complete_run.
+    """
+    directory = os.environ.get("CHECKPOINT_DIR")
+    if not directory:
+        return SourceCheckpoint()
+    os.makedirs(directory, exist_ok=True)
+    return SourceCheckpoint(
+        os.path.join(directory, f"{source['id']}-{source_digest(source)}.jsonl")
+    )
+
+
+# Written in the results directory of a run once its events file is saved
+RUN_COMPLETED_FILE = "completed"
+
+
+def is_run_interrupted(results_path):
+    """Tells whether the run saving its results in results_path stopped before completing."""
+    checkpoints = results_path / "checkpoint"
+    return checkpoints.is_dir() and not (results_path / RUN_COMPLETED_FILE).exists()
+
+
+def complete_run(results_path):
+    """
+    Marks the run saving its results in results_path as completed, and drops its checkpoints.
+
+    The marker is written first: a run interrupted while its checkpoints are deleted is still
+    completed, and is never resumed.
+    """
+    (results_path / RUN_COMPLETED_FILE).touch()
+    shutil.rmtree(results_path / "checkpoint", ignore_errors=True)
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import tempfile
+
+from pathlib import Path
+
+from trouver_une_fresque_scraper.utils.checkpoint import (
+    complete_run,
+    is_run_interrupted,
+    SourceCheckpoint,
+)
+
+
+LINKS = ["https://example.org/1", "https://example.org/2"]
+
+
+def run_tests():
+    calls = []
+
+    def process(page, link):
+        calls.append(link)
+        return [{"url": link}]
+
+    async def process_async(page, link):
+        return process(page, link)
+
+    with tempfile.TemporaryDirectory() as directory:
+        run = Path(directory)
+        path = run / "checkpoint" / "1-abcdef12.jsonl"
+        path.parent.mkdir()
+
+        checkpoint = SourceCheckpoint(str(path))
+        checkpoint.save_listing({link: None for link in LINKS})
+        wrapped = checkpoint.wrap(process)
+        first = [wrapped(None, link) for link in LINKS]
+        again = wrapped(None, LINKS[0])
+        calls_after_wrap = list(calls)
+
+        # The process crashed while writing its next line
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"link": "https://example.org/3", "res')
+
+        resumed = SourceCheckpoint(str(path))
+        resumed_results = dict(resumed.results)
+        resumed_listing = list(resumed.listing)
+        async_result = asyncio.run(resumed.wrap(process_async)(None, LINKS[1]))
+        calls_after_resume = len(calls)
+        resumed.finish([record for link in LINKS for record in resumed.results[link]])
+
+        finished = SourceCheckpoint(str(path))
+        interrupted = is_run_interrupted(run)
+        complete_run(run)
+        completed = is_run_interrupted(run)
+        checkpoints_left = (run / "checkpoint").exists()
+
+    # tuple fields:
+    # 1. Test case name
+    # 2. Actual value
+    # 3. Expected value
+    test_cases = [
+        ("wrap returns the results", first, [[{"url": link}] for link in LINKS]),
+        ("wrap skips finished links", (again, calls_after_wrap), (first[0], LINKS)),
+        ("torn last line ignored", resumed_results, dict(zip(LINKS, first))),
+        ("listing resumed", resumed_listing, LINKS),
+        ("async wrap skips finished links", (async_result, calls_after_resume), (first[1], 2)),
+        (
+            "finish saves the records",
+            (finished.done, finished.records),
+            (True, first[0] + first[1]),
+        ),
+        ("unfinished run is interrupted", interrupted, True),
+        ("completed run is not resumed", (completed, checkpoints_left), (False, False)),
+        (
+            "run without checkpoints",
+            is_run_interrupted(Path(tempfile.gettempdir()) / "none"),
+            False,
+        ),
+    ]
+
+    for name, actual, expected in test_cases:
+        logging.info(f"Running {name}")
+        if actual == expected:
+            logging.info("Result matches")
+        else:
+            logging.error(f"{name}: expected {expected} but got {actual}")
@@ -0,0 +1,198 @@
+import asyncio
+import threading
+import time
+
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from trouver_une_fresque_scraper.utils.utils import get_config
+
+
+DOMAIN_MIN_INTERVAL = 0.5  # seconds between two requests to the same domain
+DOMAIN_MAX_CONCURRENCY = 2  # pages loading the same domain at the same time
+SINGLE_FLIGHT_CACHE_SIZE = 256  # results kept by single_flight, such as fetched pages
+
+
+class DomainThrottle:
+    """
+    Spaces out requests sent to the same domain, across all threads of the process.
+
+    Each call reserves the next free slot for the domain of the given URL and sleeps until
+    that slot, so that shards scraping the same platform don't hammer it in bursts.
+    """
+
+    def __init__(self, min_interval=DOMAIN_MIN_INTERVAL):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slots = {}
+
+    def reserve(self, url):
+        """Reserves the next slot for the domain of url and returns the delay until it."""
+        domain = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slots.get(domain, now))
+            self._next_slots[domain] = slot + self.min_interval
+        return slot - now
+
+    def wait(self, url):
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+
+_throttle = None
+_throttle_lock = threading.Lock()
+
+
+def _get_throttle():
+    global _throttle
+    with _throttle_lock:
+        if _throttle is None:
+            _throttle = DomainThrottle(get_config("domain_min_interval", DOMAIN_MIN_INTERVAL))
+    return _throttle
+
+
+def throttle(url):
+    """Waits until a request to the domain of url is allowed by the run-wide throttle."""
+    _get_throttle().wait(url)
+
+
+async def async_throttle(url):
+    """Same as throttle, without blocking the event loop."""
+    delay = _get_throttle().reserve(url)
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+def split_into_shards(items, count):
+    """
+    Splits items into at most count contiguous shards of similar sizes.
+
+    Shards are contiguous so that concatenating their results in order gives the same
+    ordering as processing the items one after the other.
+    """
+    count = max(1, min(count, len(items)))
+    size, remainder = divmod(len(items), count)
+    shards = []
+    start = 0
+    for index in range(count):
+        end = start + size + (1 if index < remainder else 0)
+        shards.append(items[start:end])
+        start = end
+    return shards
+
+
+_domain_slots = {}
+_domain_slots_lock = threading.Lock()
+
+
+@contextmanager
+def domain_slot(url):
+    """
+    Holds one of the run-wide concurrency slots of the domain of url.
+
+    The number of slots per domain is set by the domain_max_concurrency config key.
+    """
+    domain = urlparse(url).netloc
+    with _domain_slots_lock:
+        if domain not in _domain_slots:
+            _domain_slots[domain] = threading.BoundedSemaphore(
+                get_config("domain_max_concurrency", DOMAIN_MAX_CONCURRENCY)
+            )
+        slot = _domain_slots[domain]
+    with slot:
+        yield
+
+
+class SingleFlight:
+    """
+    Process-wide memo of keyed computations, such as downloading and parsing a page.
+
+    Callers asking for a key that is being computed wait for that computation instead of
+    starting their own, and later callers reuse its result. Only the max_size most recently
+    used results are kept, so that a long run does not hold every page it fetched, while
+    computations in flight are never dropped. Failures are not memoized, so that a later
+    caller can try again.
+    """
+
+    def __init__(self, max_size=SINGLE_FLIGHT_CACHE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._futures = OrderedDict()
+
+    def _claim(self, key):
+        """Returns the future of key and whether the caller has to compute it."""
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                self._futures.move_to_end(key)
+                return future, False
+            future = Future()
+            self._futures[key] = future
+            return future, True
+
+    def _fail(self, key, future, error):
+        with self._lock:
+            del self._futures[key]
+        future.set_exception(error)
+
+    def _succeed(self, future, result):
+        future.set_result(result)
+        with self._lock:
+            finished = [key for key, f in self._futures.items() if f.done()]
+            for key in finished[: max(0, len(finished) - self.max_size)]:
+                del self._futures[key]
+
+    def do(self, key, load):
+        future, owner = self._claim(key)
+        if owner:
+            try:
+                result = load()
+            except BaseException as e:
+                self._fail(key, future, e)
+            else:
+                self._succeed(future, result)
+        return future.result()
+
+    async def do_async(self, key, load):
+        """Same as do, where load is a coroutine function, without blocking the event loop."""
+        future, owner = self._claim(key)
+        if owner:
+            try:
+                result = await load()
+            except BaseException as e:
+                self._fail(key, future, e)
+            else:
+                self._succeed(future, result)
+        return await asyncio.wrap_future(future)
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def _get_single_flight():
+    global _single_flight
+    with _single_flight_lock:
+        if _single_flight is None:
+            _single_flight = SingleFlight(
+                get_config("single_flight_cache_size", SINGLE_FLIGHT_CACHE_SIZE)
+            )
+    return _single_flight
+
+
+def single_flight(key, load):
+    """
+    Returns load(), shared by every caller asking for key while its result is cached.
+
+    The single_flight_cache_size config key bounds the number of results kept.
+    """
+    return _get_single_flight().do(key, load)
+
+
+async def async_single_flight(key, load):
+    """Async counterpart of single_flight, where load is a coroutine function."""
+    return await _get_single_flight().do_async(key, load)
@@ -0,0 +1,228 @@
+import atexit
+import hashlib
+import inspect
+import json
+import logging
+import os
+import threading
+
+from datetime import datetime, timedelta, timezone
+
+from trouver_une_fresque_scraper.utils.checkpoint import source_digest
+from trouver_une_fresque_scraper.utils.utils import get_config
+from trouver_une_fresque_scraper.utils.watchdog import deadline_expired, timeout_count
+
+
+EVENT_CACHE_MAX_AGE = 72  # hours before a cached event is scraped again anyway
+
+# Disk-backed cache of the scraped events, keyed by source id and event id
+_event_cache = {}
+_event_cache_file = os.environ.get("EVENT_CACHE_FILE")
+_event_cache_lock = threading.Lock()
+
+
+def _load_event_cache():
+    """Load the event cache from disk if EVENT_CACHE_FILE is set."""
+    global _event_cache
+    if _event_cache_file and os.path.exists(_event_cache_file):
+        try:
+            with open(_event_cache_file, "r", encoding="utf-8") as f:
+                _event_cache = json.load(f)
+            logging.info(f"Loaded {len(_event_cache)} event cache entries from {_event_cache_file}")
+        except (json.JSONDecodeError, OSError) as e:
+            logging.warning(f"Could not load event cache: {e}")
+            _event_cache = {}
+
+
+def _read_event_cache_file():
+    try:
+        with open(_event_cache_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (json.JSONDecodeError, OSError) as e:
+        logging.warning(f"Could not read the saved event cache before merging: {e}")
+        return {}
+
+
+def save_event_cache():
+    """
+    Save the event cache to disk if EVENT_CACHE_FILE is set.
+
+    Called by scraper/main.py after each platform, and at exit outside of its worker
+    processes. The entries saved meanwhile by other processes are merged in, keeping the
+    most recent entry of each event.
+    """
+    if not _event_cache_file or not _event_cache:
+        return
+    # Entries too old to be reused are dropped
+    max_age = timedelta(hours=get_config("event_cache_max_age", EVENT_CACHE_MAX_AGE))
+    with _event_cache_lock:
+        entries = _read_event_cache_file()
+        for key, entry in _event_cache.items():
+            if key not in entries or entries[key]["cached_at"] < entry["cached_at"]:
+                entries[key] = entry
+        entries = {
+            key: entry
+            for key, entry in entries.items()
+            if datetime.now() - datetime.fromisoformat(entry["cached_at"]) <= max_age
+        }
+        try:
+            # Write then rename, so that other processes never read a partial file
+            temporary_path = f"{_event_cache_file}.{os.getpid()}.tmp"
+            with open(temporary_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False, indent=2)
+            os.replace(temporary_path, _event_cache_file)
+            logging.info(f"Saved {len(entries)} event cache entries to {_event_cache_file}")
+        except OSError as e:
+            logging.warning(f"Could not save event cache: {e}")
+
+
+# Load cache on import and register save on exit
+_load_event_cache()
+atexit.register(save_event_cache)
+
+
+def listing_fingerprint(*parts):
+    """
+    Returns a short hash of what a listing page shows about an event, or None if it shows
+    nothing.
+
+    Whitespace is normalized, so that the fingerprint only changes with the content.
+    """
+    text = " ".join(" ".join(str(part).split()) for part in parts if part is not None)
+    if not text:
+        return None
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def _is_expired(record):
+    try:
+        end = datetime.fromisoformat(record["end_date"])
+    except (KeyError, TypeError, ValueError):
+        return False
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    return end < datetime.now(timezone.utc)
+
+
+def drop_expired(result):
+    """Removes the records of past events from a scraper result (a record, a list or None)."""
+    if isinstance(result, list):
+        return [record for record in result if not _is_expired(record)]
+    if isinstance(result, dict) and _is_expired(result):
+        return None
+    return result
+
+
+def _cache_key(source, event_id):
+    return f"{source['id']}:{event_id}"
+
+
+def get_cached_event(source, event_id, fingerprint):
+    """
+    Returns the result cached for an event by an earlier run, or None.
+
+    The cached result is only reused while the listing fingerprint of the event is unchanged
+    and for event_cache_max_age hours (config key), after which the event is scraped again.
+    Records of events that are over are dropped.
+    """
+    if not event_id or not fingerprint:
+        return None
+    entry = _event_cache.get(_cache_key(source, event_id))
+    if entry is None or entry["fingerprint"] != fingerprint:
+        return None
+    max_age = timedelta(hours=get_config("event_cache_max_age", EVENT_CACHE_MAX_AGE))
+    if datetime.now() - datetime.fromisoformat(entry["cached_at"]) > max_age:
+        return None
+    logging.info(f"Reusing the cached records of {event_id}, unchanged in the listing")
+    return drop_expired(entry["result"])
+
+
+def cache_event(source, event_id, fingerprint, result):
+    """
+    Caches what the scraper returned for an event, along with its listing fingerprint.
+
+    Empty results are not cached, as they may come from a transient failure, and neither
+    are events whose deadline expired.
+    """
+    if not event_id or not fingerprint or not result or deadline_expired():
+        return
+    entry = {
+        "fingerprint": fingerprint,
+        "cached_at": datetime.now().isoformat(),
+        "result": result,
+    }
+    with _event_cache_lock:
+        _event_cache[_cache_key(source, event_id)] = entry
+
+
+def skip_unchanged(process, source, listing, event_id):
+    """
+    Wraps process(page, link), as used by PagePool.map, with the event cache.
+
+    A coroutine function gives a coroutine function, as used by gather_pages.
+
+    Args:
+        process: function scraping the event page of a link
+        source: source configuration of the links
+        listing: listing fingerprint of each link
+        event_id: function returning the id of the event of a link
+    """
+    if inspect.iscoroutinefunction(process):
+
+        async def process_unless_unchanged_async(page, link):
+            cached = get_cached_event(source, event_id(link), listing.get(link))
+            if cached is not None:
+                return cached
+            result = await process(page, link)
+            cache_event(source, event_id(link), listing.get(link), result)
+            return result
+
+        return process_unless_unchanged_async
+
+    def process_unless_unchanged(page, link):
+        cached = get_cached_event(source, event_id(link), listing.get(link))
+        if cached is not None:
+            return cached
+        result = process(page, link)
+        cache_event(source, event_id(link), listing.get(link), result)
+        return result
+
+    return process_unless_unchanged
+
+
+class SourceCache:
+    """
+    Records of a whole source, reused while its listing is unchanged.
+
+    The listing fingerprint of a source combines the links collected from it and their own
+    fingerprints, so it changes whenever an event is added, removed or edited. Sources with
+    an event that has no fingerprint are always scraped. Records are only cached when no
+    event timed out while the source was scraped, since they would be missing.
+
+    Example:
+        source_cache = SourceCache(source, listing)
+        cached = source_cache.records()
+        if cached is None:
+            ...
+            source_cache.save(source_records)
+    """
+
+    def __init__(self, source, listing):
+        self.source = source
+        # Sources sharing a url but filtering it differently must not share their records
+        self.event_id = f"listing:{source_digest(source)}"
+        complete = listing and all(listing.values())
+        self.fingerprint = (
+            listing_fingerprint(json.dumps(listing, sort_keys=True)) if complete else None
+        )
+        self._timeouts = timeout_count()
+
+    def records(self):
+        """Returns the records cached for the source, without the past events, or None."""
+        return get_cached_event(self.source, self.event_id, self.fingerprint)
+
+    def save(self, records):
+        if timeout_count() == self._timeouts:
+            cache_event(self.source, self.event_id, self.fingerprint, records)
@@ -0,0 +1,180 @@
+import logging
+
+from urllib.parse import urljoin
+
+from playwright.async_api import Locator as AsyncLocator
+from playwright.sync_api import Error as PlaywrightError, Locator
+
+from trouver_une_fresque_scraper.utils.html import closest, inner_text, select
+from trouver_une_fresque_scraper.utils.waits import async_wait_for_dom_stable, wait_for_dom_stable
+
+
+# Reads every field of a spec below root, see read_fields
+_FIELDS_SCRIPT = """
+(root, spec) => {
+    const read = (el, field) => {
+        if (field.closest !== null) {
+            el = el.closest(field.closest);
+        }
+        for (let i = 0; i < field.up && el; i++) {
+            el = el.parentElement;
+        }
+        if (el && field.child !== null) {
+            el = el.children[field.child];
+        }
+        if (!el) {
+            return null;
+        }
+        if (field.attr !== null) {
+            return el.getAttribute(field.attr);
+        }
+        const value = el[field.prop];
+        return value === undefined ? null : value;
+    };
+    const values = {};
+    for (const [name, field] of Object.entries(spec)) {
+        let elements = [...root.querySelectorAll(field.selector)];
+        if (field.hasText !== null) {
+            const text = field.hasText.toLowerCase();
+            elements = elements.filter((el) => el.textContent.toLowerCase().includes(text));
+        }
+        if (field.prop === null && field.attr === null) {
+            values[name] = elements.length > 0;
+        } else if (field.all) {
+            values[name] = elements.map((el) => read(el, field));
+        } else {
+            values[name] = elements.length > 0 ? read(elements[0], field) : null;
+        }
+    }
+    return values;
+}
+"""
+
+
+def field(
+    selector,
+    prop="textContent",
+    attr=None,
+    closest=None,
+    up=0,
+    child=None,
+    has_text=None,
+    all=False,
+):
+    """Describes a value read from the first element matching selector.
+
+    The value is the prop DOM property of the element (textContent,
+    innerText, href...), or its attr attribute if given. closest moves to
+    the nearest ancestor matching that selector first, up to an ancestor
+    by depth, then child to one of its children, by index. has_text keeps
+    the elements containing that text, ignoring case, like Playwright's
+    :has-text(). With all, the values of every matching element are read
+    into a list.
+    """
+    return {
+        "selector": selector,
+        "prop": prop,
+        "attr": attr,
+        "closest": closest,
+        "up": up,
+        "child": child,
+        "hasText": has_text,
+        "all": all,
+    }
+
+
+def present(selector, has_text=None):
+    """Describes a boolean telling whether an element matches selector."""
+    return field(selector, prop=None, has_text=has_text)
+
+
+def read_fields(target, spec, required=()):
+    """Reads all the fields of spec in a single round trip to the browser.
+
+    spec maps field names to field() and present() descriptions. target is
+    a page, a frame or a locator, whose first element then bounds the
+    lookups. Missing values are None (or empty lists), so optional elements
+    cost nothing. If a required field is missing, the content may still be
+    rendering: the fields are read once more after the DOM settles.
+
+    Returns a dict of the values, or None if the page could not be read.
+    """
+    try:
+        values = _evaluate(target, spec)
+        if any(values[name] is None for name in required):
+            wait_for_dom_stable(target.page if isinstance(target, Locator) else target)
+            values = _evaluate(target, spec)
+    except PlaywrightError as e:
+        logging.debug(f"Could not read fields {', '.join(spec)}: {e}")
+        return None
+    return values
+
+
+async def async_read_fields(target, spec, required=()):
+    """Async counterpart of read_fields."""
+    try:
+        values = await _evaluate(target, spec)
+        if any(values[name] is None for name in required):
+            await async_wait_for_dom_stable(
+                target.page if isinstance(target, AsyncLocator) else target
+            )
+            values = await _evaluate(target, spec)
+    except PlaywrightError as e:
+        logging.debug(f"Could not read fields {', '.join(spec)}: {e}")
+        return None
+    return values
+
+
+def _evaluate(target, spec):
+    """Evaluates spec in the browser, returning a coroutine for async targets."""
+    if isinstance(target, (Locator, AsyncLocator)):
+        return target.first.evaluate(_FIELDS_SCRIPT, spec)
+    return target.evaluate(f"(spec) => ({_FIELDS_SCRIPT})(document, spec)", spec)
+
+
+def read_html_fields(doc, spec, base_url=None):
+    """Reads the fields of spec from a parsed HTML document, as read_fields does in a browser.
+
+    Lets the pages that are server-rendered be read over plain HTTP with the
+    same spec as in the browser. innerText and textContent are rendered
+    from the HTML (see inner_text), and href properties are resolved against
+    base_url like the browser resolves them against the page URL.
+
+    Returns a dict of the values.
+    """
+    values = {}
+    for name, spec_field in spec.items():
+        elements = select(doc, spec_field["selector"])
+        if spec_field["hasText"] is not None:
+            text = spec_field["hasText"].lower()
+            elements = [el for el in elements if text in el.text_content().lower()]
+        if spec_field["prop"] is None and spec_field["attr"] is None:
+            values[name] = len(elements) > 0
+        elif spec_field["all"]:
+            values[name] = [_read_html(el, spec_field, base_url) for el in elements]
+        else:
+            values[name] = _read_html(elements[0], spec_field, base_url) if elements else None
+    return values
+
+
+def _read_html(el, spec_field, base_url):
+    if spec_field["closest"] is not None:
+        el = closest(el, spec_field["closest"])
+    for _ in range(spec_field["up"]):
+        el = el.getparent() if el is not None else None
+    if el is not None and spec_field["child"] is not None:
+        children = [child for child in el if isinstance(child.tag, str)]
+        index = spec_field["child"]
+        el = children[index] if index < len(children) else None
+    if el is None:
+        return None
+    if spec_field["attr"] is not None:
+        return el.get(spec_field["attr"])
+    prop = spec_field["prop"]
+    if prop == "textContent":
+        return el.text_content()
+    if prop == "innerText":
+        return inner_text(el)
+    if prop == "href" and el.tag in ("a", "area", "link"):
+        return urljoin(base_url or "", el.get("href", ""))
+    return None
@@ -0,0 +1,108 @@
+import functools
+import itertools
+
+import lxml.html
+
+from lxml.cssselect import CSSSelector
+
+
+# Elements rendered on their own lines by browsers
+BLOCK_TAGS = {
+    "address",
+    "article",
+    "aside",
+    "blockquote",
+    "dd",
+    "div",
+    "dl",
+    "dt",
+    "footer",
+    "form",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "header",
+    "hr",
+    "li",
+    "main",
+    "nav",
+    "ol",
+    "p",
+    "pre",
+    "section",
+    "table",
+    "tr",
+    "ul",
+}
+
+# Elements whose content is never displayed
+HIDDEN_TAGS = {"head", "noscript", "script", "style", "template", "title"}
+
+
+def parse_html(html):
+    """Parses an HTML document, or fragment, and returns the lxml root element."""
+    if not html or not html.strip():
+        html = "<html></html>"
+    return lxml.html.document_fromstring(html)
+
+
+@functools.lru_cache(maxsize=256)
+def _selector(selector):
+    return CSSSelector(selector, translator="html")
+
+
+def select(el, selector):
+    """Returns all descendant elements of el matching a CSS selector, in document order."""
+    return [match for match in _selector(selector)(el) if match is not el]
+
+
+def select_one(el, selector):
+    """Returns the first descendant element of el matching a CSS selector, or None."""
+    return next(iter(select(el, selector)), None)
+
+
+def closest(el, selector):
+    """Returns el itself or its nearest ancestor matching a CSS selector, or None."""
+    found = set(_selector(selector)(el.getroottree().getroot()))
+    return next((e for e in itertools.chain([el], el.iterancestors()) if e in found), None)
+
+
+def inner_text(el):
+    """
+    Text content of el as a browser would render it.
+
+    Block elements and <br> start new lines, whitespace is collapsed and blank lines are
+    dropped, like Selenium's WebElement.text. Hidden elements are not detected.
+    """
+    parts = []
+    _render(el, parts)
+    return collapse_lines("".join(parts))
+
+
+def collapse_lines(text):
+    """Collapses the whitespace of each line of text and drops the blank lines."""
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def _render(el, parts):
+    # Comments and processing instructions have no tag name and no rendered content
+    if not isinstance(el.tag, str) or el.tag in HIDDEN_TAGS:
+        return
+    if el.tag == "br":
+        parts.append("\n")
+        return
+    block = el.tag in BLOCK_TAGS
+    if block:
+        parts.append("\n")
+    if el.text:
+        parts.append(el.text.replace("\n", " "))
+    for child in el:
+        _render(child, parts)
+        if child.tail:
+            parts.append(child.tail.replace("\n", " "))
+    if block:
+        parts.append("\n")
@@ -0,0 +1,81 @@
+import logging
+
+
+from trouver_une_fresque_scraper.utils import html
+
+
+DOCUMENT = """
+<html>
+<head><title>Atelier</title><script>var shown = false;</script></head>
+<body>
+<div id="event_title"><div class="event_name big">Fresque  du
+Climat</div><span class="text">Thu Oct 19, 2023 from 01:00 PM to 02:00 PM</span></div>
+<div id="context_title">Atelier : Thu Oct 19<br>  Paris, 10 rue X</div>
+<p>First<p>Second
+<div id="shop_block"><iframe src="/shop?id=1&amp;session=2"></iframe></div>
+<a class="sesssion_href" href="/s1">One</a><a class="sesssion_href other" href="/s2">Two</a>
+</body>
+</html>
+"""
+
+
+def run_tests():
+    doc = html.parse_html(DOCUMENT)
+
+    # tuple fields:
+    # 1. Test case name
+    # 2. Actual value
+    # 3. Expected value
+    test_cases = [
+        (
+            "child combinator",
+            html.inner_text(html.select_one(doc, "#event_title > div.event_name")),
+            "Fresque du Climat",
+        ),
+        (
+            "descendant combinator and entities",
+            html.select_one(doc, "#shop_block iframe").get("src"),
+            "/shop?id=1&session=2",
+        ),
+        (
+            "line breaks",
+            html.inner_text(html.select_one(doc, "#context_title")),
+            "Atelier : Thu Oct 19\nParis, 10 rue X",
+        ),
+        (
+            "selector groups in document order",
+            [a.get("href") for a in html.select(doc, "a.other, a.sesssion_href")],
+            ["/s1", "/s2"],
+        ),
+        (
+            "attribute selectors",
+            [html.inner_text(a) for a in html.select(doc, 'a[href$="2"], iframe[src*=session]')],
+            ["", "Two"],
+        ),
+        (
+            "paragraphs closed by blocks",
+            html.select_one(doc, "body > div#shop_block") is not None,
+            True,
+        ),
+        (
+            "closest ancestor",
+            html.closest(html.select_one(doc, "iframe"), "div, p").get("id"),
+            "shop_block",
+        ),
+        (
+            "missing element",
+            html.select_one(doc, "div.location_summary"),
+            None,
+        ),
+        (
+            "hidden content",
+            "shown" in html.inner_text(doc),
+            False,
+        ),
+    ]
+    for name, actual, expected in test_cases:
+        logging.info(f"Running {name}")
+        if actual == expected:
+            logging.info("Result matches")
+        else:
+            logging.error(f"{name}: expected {expected} but got {actual}")
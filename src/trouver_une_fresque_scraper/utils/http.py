@@ -0,0 +1,166 @@
+import json
+import logging
+import re
+import threading
+
+import requests
+
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from urllib3.util.retry import Retry
+
+from trouver_une_fresque_scraper.utils.concurrency import single_flight, throttle
+from trouver_une_fresque_scraper.utils.html import parse_html
+from trouver_une_fresque_scraper.utils.utils import get_config
+
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+HTTP_TIMEOUT = 15  # seconds
+POOL_SIZE = 16  # keep-alive connections per host
+HTTP_RETRIES = 3  # retries of failed connections and 429/5xx responses
+HTTP_BACKOFF = 0.5  # seconds, doubled after each retry
+HTTP_CONCURRENCY = 8  # requests in flight at the same time
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Returns the keep-alive HTTP session shared by the whole process.
+
+    Connections are pooled per host, so that fetching many pages of the same site only pays
+    the TCP and TLS handshakes once. Connection errors and 429/5xx responses are retried with
+    an exponential backoff, honouring Retry-After.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            retry = Retry(
+                total=HTTP_RETRIES,
+                backoff_factor=HTTP_BACKOFF,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET", "HEAD"),
+            )
+            adapter = HTTPAdapter(
+                pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"User-Agent": USER_AGENT})
+            _session = session
+    return _session
+
+
+# Query parameters that only track where a visitor comes from
+TRACKING_PARAMS = ("aff", "fbclid", "gclid")
+
+
+def normalize_url(url):
+    """
+    Returns the key identifying the page at url in the run-wide fetch cache.
+
+    The scheme and host are lowercased, and the fragment, default ports and tracking
+    parameters are dropped. The remaining query parameters are sorted.
+    """
+    parts = urlsplit(url)
+    netloc = parts.netloc.lower()
+    if (parts.scheme, netloc.rsplit(":", 1)[-1]) in (("http", "80"), ("https", "443")):
+        netloc = netloc.rsplit(":", 1)[0]
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name not in TRACKING_PARAMS and not name.startswith("utm_")
+    )
+    return urlunsplit((parts.scheme.lower(), netloc, parts.path or "/", urlencode(query), ""))
+
+
+def _get(url, headers=None):
+    throttle(url)
+    response = get_session().get(url, timeout=HTTP_TIMEOUT, headers=headers)
+    response.raise_for_status()
+    return response
+
+
+def fetch_text(url):
+    """
+    Fetches url with the shared session and returns the response body as text.
+
+    Requests go through the run-wide per-domain throttle. Concurrent calls for the same
+    normalized URL share a single download, and later calls reuse it while it stays in the
+    single_flight cache of the process.
+
+    Raises:
+        requests.RequestException: on network errors and non-2xx responses
+    """
+    return single_flight(("text", normalize_url(url)), lambda: _get(url).text)
+
+
+def fetch_json(url):
+    """
+    Fetches url with the shared session and returns the decoded JSON body, see fetch_text.
+
+    The returned object is shared by all callers and must not be modified.
+
+    Raises:
+        requests.RequestException: on network errors, non-2xx and non-JSON responses
+    """
+    return single_flight(
+        ("json", normalize_url(url)),
+        lambda: _get(url, headers={"Accept": "application/json"}).json(),
+    )
+
+
+def fetch_html(url):
+    """
+    Fetches url and returns its parsed HTML document, see fetch_text.
+
+    The returned document is shared by all callers and must not be modified.
+
+    Raises:
+        requests.RequestException: on network errors and non-2xx responses
+    """
+    return single_flight(("html", normalize_url(url)), lambda: parse_html(fetch_text(url)))
+
+
+def fetch_next_data(url):
+    """
+    Fetches url and returns its parsed __NEXT_DATA__ JSON (or None), see fetch_text.
+
+    Raises:
+        requests.RequestException: on network errors and non-2xx responses
+    """
+    return single_flight(
+        ("next_data", normalize_url(url)), lambda: parse_next_data(fetch_text(url))
+    )
+
+
+def parse_next_data(html):
+    """Returns the parsed __NEXT_DATA__ JSON embedded by Next.js sites, or None."""
+    match = re.search(r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', html, flags=re.DOTALL)
+    if not match:
+        return None
+    try:
+        return json.loads(match.group(1))
+    except json.JSONDecodeError as e:
+        logging.debug(f"Could not parse __NEXT_DATA__: {e}")
+        return None
+
+
+def map_concurrently(fn, items):
+    """
+    Calls fn on each item from a pool of threads and returns the results in order.
+
+    Meant for HTTP-bound work: the number of threads is set by the http_concurrency config
+    key, while the per-domain throttle still spaces out the requests themselves.
+    """
+    size = get_config("http_concurrency", HTTP_CONCURRENCY)
+    if size <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=size) as executor:
+        return list(executor.map(fn, items))
@@ -0,0 +1,109 @@
+import logging
+import os
+
+from trouver_une_fresque_scraper.utils.utils import get_config
+
+
+RECYCLE_AFTER_NAVIGATIONS = 100  # navigations before a page or driver is replaced
+MIN_NAVIGATIONS = 5  # navigations before the memory ceiling can replace it again
+
+
+def _child_pids():
+    """Maps every running process id to the ids of its children, read from /proc."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces, the parent id follows its closing parenthesis
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def descendant_pids(pid):
+    """Returns the ids of all the processes started by pid, directly or not."""
+    children = _child_pids()
+    descendants = []
+    pending = list(children.get(pid, ()))
+    while pending:
+        current = pending.pop()
+        descendants.append(current)
+        pending.extend(children.get(current, ()))
+    return descendants
+
+
+def _rss_bytes(pid):
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def process_tree_rss_mb(pid=None):
+    """
+    Returns the resident memory of a process and all of its descendants, in megabytes.
+
+    Browsers and drivers run as child processes of the scraper, so this is what the OOM killer
+    sees growing over a long run. Memory shared between processes is counted once per process,
+    which overestimates the total a little.
+
+    Args:
+        pid: id of the root process, the current process by default
+
+    Returns:
+        The resident memory in megabytes, or None where /proc is not available
+    """
+    if not os.path.isdir("/proc"):
+        return None
+    root = pid or os.getpid()
+    total = sum(_rss_bytes(current) for current in [root, *descendant_pids(root)])
+    return total / (1024 * 1024)
+
+
+class RecyclePolicy:
+    """
+    Decides when a long-lived page or driver should be replaced by a fresh one.
+
+    A browser leaks memory over hundreds of navigations. It is due for recycling after
+    recycle_after_navigations navigations (config key, 0 to disable), or as soon as the scraper
+    and its browsers use more than max_rss_mb megabytes (config key, 0, the default, to
+    disable). After a recycle, the memory ceiling is ignored for MIN_NAVIGATIONS navigations so
+    that a high baseline doesn't replace the browser before every page.
+    """
+
+    def __init__(self, name, max_navigations=None, max_rss_mb=None):
+        self.name = name
+        self.max_navigations = (
+            max_navigations
+            if max_navigations is not None
+            else get_config("recycle_after_navigations", RECYCLE_AFTER_NAVIGATIONS)
+        )
+        self.max_rss_mb = max_rss_mb if max_rss_mb is not None else get_config("max_rss_mb", 0)
+        self.navigations = 0
+
+    def record_navigation(self):
+        self.navigations += 1
+
+    def reason(self):
+        """Returns why a recycle is due, or None."""
+        if self.max_navigations and self.navigations >= self.max_navigations:
+            return f"{self.navigations} navigations"
+        if self.max_rss_mb and self.navigations >= MIN_NAVIGATIONS:
+            rss = process_tree_rss_mb()
+            if rss is not None and rss > self.max_rss_mb:
+                return f"{rss:.0f} MB resident"
+        return None
+
+    def is_due(self):
+        reason = self.reason()
+        if reason:
+            logging.info(f"Recycling {self.name} after {reason}")
+        return reason is not None
+
+    def reset(self):
+        self.navigations = 0
@@ -1,4 +1,6 @@
 import logging
+import os
+import signal
 import time
 
 from contextlib import contextmanager
@@ -10,14 +12,19 @@ from selenium.common.exceptions import (
     StaleElementReferenceException,
     NoSuchElementException,
     TimeoutException,
+    WebDriverException,
 )
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as EC
 
+from trouver_une_fresque_scraper.utils.memory import descendant_pids, RecyclePolicy
+
 
 DEFAULT_TIMEOUT = 10
-IMPLICIT_WAIT = 3
+# Elements are waited for explicitly, and optional ones are looked up with probe(), so that
+# an expected miss doesn't cost an implicit wait
+IMPLICIT_WAIT = 0
 PAGE_LOAD_DELAY = 3
 MAX_RETRIES = 3
 RETRY_DELAY = 1
@@ -95,6 +102,94 @@ def managed_driver(service, options):
                 logging.error(f"Error closing WebDriver: {e}")
 
 
+class DriverRecycler:
+    """
+    WebDriver replaced by a fresh one when its RecyclePolicy says so, to bound the memory of
+    long Selenium runs.
+
+    Call get() before loading each page: it counts one navigation and, when the driver is due,
+    quits it and starts another one. The new driver reopens the page the old one was on and
+    gets its cookies back before the caller moves on to the next link.
+
+    Args:
+        start_driver: callable returning a new WebDriver
+
+    Example:
+        drivers = DriverRecycler(lambda: webdriver.Firefox(service=service, options=options))
+        for link in links:
+            driver = drivers.get()
+            driver.get(link)
+            # ... scraping code ...
+        drivers.quit()
+    """
+
+    def __init__(self, start_driver, name="WebDriver"):
+        self.start_driver = start_driver
+        self.policy = RecyclePolicy(name)
+        self.driver = None
+        self._killed = False
+
+    def get(self):
+        """Returns the current driver, first replacing it if it was killed or is due for recycling."""
+        if self._killed:
+            self.quit()
+            self._killed = False
+        if self.driver is not None and self.policy.is_due():
+            self.recycle()
+        if self.driver is None:
+            self.driver = self.start_driver()
+        self.policy.record_navigation()
+        return self.driver
+
+    def recycle(self):
+        url, cookies = None, []
+        try:
+            url = self.driver.current_url
+            cookies = self.driver.get_cookies()
+        except WebDriverException as e:
+            logging.warning(f"Could not read the cookies of the WebDriver: {e}")
+        self.quit()
+        self.driver = self.start_driver()
+        if cookies and url and url.startswith("http"):
+            # Cookies can only be added to the site currently loaded
+            self.driver.get(url)
+            for cookie in cookies:
+                try:
+                    self.driver.add_cookie(cookie)
+                except WebDriverException as e:
+                    logging.debug(f"Could not restore cookie {cookie.get('name')}: {e}")
+        self.policy.reset()
+
+    def kill(self):
+        """
+        Kills the driver and its browser from any thread, so that a call hanging on them fails.
+
+        The next get() starts a new driver.
+        """
+        self._killed = True
+        process = getattr(getattr(self.driver, "service", None), "process", None)
+        if process is None:
+            return
+        try:
+            pids = descendant_pids(process.pid)
+        except OSError:
+            pids = []
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        process.kill()
+
+    def quit(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                logging.error(f"Error closing WebDriver: {e}")
+            self.driver = None
+
+
 def safe_find_element(
     driver, by, value, timeout=DEFAULT_TIMEOUT, required=False
 ) -> Optional[WebElement]:
@@ -150,3 +245,91 @@ def safe_find_element(
         if required:
             raise
         return None
+
+
+# Returns the first element matching one of the selectors passed as argument, tried in order
+_PROBE_SCRIPT = """
+for (const selector of arguments[0]) {
+    const element = document.querySelector(selector);
+    if (element) {
+        return element;
+    }
+}
+return null;
+"""
+
+
+def probe(driver, *selectors) -> Optional[WebElement]:
+    """
+    Look up an element that may be missing, trying several alternative CSS selectors.
+
+    The selectors are tried in order by a single script run in the page (or the current
+    frame), so that no implicit wait applies: a missing element costs one round trip to the
+    browser, however many alternatives are given.
+
+    Args:
+        driver: Selenium WebDriver instance
+        *selectors: CSS selectors, from the preferred one to the last fallback
+
+    Returns:
+        The first element matching the first selector that matches anything, or None
+
+    Example:
+        location_el = probe(driver, "div.location_summary", "div.address > a")
+        full_location = location_el.text if location_el else ""
+    """
+    return driver.execute_script(_PROBE_SCRIPT, list(selectors))
+
+
+def probe_text(driver, *selectors, default=None) -> Optional[str]:
+    """Text of the element found by probe(driver, *selectors), or default if there is none."""
+    element = probe(driver, *selectors)
+    return element.text if element is not None else default
+
+
+def wait_for_page_load(driver, timeout=DEFAULT_TIMEOUT) -> bool:
+    """
+    Wait until the document of the current page (or frame) is fully loaded.
+
+    Args:
+        driver: Selenium WebDriver instance
+        timeout: Maximum wait time in seconds (default: 10)
+
+    Returns:
+        True if the document is loaded, False if the timeout was reached
+    """
+    try:
+        WebDriverWait(driver, timeout).until(
+            lambda driver: driver.execute_script("return document.readyState") == "complete"
+        )
+        return True
+    except TimeoutException:
+        logging.debug(f"Page still loading after {timeout}s")
+        return False
+
+
+def wait_for_count_change(driver, by, value, previous, timeout=DEFAULT_TIMEOUT) -> bool:
+    """
+    Wait until the number of elements matching a selector differs from a previous count.
+
+    Typically used after clicking a "load more" button, instead of sleeping for a fixed
+    duration.
+
+    Args:
+        driver: Selenium WebDriver instance
+        by: Selenium By locator type (e.g., By.CSS_SELECTOR, By.XPATH)
+        value: Selector value
+        previous: Number of matching elements before the action
+        timeout: Maximum wait time in seconds (default: 10)
+
+    Returns:
+        True if the count changed, False if the timeout was reached
+    """
+    try:
+        WebDriverWait(driver, timeout).until(
+            lambda driver: len(driver.find_elements(by, value)) != previous
+        )
+        return True
+    except TimeoutException:
+        logging.debug(f"Count of {value} still {previous} after {timeout}s")
+        return False
@@ -0,0 +1,66 @@
+import logging
+
+from urllib.parse import quote
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from trouver_une_fresque_scraper.scraper.main import get_webdriver_options
+from trouver_une_fresque_scraper.utils import scraping
+from trouver_une_fresque_scraper.utils.testing import temporary_config
+
+
+# Billetweb event page, with a location link before the preferred location summary
+DOCUMENT = """
+<html>
+<body>
+<div class="address"><a href="/map">Paris, 10 rue X</a></div>
+<div class="location_summary">10 rue X, 75001 Paris</div>
+<div class="block">Complet</div>
+</body>
+</html>
+"""
+
+
+def run_tests():
+    # probe runs its script in the page, so it is tested in the browser of the scrapers
+    with temporary_config():
+        service, options = get_webdriver_options(headless=True)
+    try:
+        driver = webdriver.Firefox(service=service, options=options)
+    except WebDriverException as e:
+        logging.warning(f"Skipping the probe tests, Firefox could not be started: {e.msg}")
+        return
+
+    try:
+        driver.get(f"data:text/html;charset=utf-8,{quote(DOCUMENT)}")
+        block = scraping.probe(driver, "div.block")
+
+        # tuple fields:
+        # 1. Test case name
+        # 2. Actual value
+        # 3. Expected value
+        test_cases = [
+            (
+                "preferred selector wins over document order",
+                scraping.probe_text(driver, "div.location_summary", "div.address > a"),
+                "10 rue X, 75001 Paris",
+            ),
+            (
+                "fallback selector",
+                scraping.probe_text(driver, "#missing", "div.address > a"),
+                "Paris, 10 rue X",
+            ),
+            ("missing element", scraping.probe(driver, "#more_info", "#other"), None),
+            ("missing text default", scraping.probe_text(driver, "#missing", default=""), ""),
+            ("present element", block.text if block is not None else None, "Complet"),
+        ]
+    finally:
+        driver.quit()
+
+    for name, actual, expected in test_cases:
+        logging.info(f"Running {name}")
+        if actual == expected:
+            logging.info("Result matches")
+        else:
+            logging.error(f"{name}: expected {expected} but got {actual}")
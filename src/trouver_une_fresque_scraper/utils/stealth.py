@@ -0,0 +1,31 @@
+from playwright_stealth import Stealth
+
+
+# Stealth instance configured for French locale (most HelloAsso users are French).
+# Automatically patches navigator.webdriver, user-agent, plugins, WebGL, etc.
+STEALTH = Stealth(
+    navigator_languages_override=("fr-FR", "fr"),
+)
+
+
+def launch_args():
+    """
+    Chromium switches that STEALTH adds to the browsers launched through Playwright.
+
+    Browsers started outside of Playwright, like the ones of the browser server, need them
+    on their own command line to look the same as launched ones.
+    """
+    languages = ",".join(STEALTH.navigator_languages_override)
+    return ["--disable-blink-features=AutomationControlled", f"--accept-lang={languages}"]
+
+
+def apply_stealth_sync(context):
+    """Adds the stealth init scripts to a browser context, unless they already were."""
+    if not hasattr(context, Stealth._STEALTH_APPLIED_KEY):
+        STEALTH.apply_stealth_sync(context)
+
+
+async def apply_stealth_async(context):
+    """Async counterpart of apply_stealth_sync."""
+    if not hasattr(context, Stealth._STEALTH_APPLIED_KEY):
+        await STEALTH.apply_stealth_async(context)
@@ -0,0 +1,73 @@
+import json
+import logging
+import os
+import tempfile
+
+from contextlib import contextmanager
+
+
+@contextmanager
+def temporary_config(**values):
+    """
+    Runs the block in a temporary working directory whose config.json holds values.
+
+    get_config reads config.json from the working directory, which the tests don't have.
+    """
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, "config.json"), "w") as f:
+            json.dump(values, f)
+        os.chdir(directory)
+        try:
+            yield directory
+        finally:
+            os.chdir(cwd)
+
+
+class _ErrorCollector(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@contextmanager
+def collected_errors():
+    """
+    Collects the error messages logged in the block instead of printing them.
+
+    For the tests of failures that are expected to be logged as errors.
+    """
+    logger = logging.getLogger()
+    handlers = logger.handlers[:]
+    collector = _ErrorCollector()
+    logger.handlers = [collector]
+    try:
+        yield collector.messages
+    finally:
+        logger.handlers = handlers
+
+
+def without_scrape_date(result):
+    """Returns a scraper result (a record, a list of records or None) without scrape dates."""
+    if isinstance(result, list):
+        return [without_scrape_date(record) for record in result]
+    if isinstance(result, dict):
+        return {key: value for key, value in result.items() if key != "scrape_date"}
+    return result
+
+
+def same_records(name, result, expected):
+    """
+    Test case checking that two scraper results hold the same records, scrape dates aside.
+
+    Typically the records read over HTTP and the ones read from the fields of a browser. An
+    empty result never matches, so that two paths rejecting an event don't pass the test.
+    """
+    return (
+        name,
+        without_scrape_date(result) or "no records",
+        without_scrape_date(expected) or "no expected records",
+    )
@@ -1,10 +1,10 @@
 import json
 
 
-def get_config(key=None):
+def get_config(key=None, default=None):
     file = open("config.json", "r")
     file = json.loads(file.read())
     credentials = dict(file)
     if key is not None:
-        return credentials.get(key, None)
+        return credentials.get(key, default)
     return credentials
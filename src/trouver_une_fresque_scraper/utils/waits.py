@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import time
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from trouver_une_fresque_scraper.utils.browser import DEFAULT_TIMEOUT
+
+
+# Longest fixed delay allowed when no condition can be waited on (milliseconds)
+MAX_FALLBACK_DELAY = 2000
+
+# Interval between two probes of a polled condition (milliseconds)
+POLL_INTERVAL = 100
+
+_DOM_STABLE_SCRIPT = """
+(quiet) => {
+    if (window.__tufLastMutation === undefined) {
+        window.__tufLastMutation = performance.now();
+        new MutationObserver(() => { window.__tufLastMutation = performance.now(); }).observe(
+            document, {subtree: true, childList: true, characterData: true, attributes: true}
+        );
+    }
+    return performance.now() - window.__tufLastMutation > quiet;
+}
+"""
+
+
+def fallback_delay(page, delay):
+    """Fixed delay for when no concrete condition is available, capped to MAX_FALLBACK_DELAY."""
+    page.wait_for_timeout(min(delay, MAX_FALLBACK_DELAY))
+
+
+def wait_for_network_idle(page, timeout=DEFAULT_TIMEOUT):
+    """Waits until the page has had no network connection for 500 ms.
+
+    Returns False if the page was still busy after timeout milliseconds.
+    """
+    try:
+        page.wait_for_load_state("networkidle", timeout=timeout)
+        return True
+    except PlaywrightTimeoutError:
+        logging.debug(f"Network still busy after {timeout}ms")
+        return False
+
+
+def wait_for_selector(page, selector, state="visible", timeout=DEFAULT_TIMEOUT):
+    """Waits for the first element matching selector to reach state.
+
+    Works on pages, frames and frame locators. Returns False on timeout
+    instead of raising, for elements that are legitimately optional.
+    """
+    try:
+        page.locator(selector).first.wait_for(state=state, timeout=timeout)
+        return True
+    except PlaywrightTimeoutError:
+        logging.debug(f"Element {selector} not {state} after {timeout}ms")
+        return False
+
+
+async def async_wait_for_selector(page, selector, state="visible", timeout=DEFAULT_TIMEOUT):
+    """Async counterpart of wait_for_selector."""
+    try:
+        await page.locator(selector).first.wait_for(state=state, timeout=timeout)
+        return True
+    except PlaywrightTimeoutError:
+        logging.debug(f"Element {selector} not {state} after {timeout}ms")
+        return False
+
+
+def wait_for_response(page, url_pattern, action, timeout=DEFAULT_TIMEOUT):
+    """Runs action and waits for a response whose URL matches url_pattern.
+
+    url_pattern is a glob, a regex or a predicate, as accepted by Playwright.
+    Returns the response, or None if it did not arrive within timeout.
+    """
+    try:
+        with page.expect_response(url_pattern, timeout=timeout) as response_info:
+            action()
+        return response_info.value
+    except PlaywrightTimeoutError:
+        logging.debug(f"No response matching {url_pattern} after {timeout}ms")
+        return None
+
+
+def wait_for_dom_stable(page, quiet=500, timeout=DEFAULT_TIMEOUT):
+    """Waits until the DOM has not changed for quiet milliseconds.
+
+    Useful after clicks that re-render a list without any navigation.
+    Returns False if the DOM kept changing for timeout milliseconds.
+    """
+    try:
+        page.wait_for_function(
+            _DOM_STABLE_SCRIPT, arg=quiet, timeout=timeout, polling=POLL_INTERVAL
+        )
+        return True
+    except PlaywrightTimeoutError:
+        logging.debug(f"DOM still changing after {timeout}ms")
+        return False
+
+
+async def async_wait_for_dom_stable(page, quiet=500, timeout=DEFAULT_TIMEOUT):
+    """Async counterpart of wait_for_dom_stable."""
+    try:
+        await page.wait_for_function(
+            _DOM_STABLE_SCRIPT, arg=quiet, timeout=timeout, polling=POLL_INTERVAL
+        )
+        return True
+    except PlaywrightTimeoutError:
+        logging.debug(f"DOM still changing after {timeout}ms")
+        return False
+
+
+def wait_until(page, condition, timeout=DEFAULT_TIMEOUT):
+    """Polls condition() until it returns a truthy value.
+
+    condition is any callable reading the page (an URL, an attribute, a
+    count). Errors raised while the page is navigating are treated as "not
+    yet". Returns False if the condition still did not hold after timeout
+    milliseconds.
+    """
+    deadline = time.monotonic() + timeout / 1000
+    while True:
+        try:
+            if condition():
+                return True
+        except Exception:
+            pass
+        if time.monotonic() >= deadline:
+            logging.debug(f"Condition still false after {timeout}ms")
+            return False
+        page.wait_for_timeout(POLL_INTERVAL)
+
+
+def wait_until_changed(page, probe, previous, timeout=DEFAULT_TIMEOUT):
+    """Polls probe() until it returns something else than previous.
+
+    Returns False if the value was still the same after timeout milliseconds.
+    """
+    return wait_until(page, lambda: probe() != previous, timeout=timeout)
+
+
+async def async_wait_until_changed(probe, previous, timeout=DEFAULT_TIMEOUT):
+    """Async counterpart of wait_until_changed, where probe is a coroutine function."""
+    deadline = time.monotonic() + timeout / 1000
+    while True:
+        try:
+            if await probe() != previous:
+                return True
+        except Exception:
+            pass
+        if time.monotonic() >= deadline:
+            logging.debug(f"Value still the same after {timeout}ms")
+            return False
+        await asyncio.sleep(POLL_INTERVAL / 1000)
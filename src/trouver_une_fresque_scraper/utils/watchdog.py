@@ -0,0 +1,101 @@
+import logging
+import threading
+
+from contextlib import contextmanager
+
+from trouver_une_fresque_scraper.utils.utils import get_config
+
+
+EVENT_DEADLINE = 120  # seconds allowed to scrape a single event
+
+# Deadline of the event_deadline block running in each thread
+_local = threading.local()
+
+
+_timeouts = 0
+_timeouts_lock = threading.Lock()
+
+
+def record_timeout(link, seconds):
+    """Reports an event given up after its deadline, in the error log of the run."""
+    global _timeouts
+    logging.error(f"Timed out: {link} took more than {seconds}s, moving on to the next event")
+    with _timeouts_lock:
+        _timeouts += 1
+
+
+def timeout_count():
+    """Returns the number of events given up after their deadline in this process."""
+    return _timeouts
+
+
+class Deadline:
+    """State of an event_deadline block, telling whether it expired."""
+
+    def __init__(self):
+        self.expired = False
+        self.finished = False
+        self.lock = threading.Lock()
+
+
+@contextmanager
+def event_deadline(link, kill, seconds=None):
+    """
+    Hard deadline on the scraping of a single event, enforced from outside of the browser.
+
+    If the block is still running after seconds (the event_deadline config key by default),
+    kill() is called from a watchdog thread. It must tear down the page or driver the block is
+    waiting on, so that the pending call fails instead of hanging forever. Any exception raised
+    by the block after that is swallowed, the event is recorded as timed out, and execution
+    resumes after the block: the caller moves on to the next link.
+
+    Example:
+        with event_deadline(link, kill=drivers.kill) as deadline:
+            records = process_event(driver, link)
+        if deadline.expired:
+            records = []
+
+    Args:
+        link: URL of the event, for the logs
+        kill: callable tearing down the page or browser, called from another thread
+        seconds: deadline in seconds, 0 to disable it
+    """
+    seconds = seconds if seconds is not None else get_config("event_deadline", EVENT_DEADLINE)
+    deadline = Deadline()
+
+    def expire():
+        with deadline.lock:
+            if deadline.finished:
+                return
+            deadline.expired = True
+        logging.warning(f"{link} exceeded its {seconds}s deadline, tearing down its page")
+        try:
+            kill()
+        except Exception as e:
+            logging.error(f"Could not tear down the page of {link}: {e}")
+
+    timer = threading.Timer(seconds, expire) if seconds else None
+    if timer is not None:
+        timer.daemon = True
+        timer.start()
+    outer = getattr(_local, "deadline", None)
+    _local.deadline = deadline
+    try:
+        yield deadline
+    except Exception:
+        if not deadline.expired:
+            raise
+    finally:
+        _local.deadline = outer
+        with deadline.lock:
+            deadline.finished = True
+        if timer is not None:
+            timer.cancel()
+    if deadline.expired:
+        record_timeout(link, seconds)
+
+
+def deadline_expired():
+    """Tells whether the event_deadline block running in this thread has expired."""
+    deadline = getattr(_local, "deadline", None)
+    return deadline is not None and deadline.expired
@@ -1,9 +1,25 @@
 from trouver_une_fresque_scraper.apis import ics_test
+from trouver_une_fresque_scraper.scraper import eventbrite_new_test
+from trouver_une_fresque_scraper.scraper import fdc_test
+from trouver_une_fresque_scraper.scraper import glide_test
+from trouver_une_fresque_scraper.scraper import helloasso_test
+from trouver_une_fresque_scraper.scraper import main_test
+from trouver_une_fresque_scraper.utils import checkpoint_test
 from trouver_une_fresque_scraper.utils import date_and_time_test
+from trouver_une_fresque_scraper.utils import html_test
 from trouver_une_fresque_scraper.utils import language_test
+from trouver_une_fresque_scraper.utils import scraping_test
 
 
 if __name__ == "__main__":
     ics_test.run_tests()
     date_and_time_test.run_tests()
+    html_test.run_tests()
     language_test.run_tests()
+    main_test.run_tests()
+    eventbrite_new_test.run_tests()
+    checkpoint_test.run_tests()
+    glide_test.run_tests()
+    fdc_test.run_tests()
+    helloasso_test.run_tests()
+    scraping_test.run_tests()